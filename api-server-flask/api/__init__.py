@@ -60,10 +60,20 @@ def create_app(config_override: dict = None) -> Flask:
         _startup_logger.critical("Failed to initialize MySQL database", exc_info=True)
         raise e
 
+    # Warm process-wide lookup caches (copied into each forked gunicorn worker)
+    from .business.dealer_business import warm_dealer_cache
+    try:
+        warm_dealer_cache()
+    except Exception:
+        _startup_logger.warning("Dealer cache warm-up failed", exc_info=True)
+
     # Initialize Flask-Admin
     from .admin import init_admin
     init_admin(app)
 
+    # One DB connection + one commit per request
+    _register_unit_of_work(app)
+
     # Register error handlers and utility endpoints
     _register_error_handlers(app)
     _register_utility_routes(app)
@@ -71,6 +81,39 @@ def create_app(config_override: dict = None) -> Flask:
     return app
 
 
+def _register_unit_of_work(app: Flask) -> None:
+    """
+    Wrap every request in a MySQL unit of work: all queries made while
+    handling the request share one pooled connection and are committed once.
+    Responses with status >= 400 and unhandled exceptions roll back.
+    """
+    from .db_manager import mysql_manager
+
+    @app.before_request
+    def begin_unit_of_work():
+        mysql_manager.begin_unit_of_work()
+
+    @app.after_request
+    def commit_unit_of_work(response):
+        try:
+            mysql_manager.end_unit_of_work(commit=response.status_code < 400)
+        except Exception as e:
+            _startup_logger.error("Request commit failed", exc_info=True)
+            return app.response_class(
+                json.dumps({"success": False, "msg": f"Database commit failed: {str(e)}"}),
+                status=500, mimetype='application/json'
+            )
+        return response
+
+    @app.teardown_request
+    def rollback_unit_of_work(_exc):
+        # Only still open if after_request never ran (unhandled exception).
+        try:
+            mysql_manager.end_unit_of_work(commit=False)
+        except Exception:
+            _startup_logger.warning("Request rollback failed", exc_info=True)
+
+
 def _register_error_handlers(app: Flask) -> None:
     @app.after_request
     def after_request(response):
@@ -97,6 +140,7 @@ def _register_utility_routes(app: Flask) -> None:
         """Health check endpoint."""
         try:
             from .db_manager import mysql_manager
+            from .core.cache import cache_stats
             with mysql_manager.get_connection() as conn:
                 with conn.cursor() as cursor:
                     cursor.execute('SELECT 1 as test')
@@ -104,6 +148,8 @@ def _register_utility_routes(app: Flask) -> None:
             return {
                 "status": "healthy",
                 "database": "connected",
+                "pool": mysql_manager.pool_stats(),
+                "caches": cache_stats(),
                 "message": "MySQL warehouse management API is running"
             }, 200
         except Exception as e:
@@ -120,8 +166,9 @@ def _register_utility_routes(app: Flask) -> None:
             from .models import Warehouse, Company, PotentialOrder
             warehouses_count = len(Warehouse.get_all())
             companies_count = len(Company.get_all())
+            counts = PotentialOrder.count_grouped_by_status()
             status_counts = {
-                s.to_frontend_slug().replace('-', '_'): PotentialOrder.count_by_status(s.value)
+                s.to_frontend_slug().replace('-', '_'): counts.get(s.value, 0)
                 for s in OrderStatus
             }
             return {
@@ -152,5 +199,14 @@ def _register_utility_routes(app: Flask) -> None:
         }, 200
 
 
-# Module-level app instance so `gunicorn api:app` continues to work unchanged.
-app = create_app()
+def __getattr__(name):
+    """
+    Module-level app, built on first access so `gunicorn api:app` and
+    `from api import app` work unchanged while importing a submodule
+    (api.db_manager, api.utils, ... — e.g. from the unit tests) does not
+    build the app or connect to MySQL.
+    """
+    if name == 'app':
+        globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -14,6 +14,8 @@ from flask_admin.form import BaseForm
 import wtforms
 
 from .db_manager import mysql_manager
+from .core.auth import invalidate_user_cache
+from .permissions import invalidate_permissions
 
 
 # ──────────────────────────────────────────────
@@ -110,6 +112,7 @@ class UserManagementView(SecureView):
             "UPDATE users SET status='active', role=%s WHERE id=%s",
             (role, user_id), fetch=False
         )
+        invalidate_user_cache()
         flash(f'User approved with role: {role}', 'success')
         return redirect(url_for('usermanagement.index'))
 
@@ -119,6 +122,7 @@ class UserManagementView(SecureView):
             "UPDATE users SET status='blocked' WHERE id=%s",
             (user_id,), fetch=False
         )
+        invalidate_user_cache()
         flash('User blocked.', 'warning')
         return redirect(url_for('usermanagement.index'))
 
@@ -129,6 +133,7 @@ class UserManagementView(SecureView):
             "UPDATE users SET role=%s WHERE id=%s",
             (role, user_id), fetch=False
         )
+        invalidate_user_cache()
         flash(f'Role updated to: {role}', 'success')
         return redirect(url_for('usermanagement.index'))
 
@@ -144,6 +149,7 @@ class UserManagementView(SecureView):
             "UPDATE users SET password=%s WHERE id=%s",
             (new_hash, user_id), fetch=False
         )
+        invalidate_user_cache()
         flash('Password reset successfully.', 'success')
         return redirect(url_for('usermanagement.index'))
 
@@ -152,6 +158,7 @@ class UserManagementView(SecureView):
         mysql_manager.execute_query(
             "DELETE FROM users WHERE id=%s", (user_id,), fetch=False
         )
+        invalidate_user_cache()
         flash('User deleted.', 'danger')
         return redirect(url_for('usermanagement.index'))
 
@@ -293,6 +300,7 @@ class RoleManagementView(SecureView):
                     "INSERT IGNORE INTO role_uploads (role_id, upload_type) VALUES (%s,%s)",
                     (role_id, upload), fetch=False
                 )
+            invalidate_permissions()
             flash(f'Role "{name}" created successfully.', 'success')
             return redirect(url_for('rolemanagement.index'))
 
@@ -341,6 +349,7 @@ class RoleManagementView(SecureView):
                     "INSERT IGNORE INTO role_uploads (role_id, upload_type) VALUES (%s,%s)",
                     (role_id, upload), fetch=False
                 )
+            invalidate_permissions()
             flash(f'Role "{role["name"]}" updated.', 'success')
             return redirect(url_for('rolemanagement.index'))
 
@@ -378,6 +387,7 @@ class RoleManagementView(SecureView):
         mysql_manager.execute_query(
             "DELETE FROM roles WHERE role_id=%s", (role_id,), fetch=False
         )
+        invalidate_permissions()
         flash(f'Role "{role_name}" deleted.', 'success')
         return redirect(url_for('rolemanagement.index'))
 
@@ -1,16 +1,53 @@
 # -*- encoding: utf-8 -*-
 """
 Dealer Business Logic for MySQL
+
+Dealer ids are cached process-wide in an LRU + TTL cache (core/cache.py)
+keyed by ('code', lower-cased code) and ('name', lower-cased name). It is
+warmed from the dealer table at startup, filled only once the transaction
+that looked a dealer up commits, and invalidated — in every worker — by the
+admin dealer write paths through invalidate_dealer_cache().
 """
 
 from datetime import datetime
+from ..config import BaseConfig
+from ..db_manager import mysql_manager
 from ..models import Dealer
+from ..repositories import reference_repo
+from ..core.cache import TTLCache
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
 # Cache to avoid repeated database lookups
-_dealer_cache = {}
+_dealer_cache = TTLCache('dealers', BaseConfig.DEALER_CACHE_SIZE, BaseConfig.DEALER_CACHE_TTL_SECONDS)
+
+
+def _code_key(dealer_code):
+    return ('code', dealer_code.lower())
+
+
+def _name_key(dealer_name):
+    return ('name', dealer_name.strip().lower())
+
+
+def _cache_after_commit(entries):
+    """
+    Cache entries once the current transaction commits: an id read or
+    created by uncommitted work must not outlive a rollback.
+    """
+    if entries:
+        mysql_manager.on_commit(lambda: _dealer_cache.set_many(entries))
+
+
+def _cache_dealer(dealer_id, name=None, dealer_code=None):
+    """Cache a dealer under its code and its own name."""
+    entries = {}
+    if dealer_code:
+        entries[_code_key(dealer_code)] = dealer_id
+    if name:
+        entries[_name_key(name)] = dealer_id
+    _cache_after_commit(entries)
 
 
 def get_or_create_dealer(dealer_name, dealer_code=None):
@@ -38,10 +75,11 @@ def get_or_create_dealer(dealer_name, dealer_code=None):
     logger.debug("get_or_create_dealer", extra={'dealer_name': dealer_name, 'dealer_code': dealer_code})
 
     # Check cache by code first, then by name
-    cache_key = dealer_code if dealer_code else dealer_name.lower()
-    if cache_key in _dealer_cache:
-        logger.debug("Dealer cache hit", extra={'dealer_id': _dealer_cache[cache_key]})
-        return _dealer_cache[cache_key]
+    cache_key = _code_key(dealer_code) if dealer_code else _name_key(dealer_name)
+    cached_id = _dealer_cache.get(cache_key)
+    if cached_id is not None:
+        logger.debug("Dealer cache hit", extra={'dealer_id': cached_id})
+        return cached_id
 
     # 1. Try lookup by dealer_code
     if dealer_code:
@@ -49,9 +87,7 @@ def get_or_create_dealer(dealer_name, dealer_code=None):
             dealer = Dealer.find_by_code(dealer_code)
             if dealer:
                 logger.debug("Found dealer by code", extra={'dealer_id': dealer.dealer_id})
-                _dealer_cache[cache_key] = dealer.dealer_id
-                if dealer_name and dealer_name.lower():
-                    _dealer_cache[dealer_name.lower()] = dealer.dealer_id
+                _cache_dealer(dealer.dealer_id, dealer.name, dealer_code)
                 return dealer.dealer_id
         except Exception as e:
             logger.warning("Error querying dealer by code", extra={'dealer_code': dealer_code, 'error': str(e)})
@@ -67,7 +103,7 @@ def get_or_create_dealer(dealer_name, dealer_code=None):
                     dealer.dealer_code = dealer_code
                     dealer.save()
                     logger.debug("Updated dealer code", extra={'dealer_code': dealer_code})
-                _dealer_cache[cache_key] = dealer.dealer_id
+                _cache_dealer(dealer.dealer_id, dealer.name, dealer_code)
                 return dealer.dealer_id
         except Exception as e:
             logger.warning("Error querying dealer by name", extra={'dealer_name': dealer_name, 'error': str(e)})
@@ -85,9 +121,7 @@ def get_or_create_dealer(dealer_name, dealer_code=None):
         dealer_id = dealer.dealer_id
         logger.debug("Created new dealer", extra={'dealer_id': dealer_id, 'dealer_name': dealer_name})
 
-        _dealer_cache[cache_key] = dealer_id
-        if dealer_name and dealer_name.lower() != cache_key:
-            _dealer_cache[dealer_name.lower()] = dealer_id
+        _cache_dealer(dealer_id, dealer.name, dealer_code)
         return dealer_id
 
     except Exception as e:
@@ -95,8 +129,155 @@ def get_or_create_dealer(dealer_name, dealer_code=None):
         raise e
 
 
+def get_or_create_dealers(dealer_names):
+    """
+    Bulk, name-only variant of get_or_create_dealer (used by order upload).
+
+    Resolves every distinct name with at most two SELECTs and one
+    executemany INSERT, however many names there are, and shares the
+    module cache with get_or_create_dealer.
+
+    Args:
+        dealer_names: iterable of dealer names (blank / None entries are skipped)
+
+    Returns:
+        dict mapping lower-cased name → dealer_id
+    """
+    wanted = {}   # lower-cased name → name as first seen
+    for name in dealer_names:
+        name = name.strip() if name else ''
+        if name:
+            wanted.setdefault(name.lower(), name)
+
+    resolved = _cached_ids({key: _name_key(key) for key in wanted})
+    missing = [wanted[key] for key in wanted if key not in resolved]
+    if not missing:
+        return resolved
+
+    found = reference_repo.find_dealer_ids_by_names(missing)
+    resolved.update(found)
+
+    to_create = [name for name in missing if name.lower() not in found]
+    if to_create:
+        reference_repo.bulk_insert_dealers(to_create, datetime.utcnow())
+        resolved.update(reference_repo.find_dealer_ids_by_names(to_create))
+        logger.debug("Created dealers in bulk", extra={'count': len(to_create)})
+
+    _cache_after_commit({_name_key(key): dealer_id for key, dealer_id in resolved.items()})
+    return resolved
+
+
+def get_or_create_coded_dealers(pairs):
+    """
+    Bulk variant of get_or_create_dealer for (dealer_code, dealer_name) pairs
+    (used by invoice upload).
+
+    Each pair is resolved in the same order as get_or_create_dealer — by
+    code, then by name (backfilling a missing code), then created — but for
+    all pairs at once: two SELECTs, one UPDATE, one executemany INSERT and
+    one SELECT for the new ids, however many pairs there are.
+
+    Args:
+        pairs: iterable of (dealer_code, dealer_name); either may be blank
+
+    Returns:
+        dict mapping each pair as given → dealer_id (pairs with neither a
+        code nor a name are left out)
+    """
+    keys = {}     # pair as given → cache key (code, else lower-cased name)
+    wanted = {}   # cache key → (code, name) stripped, as first seen
+    for pair in pairs:
+        if pair in keys:
+            continue
+        code, name = pair
+        code = code.strip() if code else None
+        name = name.strip() if name else ''
+        if not code and not name:
+            continue
+        name = name or code
+        key = _code_key(code) if code else _name_key(name)
+        keys[pair] = key
+        wanted.setdefault(key, (code, name))
+
+    resolved = _cached_ids({key: key for key in wanted})
+    missing = {key: wanted[key] for key in wanted if key not in resolved}
+    current_time = datetime.utcnow()
+
+    # 1. By dealer_code
+    by_code = reference_repo.find_dealer_ids_by_codes(
+        [code for code, _name in missing.values() if code]
+    )
+    for key, (code, _name) in list(missing.items()):
+        if code and code.lower() in by_code:
+            resolved[key] = by_code[code.lower()]
+            del missing[key]
+
+    # 2. By name — a dealer found this way takes the first code seen for it
+    by_name = reference_repo.find_dealers_by_names(
+        list(dict.fromkeys(name for _code, name in missing.values()))
+    )
+    code_backfills = {}   # dealer_id → dealer_code
+    for key, (code, name) in list(missing.items()):
+        dealer = by_name.get(name.lower())
+        if dealer:
+            resolved[key] = dealer['dealer_id']
+            if code and not dealer['dealer_code']:
+                code_backfills.setdefault(dealer['dealer_id'], code)
+            del missing[key]
+    reference_repo.bulk_set_dealer_codes(code_backfills, current_time)
+
+    # 3. Create the rest — one dealer per name, as repeated single lookups would
+    to_create = {}   # lower-cased name → (name, code)
+    for code, name in missing.values():
+        to_create.setdefault(name.lower(), (name, code))
+    if to_create:
+        reference_repo.bulk_insert_coded_dealers(list(to_create.values()), current_time)
+        created = reference_repo.find_dealer_ids_by_names([name for name, _code in to_create.values()])
+        for key, (_code, name) in missing.items():
+            if name.lower() in created:
+                resolved[key] = created[name.lower()]
+        logger.debug("Created dealers in bulk", extra={'count': len(to_create)})
+
+    _cache_after_commit(resolved)
+    return {pair: resolved[key] for pair, key in keys.items() if key in resolved}
+
+
+def _cached_ids(cache_keys):
+    """{wanted key: dealer_id} for the keys whose cache_keys[key] entry is cached."""
+    found = {}
+    for key, cache_key in cache_keys.items():
+        dealer_id = _dealer_cache.get(cache_key)
+        if dealer_id is not None:
+            found[key] = dealer_id
+    return found
+
+
+def warm_dealer_cache():
+    """Load the most recently updated dealers into the cache in one query."""
+    # Two entries (code + name) per dealer
+    rows = reference_repo.get_recent_dealers(BaseConfig.DEALER_CACHE_SIZE // 2)
+    entries = {}
+    # Highest id first, so for a duplicated name the lowest id is cached —
+    # the same dealer find_dealer_ids_by_names picks.
+    for r in sorted(rows, key=lambda r: r['dealer_id'], reverse=True):
+        if r['dealer_code']:
+            entries[_code_key(r['dealer_code'])] = r['dealer_id']
+        entries[_name_key(r['name'])] = r['dealer_id']
+    _dealer_cache.set_many(entries)
+    logger.info("Dealer cache warmed", extra={'entries': len(entries)})
+
+
+def invalidate_dealer_cache():
+    """Drop cached dealers in every worker — call after any dealer INSERT/UPDATE outside this module."""
+    _dealer_cache.invalidate()
+
+
+def dealer_cache_stats():
+    """Hit/miss counters of the dealer cache."""
+    return _dealer_cache.stats()
+
+
 def clear_dealer_cache():
-    """Clear the dealer cache — useful for testing."""
-    global _dealer_cache
-    _dealer_cache = {}
+    """Clear this process's dealer cache — useful for testing."""
+    _dealer_cache.clear()
     logger.debug("Dealer cache cleared")
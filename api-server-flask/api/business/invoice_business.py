@@ -17,33 +17,106 @@ State-transition rules for invoice upload
      the backend auto-transitions it to Invoiced and clears the flag.
 
 4. Orders already in {Invoiced, Dispatch Ready, Completed}:
-     Treated as duplicates — added to the error report.
+     Treated as duplicates — added to the error report. Exception: in a
+     chunked (resumable) upload, an order invoiced by an earlier chunk of the
+     same batch gets its later rows inserted as further invoice lines.
 
 Performance design
 ──────────────────
 process_invoice_dataframe runs in three phases to eliminate N+1 queries:
-  Phase 1 — two DB calls: bulk pre-fetch all potential orders + load state id.
-  Phase 2 — pure Python: classify every row against the in-memory map (zero DB).
+  Phase 1 — columnar normalisation of every column once (no per-cell parsing),
+             then bulk DB calls: pre-fetch all potential orders and the
+             invoice numbers already on file, resolve every
+             (Code, Account Name) pair that will be invoiced (two IN queries,
+             one INSERT for new dealers, one UPDATE for missing dealer codes),
+             load state id.
+  Phase 2 — pure Python: classify every row against the in-memory maps (zero DB).
   Phase 3 — repository calls: bulk invoice INSERTs, PO UPDATEs, Order INSERTs,
-             StateHistory INSERTs, flagged PO UPDATEs.
-Total DB round-trips: ~6 regardless of row count.
+             StateHistory INSERTs, flagged PO UPDATEs — in chunks of
+             WRITE_CHUNK_SIZE orders, each chunk inside its own savepoint.
+Total DB round-trips: ~6 per chunk regardless of row count.
 """
 
 from datetime import datetime
 
-from ..models import Invoice, Order
-from ..business.dealer_business import get_or_create_dealer
+from ..models import InvoiceRecord, Order
+from ..db_manager import mysql_manager, iter_chunks
+from ..business.dealer_business import get_or_create_coded_dealers
 from ..business.order_state_machine import OrderStateMachine
 from ..repositories import order_repo, invoice_repo
+from ..utils.upload_utils import normalise_columns
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Date formats seen in invoice exports, tried before the pandas fallback.
+INVOICE_DATE_FORMATS = ('%d-%b-%Y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y',
+                        '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %I:%M:%S %p')
+
+# Invoice attribute → upload column, grouped by how the column is normalised.
+_INVOICE_TEXT_FIELDS = {
+    'invoice_number':            'Invoice #',
+    'original_order_id':         'Order #',
+    'invoice_type':              'Invoice Type',
+    'invoice_header_type':       'Invoice Header Type',
+    'b2b_purchase_order_number': 'B2B Purchase Order #',
+    'b2b_order_type':            'B2B Order Type',
+    'account_tin':               'Account TIN#',
+    'cash_customer_name':        'Cash Customer Name',
+    'contact_first_name':        'Contact First Name',
+    'contact_last_name':         'Contact Last Name',
+    'customer_category':         'Customer Category',
+    'hmcgl_card_no':             'HMCGL Card No',
+    'campaign':                  'Campaign',
+    'type_of_tax_pf':            'Type of Tax P&F',
+    'irn_number':                'IRN#',
+    'irn_status':                'IRN Status',
+    'ack_number':                'Ack#',
+    'credit_note_number':        'Credit Note# (Canc.>24h)',
+    'irn_cancel':                'IRN# (Canc.>24h)',
+    'irn_status_cancel':         'IRN Status (Canc.>24h)',
+    'ack_number_cancel':         'Ack# (Canc.>24h)',
+}
+_INVOICE_DECIMAL_FIELDS = {
+    'total_invoice_amount':         'Invoice Amount',
+    'round_off_amount':             'Round Off Amount',
+    'invoice_round_off_amount':     'Invoice Round Off Amount',
+    'short_amount':                 'Short Amount',
+    'realized_amount':              'Realized Amount',
+    'packaging_forwarding_charges': 'Packaging & Forwarding Charges',
+    'tax_on_pf':                    'Tax on Package & Forwarding',
+}
+_INVOICE_DATE_FIELDS = {
+    'invoice_date':      'Invoice Date',
+    'cancellation_date': 'Invoice Cancel Date',
+    'order_date':        'Order Date',
+    'ack_date':          'Ack Date',
+    'ack_date_cancel':   'Ack Date (Canc.>24h)',
+}
+
+
+def normalise_invoice_columns(df):
+    """Run the columnar normalisation stage for every column an invoice upload reads."""
+    date_report = {}
+    columns = normalise_columns(
+        df,
+        text=list(_INVOICE_TEXT_FIELDS.values()) + ['Code', 'Account Name'],
+        decimal=list(_INVOICE_DECIMAL_FIELDS.values()),
+        dates={col: INVOICE_DATE_FORMATS for col in _INVOICE_DATE_FIELDS.values()},
+        date_report=date_report,
+    )
+    logger.debug("Invoice date columns parsed", extra={'date_report': date_report})
+    return columns
+
 
-def process_invoice_dataframe(df, warehouse_id, company_id, user_id, upload_batch_id=None):
+def process_invoice_dataframe(df, warehouse_id, company_id, user_id, upload_batch_id=None,
+                              chunked=False):
     """
     Process a dataframe of invoice data and update order statuses.
 
+    chunked=True when df is one chunk of a larger upload committed chunk by
+    chunk: orders this batch already invoiced then accept further lines.
+
     Returns:
         dict with keys:
           invoices_processed  — invoice records created in DB
@@ -58,37 +131,58 @@ def process_invoice_dataframe(df, warehouse_id, company_id, user_id, upload_batc
                         'columns': df.columns.tolist()})
 
     # ── Phase 1: one-time DB lookups ─────────────────────────────────────────
+    columns = normalise_invoice_columns(df)
+    column_names = list(columns)
+
     bypass_types = invoice_repo.get_bypass_order_types()
     logger.debug("Loaded bypass order types", extra={'bypass_types': list(bypass_types)})
 
-    unique_order_ids = list({
-        str(row.get('Order #', '') or '').strip()
-        for _, row in df.iterrows()
-        if str(row.get('Order #', '') or '').strip()
-    })
-    potential_orders_map = order_repo.find_bulk_by_original_ids(unique_order_ids)
+    unique_order_ids = list({oid for oid in columns['Order #'] if oid})
+    potential_orders_map = order_repo.find_bulk_by_original_ids(unique_order_ids, as_records=True)
     logger.debug("Pre-fetched potential orders",
                  extra={'fetched': len(potential_orders_map), 'requested': len(unique_order_ids)})
 
+    unique_invoice_numbers = list({num for num in columns['Invoice #'] if num})
+    existing_invoice_numbers = invoice_repo.find_existing_invoice_numbers(
+        unique_invoice_numbers, upload_batch_id
+    )
+    logger.debug("Pre-fetched existing invoice numbers",
+                 extra={'existing': len(existing_invoice_numbers),
+                        'requested': len(unique_invoice_numbers)})
+
+    invoiced_in_batch = (
+        invoice_repo.find_original_ids_invoiced_in_batch(upload_batch_id, unique_order_ids)
+        if chunked else set()
+    )
+
+    dealer_ids = _resolve_dealers(columns, potential_orders_map, bypass_types, invoiced_in_batch)
+
     invoiced_state = order_repo.get_or_create_state('Invoiced', 'Invoice uploaded for order')
 
     # ── Phase 2: classify every row in memory (zero DB calls) ────────────────
-    invoices_to_create = []       # Invoice objects ready for bulk INSERT
+    invoices_to_create = []       # InvoiceRecords ready for bulk INSERT
     orders_to_invoice  = {}       # pot_order_id → PotentialOrder (deduped)
     orders_to_flag     = {}       # pot_order_id → PotentialOrder (deduped)
     dealer_backfills   = {}       # pot_order_id → dealer_id (for COALESCE update)
     error_rows         = []
     processed_order_ids = set()
 
-    for index, row in df.iterrows():
+    for index, values in zip(df.index, zip(*columns.values())):
+        row = dict(zip(column_names, values))
         try:
-            invoice_number    = str(row.get('Invoice #', '') or '').strip()
-            original_order_id = str(row.get('Order #', '') or '').strip()
+            invoice_number    = row['Invoice #'] or ''
+            original_order_id = row['Order #'] or ''
 
             if not invoice_number or not original_order_id:
                 error_rows.append(_make_error_row(row, original_order_id, "Missing Invoice # or Order #"))
                 continue
 
+            if invoice_number in existing_invoice_numbers:
+                error_rows.append(_make_error_row(
+                    row, original_order_id, f"Invoice {invoice_number} already exists"
+                ))
+                continue
+
             potential_order = potential_orders_map.get(original_order_id)
             if not potential_order:
                 error_rows.append(_make_error_row(
@@ -98,8 +192,9 @@ def process_invoice_dataframe(df, warehouse_id, company_id, user_id, upload_batc
                 continue
 
             current_status = potential_order.status
+            continues_batch = original_order_id in invoiced_in_batch
 
-            if OrderStateMachine.is_terminal(current_status):
+            if OrderStateMachine.is_terminal(current_status) and not continues_batch:
                 error_rows.append(_make_error_row(
                     row, original_order_id,
                     f"Order already invoiced (current status: '{current_status}'). "
@@ -107,11 +202,8 @@ def process_invoice_dataframe(df, warehouse_id, company_id, user_id, upload_batc
                 ))
                 continue
 
-            is_bypass = potential_order.order_type in bypass_types
-            is_packed = current_status == 'Packed'
-
-            if is_bypass or is_packed:
-                dealer_id = _resolve_dealer(row, index)
+            if _takes_invoice(potential_order, bypass_types, continues_batch):
+                dealer_id = dealer_ids.get(_dealer_pair(row['Code'], row['Account Name']))
 
                 if dealer_id and not potential_order.dealer_id:
                     dealer_backfills[potential_order.potential_order_id] = dealer_id
@@ -129,14 +221,13 @@ def process_invoice_dataframe(df, warehouse_id, company_id, user_id, upload_batc
                     )
                     invoices_to_create.append(invoice)
                 except Exception as e:
-                    reason = (
-                        f"Invoice {invoice_number} already exists"
-                        if '1062' in str(e) or 'Duplicate entry' in str(e)
-                        else f"Error preparing invoice: {str(e)}"
-                    )
-                    error_rows.append(_make_error_row(row, original_order_id, reason))
+                    error_rows.append(_make_error_row(
+                        row, original_order_id, f"Error preparing invoice: {str(e)}"
+                    ))
                     continue
 
+                if continues_batch:
+                    continue   # already Invoiced by an earlier chunk: the line is all that's new
                 if potential_order.potential_order_id not in processed_order_ids:
                     orders_to_invoice[potential_order.potential_order_id] = potential_order
                     processed_order_ids.add(potential_order.potential_order_id)
@@ -149,32 +240,84 @@ def process_invoice_dataframe(df, warehouse_id, company_id, user_id, upload_batc
                     processed_order_ids.add(potential_order.potential_order_id)
 
         except Exception as e:
-            original_order_id = str(row.get('Order #', '') or '').strip()
-            error_rows.append(_make_error_row(row, original_order_id, f"Unexpected error: {str(e)}"))
+            error_rows.append(_make_error_row(row, row['Order #'], f"Unexpected error: {str(e)}"))
             logger.exception("Unexpected error processing invoice row", extra={'row': index})
 
     # ── Phase 3: bulk DB writes via repositories ──────────────────────────────
-    invoices_saved = invoice_repo.bulk_insert_invoices(invoices_to_create)
-    invoice_repo.bulk_transition_to_invoiced(
-        orders_to_invoice, dealer_backfills, invoiced_state.state_id, user_id, current_time
-    )
-    invoice_repo.bulk_migrate_products_to_order(orders_to_invoice, current_time)
-    invoice_repo.bulk_flag_orders(orders_to_flag, current_time)
+    # Orders are written in chunks, each inside a savepoint: a chunk that fails
+    # is rolled back on its own and reported as error rows, while the chunks
+    # already written stay in the upload's transaction.
+    invoices_by_order = {}
+    for invoice in invoices_to_create:
+        invoices_by_order.setdefault(invoice.potential_order_id, []).append(invoice)
+
+    invoices_saved  = 0
+    orders_invoiced = 0
+    for chunk_ids in iter_chunks(orders_to_invoice):
+        chunk_orders   = {pot_id: orders_to_invoice[pot_id] for pot_id in chunk_ids}
+        chunk_invoices = [inv for pot_id in chunk_ids for inv in invoices_by_order.get(pot_id, [])]
+        try:
+            with mysql_manager.savepoint():
+                saved = invoice_repo.bulk_insert_invoices(chunk_invoices)
+                invoice_repo.bulk_transition_to_invoiced(
+                    chunk_orders, dealer_backfills, invoiced_state.state_id, user_id, current_time
+                )
+                invoice_repo.bulk_migrate_products_to_order(chunk_orders, current_time)
+        except Exception as e:
+            logger.exception("Invoice write chunk failed", extra={'orders': len(chunk_orders)})
+            error_rows.extend(
+                {'order_id': inv.original_order_id, 'name': inv.cash_customer_name or '',
+                 'reason': f"Database error while saving invoice {inv.invoice_number}: {str(e)}"}
+                for inv in chunk_invoices
+            )
+            continue
+        invoices_saved  += saved
+        orders_invoiced += len(chunk_orders)
+
+    # Further lines for orders an earlier chunk of this batch invoiced.
+    extra_lines = [inv for inv in invoices_to_create if inv.potential_order_id not in orders_to_invoice]
+    for chunk in iter_chunks(extra_lines):
+        try:
+            with mysql_manager.savepoint():
+                invoices_saved += invoice_repo.bulk_insert_invoices(chunk)
+        except Exception as e:
+            logger.exception("Invoice line chunk failed", extra={'invoices': len(chunk)})
+            error_rows.extend(
+                {'order_id': inv.original_order_id, 'name': inv.cash_customer_name or '',
+                 'reason': f"Database error while saving invoice {inv.invoice_number}: {str(e)}"}
+                for inv in chunk
+            )
+
+    orders_flagged = 0
+    for chunk_ids in iter_chunks(orders_to_flag):
+        chunk_orders = {pot_id: orders_to_flag[pot_id] for pot_id in chunk_ids}
+        try:
+            with mysql_manager.savepoint():
+                invoice_repo.bulk_flag_orders(chunk_orders, current_time)
+        except Exception as e:
+            logger.exception("Invoice flag chunk failed", extra={'orders': len(chunk_orders)})
+            error_rows.extend(
+                {'order_id': po.original_order_id, 'name': '',
+                 'reason': f"Database error while flagging order: {str(e)}"}
+                for po in chunk_orders.values()
+            )
+            continue
+        orders_flagged += len(chunk_orders)
 
     logger.info(
         "Invoice processing complete",
         extra={
             'invoices_created': invoices_saved,
-            'orders_invoiced': len(orders_to_invoice),
-            'orders_flagged': len(orders_to_flag),
+            'orders_invoiced': orders_invoiced,
+            'orders_flagged': orders_flagged,
             'error_count': len(error_rows),
         }
     )
 
     return {
         'invoices_processed': invoices_saved,
-        'orders_invoiced': len(orders_to_invoice),
-        'orders_flagged': len(orders_to_flag),
+        'orders_invoiced': orders_invoiced,
+        'orders_flagged': orders_flagged,
         'error_rows': error_rows,
     }
 
@@ -238,156 +381,81 @@ def update_order_to_invoiced(potential_order, user_id):
 # ─────────────────────────────────────────────────────────────────────────────
 
 def _make_error_row(row, order_id, reason):
-    name = str(row.get('Account Name', '') or row.get('Cash Customer Name', '') or '').strip()
+    name = row.get('Account Name') or row.get('Cash Customer Name') or ''
     return {'order_id': order_id or '', 'name': name, 'reason': reason}
 
 
-def _resolve_dealer(row, index):
-    """Look up or create dealer from invoice row's Code + Account Name."""
-    dealer_code  = str(row.get('Code', '') or '').strip() or None
-    account_name = str(row.get('Account Name', '') or '').strip() or None
+def _takes_invoice(potential_order, bypass_types, continues_batch):
+    """True when the order's rows become invoice records (rules 1, 2 and the chunked exception)."""
+    if continues_batch:
+        return True
+    if OrderStateMachine.is_terminal(potential_order.status):
+        return False
+    return potential_order.order_type in bypass_types or potential_order.status == 'Packed'
+
+
+def _dealer_pair(dealer_code, account_name):
+    """(code, name) key of an invoice row's dealer — the name falls back to the code."""
+    return dealer_code, account_name or dealer_code
+
 
-    if not dealer_code and not account_name:
-        logger.debug("No dealer Code or Account Name — invoice saved without dealer link",
-                     extra={'row': index})
-        return None
+def _resolve_dealers(columns, potential_orders_map, bypass_types, invoiced_in_batch):
+    """
+    Look up or create, in bulk, the dealer of every row that will get an
+    invoice record.
+
+    Returns:
+        dict mapping _dealer_pair(Code, Account Name) → dealer_id. Empty when
+        resolution fails — the invoices are then saved without a dealer link.
+    """
+    pairs = set()
+    for invoice_number, order_id, dealer_code, account_name in zip(
+            columns['Invoice #'], columns['Order #'], columns['Code'], columns['Account Name']):
+        potential_order = potential_orders_map.get(order_id)
+        if (invoice_number and potential_order and (dealer_code or account_name)
+                and _takes_invoice(potential_order, bypass_types, order_id in invoiced_in_batch)):
+            pairs.add(_dealer_pair(dealer_code, account_name))
+    if not pairs:
+        return {}
 
     try:
-        return get_or_create_dealer(dealer_name=account_name or dealer_code, dealer_code=dealer_code)
+        dealer_ids = get_or_create_coded_dealers(pairs)
     except Exception as e:
-        logger.warning("Error resolving dealer",
-                       extra={'row': index, 'dealer_code': dealer_code, 'error': str(e)})
-        return None
+        logger.warning("Error resolving dealers — invoices saved without dealer link",
+                       extra={'dealers': len(pairs), 'error': str(e)})
+        return {}
+    logger.debug("Resolved invoice dealers", extra={'dealers': len(dealer_ids)})
+    return dealer_ids
 
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Invoice record creation (pure Python — returns an unsaved Invoice object)
+# Invoice record creation (pure Python — returns an unsaved InvoiceRecord)
 # ─────────────────────────────────────────────────────────────────────────────
 
 def create_invoice_from_row(row, potential_order_id, warehouse_id, company_id,
                              dealer_id, user_id, upload_batch_id):
     """
-    Create an Invoice object from a DataFrame row.
-    Do not call .save() — pass the object to invoice_repo.bulk_insert_invoices() instead.
-    """
-    from decimal import Decimal, InvalidOperation
-    import pandas as pd
+    Create an InvoiceRecord from one normalised row.
 
+    Args:
+        row: dict mapping upload column → value already normalised by
+             normalise_invoice_columns() (stripped text or None, Decimal,
+             datetime).
+
+    Pass the record to invoice_repo.bulk_insert_invoices().
+    """
     current_time = datetime.utcnow()
 
-    def safe_decimal(value, default=None):
-        if value is None or value == '':
-            return default
-        try:
-            str_value = str(value).strip()
-            if str_value.lower() in ['nan', 'none', 'null', '']:
-                return default
-            return Decimal(str_value.replace(',', ''))
-        except (InvalidOperation, ValueError, TypeError):
-            return default
-
-    def safe_string(value, default='', max_length=None):
-        if value is None:
-            return default
-        try:
-            if pd.isna(value):
-                return default
-        except (TypeError, ValueError):
-            pass
-        try:
-            str_value = str(value).strip()
-            if str_value.lower() in ['nan', 'none', 'null']:
-                return default
-            if max_length and len(str_value) > max_length:
-                return str_value[:max_length]
-            return str_value
-        except (TypeError, AttributeError):
-            return default
-
-    def safe_date(value):
-        if value is None or value == '':
-            return None
-        try:
-            if pd.isna(value):
-                return None
-        except (TypeError, ValueError):
-            pass
-        try:
-            str_value = str(value).strip()
-            if str_value.lower() in ['nan', 'none', 'null', '']:
-                return None
-            if isinstance(value, str):
-                for fmt in ('%d-%b-%Y', '%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y',
-                            '%Y-%m-%d %H:%M:%S', '%d/%m/%Y %I:%M:%S %p'):
-                    try:
-                        return datetime.strptime(str_value, fmt)
-                    except ValueError:
-                        continue
-                parsed = pd.to_datetime(str_value, errors='coerce')
-                return parsed.to_pydatetime() if not pd.isna(parsed) else None
-            elif hasattr(value, 'year'):
-                return value
-        except Exception:
-            pass
-        return None
-
-    def sg(key, default=None):
-        """Safe row.get with NaN guard."""
-        val = row.get(key, default)
-        try:
-            if pd.isna(val):
-                return default
-        except (TypeError, ValueError):
-            pass
-        return val
+    fields = {attr: row.get(col) or '' for attr, col in _INVOICE_TEXT_FIELDS.items()}
+    fields.update({attr: row.get(col) for attr, col in _INVOICE_DECIMAL_FIELDS.items()})
+    fields.update({attr: row.get(col) for attr, col in _INVOICE_DATE_FIELDS.items()})
 
-    return Invoice(
+    return InvoiceRecord(
         potential_order_id=potential_order_id,
         warehouse_id=warehouse_id,
         company_id=company_id,
         dealer_id=dealer_id,
-
-        invoice_number=safe_string(sg('Invoice #'), ''),
-        original_order_id=safe_string(sg('Order #'), ''),
-        invoice_date=safe_date(sg('Invoice Date')),
-        invoice_type=safe_string(sg('Invoice Type'), ''),
-        cancellation_date=safe_date(sg('Invoice Cancel Date')),
-        total_invoice_amount=safe_decimal(sg('Invoice Amount')),
-        invoice_header_type=safe_string(sg('Invoice Header Type'), ''),
-
-        order_date=safe_date(sg('Order Date')),
-        b2b_purchase_order_number=safe_string(sg('B2B Purchase Order #'), ''),
-        b2b_order_type=safe_string(sg('B2B Order Type'), ''),
-
-        account_tin=safe_string(sg('Account TIN#'), ''),
-        cash_customer_name=safe_string(sg('Cash Customer Name'), ''),
-        contact_first_name=safe_string(sg('Contact First Name'), ''),
-        contact_last_name=safe_string(sg('Contact Last Name'), ''),
-        customer_category=safe_string(sg('Customer Category'), ''),
-
-        round_off_amount=safe_decimal(sg('Round Off Amount')),
-        invoice_round_off_amount=safe_decimal(sg('Invoice Round Off Amount')),
-        short_amount=safe_decimal(sg('Short Amount')),
-        realized_amount=safe_decimal(sg('Realized Amount')),
-
-        hmcgl_card_no=safe_string(sg('HMCGL Card No'), ''),
-        campaign=safe_string(sg('Campaign'), ''),
-
-        packaging_forwarding_charges=safe_decimal(sg('Packaging & Forwarding Charges')),
-        tax_on_pf=safe_decimal(sg('Tax on Package & Forwarding')),
-        type_of_tax_pf=safe_string(sg('Type of Tax P&F'), ''),
-
-        irn_number=safe_string(sg('IRN#'), ''),
-        irn_status=safe_string(sg('IRN Status'), ''),
-        ack_number=safe_string(sg('Ack#'), ''),
-        ack_date=safe_date(sg('Ack Date')),
-
-        credit_note_number=safe_string(sg('Credit Note# (Canc.>24h)'), ''),
-        irn_cancel=safe_string(sg('IRN# (Canc.>24h)'), ''),
-        irn_status_cancel=safe_string(sg('IRN Status (Canc.>24h)'), ''),
-        ack_number_cancel=safe_string(sg('Ack# (Canc.>24h)'), ''),
-        ack_date_cancel=safe_date(sg('Ack Date (Canc.>24h)')),
-
+        **fields,
         uploaded_by=user_id,
         upload_batch_id=upload_batch_id,
         created_at=current_time,
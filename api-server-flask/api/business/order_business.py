@@ -6,19 +6,53 @@ One row = one order (no product rows).
 
 from datetime import datetime
 from ..models import PotentialOrder, Order
+from ..db_manager import mysql_manager, iter_chunks
 from . import dealer_business
 from .order_state_machine import OrderStateMachine
 from ..constants.order_states import OrderStatus
 from ..repositories import order_repo
+from ..utils.upload_utils import text_column, integer_column, date_column
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Submit Date formats, preferred day/month order first.
+ORDER_DATE_FORMATS = (
+    '%d/%m/%Y %I:%M:%S %p',  # 03/04/2026 08:59:37 AM (new format)
+    '%d/%m/%Y %H:%M:%S',
+    '%Y-%m-%d',
+    '%d/%m/%Y',
+    '%m/%d/%Y',
+)
+
+
+# Upload column → PotentialOrder attribute for the plain text fields.
+_ORDER_TEXT_COLUMNS = {
+    'Sales Order #':      'original_order_id',
+    'Purchaser Name':     'purchaser_name',
+    'B2B PO#':            'b2b_po_number',
+    'Order Type':         'order_type',
+    'Invoice # / VIN #':  'vin_number',
+    'Shipping Address':   'shipping_address',
+    'Created By':         'source_created_by',
+    'Purchaser SAP Code': 'purchaser_sap_code',
+}
+
 
 def process_order_dataframe(df, warehouse_id, company_id, user_id, upload_batch_id=None):
     """
     Process a dataframe of order data (new format: one row = one order).
 
+    Runs in three phases like the invoice and product uploads:
+      Phase 1 — column-wise extraction (Submit Date parsed once per column)
+                + one IN query for orders that already exist.
+      Phase 2 — pure Python: reject blank / duplicate Sales Order #s.
+      Phase 3 — one bulk dealer resolve, then per chunk of WRITE_CHUNK_SIZE
+                orders (each in a savepoint): multi-row INSERT into
+                potential_order (ids taken from its LAST_INSERT_ID block),
+                bulk Open state history INSERT.
+    Total DB round-trips: ~5 + 4 per chunk regardless of row count.
+
     Args:
         df: Pandas DataFrame with order data
         warehouse_id: Warehouse ID
@@ -29,79 +63,85 @@ def process_order_dataframe(df, warehouse_id, company_id, user_id, upload_batch_
     Returns:
         dict: Processing results
     """
+    current_time = datetime.utcnow()
     orders_processed = 0
     error_rows = []
 
     logger.debug("Processing DataFrame", extra={'row_count': len(df), 'columns': df.columns.tolist()})
 
-    for index, row in df.iterrows():
-        try:
+    # ── Phase 1: column-wise extraction + existing-order lookup ──────────────
+    columns = {attr: text_column(df, col) for col, attr in _ORDER_TEXT_COLUMNS.items()}
+    date_report = {}
+    submit_dates = date_column(df, 'Submit Date', ORDER_DATE_FORMATS, report=date_report)
+    if date_report.get('Submit Date', {}).get('failed'):
+        logger.warning("Unparseable Submit Date values — using current date",
+                       extra={'date_report': date_report})
+    records = [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    existing_ids = order_repo.find_existing_original_ids(
+        list({r['original_order_id'] for r in records if r['original_order_id']})
+    )
 
-            # --- Required field ---
-            sales_order_id = str(row.get('Sales Order #', '') or '').strip()
-            purchaser_name = str(row.get('Purchaser Name', '') or '').strip() or None
+    # ── Phase 2: classify rows in memory (zero DB calls) ─────────────────────
+    new_orders = []
+    seen_ids = set()
+    for index, record, submit_date in zip(df.index, records, submit_dates):
+        sales_order_id = record['original_order_id']
+        purchaser_name = record['purchaser_name']
 
-            if not sales_order_id:
-                error_rows.append(_make_error_row('', purchaser_name, f"Row {index}: Missing Sales Order #"))
-                continue
+        if not sales_order_id:
+            error_rows.append(_make_error_row('', purchaser_name, f"Row {index}: Missing Sales Order #"))
+            continue
+        if sales_order_id in existing_ids or sales_order_id in seen_ids:
+            error_rows.append(_make_error_row(sales_order_id, purchaser_name,
+                                              f"Order {sales_order_id} already exists"))
+            continue
+        seen_ids.add(sales_order_id)
+
+        new_orders.append(PotentialOrder(
+            **record,
+            warehouse_id=warehouse_id,
+            company_id=company_id,
+            order_date=submit_date or datetime.now(),
+            requested_by=user_id,
+            status='Open',
+            upload_batch_id=upload_batch_id,
+            created_at=current_time,
+            updated_at=current_time,
+        ))
+
+    if not new_orders:
+        logger.info("Order processing complete", extra={'orders_processed': 0, 'error_count': len(error_rows)})
+        return {'orders_processed': 0, 'error_rows': error_rows}
+
+    # ── Phase 3: bulk DB writes ──────────────────────────────────────────────
+    try:
+        dealer_ids = dealer_business.get_or_create_dealers(po.purchaser_name for po in new_orders)
+    except Exception as e:
+        logger.warning("Error resolving dealers — orders created without dealer", extra={'error': str(e)})
+        dealer_ids = {}
+    for po in new_orders:
+        if po.purchaser_name:
+            po.dealer_id = dealer_ids.get(po.purchaser_name.lower())
 
-            # --- New columns ---
-            b2b_po_number     = str(row.get('B2B PO#', '') or '').strip() or None
-            order_type        = str(row.get('Order Type', '') or '').strip() or None
-            vin_number        = str(row.get('Invoice # / VIN #', '') or '').strip() or None
-            shipping_address  = str(row.get('Shipping Address', '') or '').strip() or None
-            source_created_by = str(row.get('Created By', '') or '').strip() or None
-            purchaser_sap_code = str(row.get('Purchaser SAP Code', '') or '').strip() or None
-
-            # --- Date ---
-            order_date_str = row.get('Submit Date')
-            order_date = parse_order_date(order_date_str, index)
-
-            # --- Dealer (lookup/create by Purchaser Name only during order upload) ---
-            dealer_id = None
-            if purchaser_name:
-                try:
-                    dealer_id = dealer_business.get_or_create_dealer(purchaser_name)
-                    logger.debug("Resolved dealer", extra={'row': index, 'dealer_id': dealer_id})
-                except Exception as e:
-                    logger.warning("Error resolving dealer", extra={'row': index, 'error': str(e)})
-            else:
-                logger.debug("No Purchaser Name — order created without dealer", extra={'row': index})
-
-            # --- Create order ---
-            try:
-                potential_order_id = create_potential_order(
-                    original_order_id=sales_order_id,
-                    b2b_po_number=b2b_po_number,
-                    order_type=order_type,
-                    vin_number=vin_number,
-                    shipping_address=shipping_address,
-                    source_created_by=source_created_by,
-                    purchaser_sap_code=purchaser_sap_code,
-                    purchaser_name=purchaser_name,
-                    warehouse_id=warehouse_id,
-                    company_id=company_id,
-                    dealer_id=dealer_id,
-                    order_date=order_date,
-                    user_id=user_id,
-                    upload_batch_id=upload_batch_id
-                )
-                orders_processed += 1
-                logger.debug("Order created", extra={'row': index, 'order_id': potential_order_id, 'sales_order': sales_order_id})
-            except Exception as e:
-                if '1062' in str(e) or 'Duplicate entry' in str(e):
-                    reason = f"Order {sales_order_id} already exists"
-                else:
-                    reason = f"Error creating order: {str(e)}"
-                error_rows.append(_make_error_row(sales_order_id, purchaser_name, reason))
-                continue
+    open_state = order_repo.get_or_create_state('Open', 'Order is open and ready for processing')
 
+    for chunk in iter_chunks(new_orders):
+        try:
+            with mysql_manager.savepoint():
+                inserted = order_repo.bulk_insert_potential_orders(chunk)
+                order_repo.bulk_create_state_history([
+                    (po.potential_order_id, open_state.state_id, user_id, current_time)
+                    for po in chunk
+                ])
         except Exception as e:
-            sales_order_id = str(row.get('Sales Order #', '') or '').strip()
-            purchaser_name = str(row.get('Purchaser Name', '') or '').strip()
-            error_rows.append(_make_error_row(sales_order_id, purchaser_name, f"Unexpected error: {str(e)}"))
-            logger.exception("Unexpected error processing row", extra={'row': index})
+            logger.exception("Order write chunk failed", extra={'orders': len(chunk)})
+            error_rows.extend(
+                _make_error_row(po.original_order_id, po.purchaser_name, f"Error creating order: {str(e)}")
+                for po in chunk
+            )
             continue
+        orders_processed += inserted
 
     logger.info("Order processing complete", extra={'orders_processed': orders_processed, 'error_count': len(error_rows)})
 
@@ -115,80 +155,6 @@ def _make_error_row(order_id, name, reason):
     return {'order_id': order_id or '', 'name': name or '', 'reason': reason}
 
 
-def parse_order_date(order_date_str, row_index=None):
-    """Parse order date from various formats. Returns datetime.now() on failure."""
-    try:
-        if isinstance(order_date_str, str) and order_date_str.strip():
-            date_formats = [
-                '%d/%m/%Y %I:%M:%S %p',  # 03/04/2026 08:59:37 AM (new format)
-                '%d/%m/%Y %H:%M:%S',
-                '%Y-%m-%d',
-                '%d/%m/%Y',
-                '%m/%d/%Y',
-            ]
-            for fmt in date_formats:
-                try:
-                    return datetime.strptime(order_date_str.strip(), fmt)
-                except ValueError:
-                    continue
-            try:
-                from dateutil import parser
-                return parser.parse(order_date_str)
-            except Exception:
-                raise ValueError(f"Unrecognized date format: {order_date_str}")
-        else:
-            if hasattr(order_date_str, 'year'):
-                return order_date_str
-            return datetime.now()
-    except Exception as e:
-        logger.warning("Could not parse date, using current date", extra={'row': row_index, 'raw_value': str(order_date_str), 'error': str(e)})
-        return datetime.now()
-
-
-def create_potential_order(original_order_id, b2b_po_number, order_type, vin_number,
-                           shipping_address, source_created_by, purchaser_sap_code,
-                           purchaser_name, warehouse_id, company_id, dealer_id,
-                           order_date, user_id, upload_batch_id=None):
-    """Create a new potential order — MySQL implementation."""
-    current_time = datetime.utcnow()
-
-    logger.debug("Creating potential order", extra={'original_order_id': original_order_id, 'warehouse_id': warehouse_id, 'company_id': company_id})
-
-    potential_order = PotentialOrder(
-        original_order_id=original_order_id,
-        b2b_po_number=b2b_po_number,
-        order_type=order_type,
-        vin_number=vin_number,
-        shipping_address=shipping_address,
-        source_created_by=source_created_by,
-        purchaser_sap_code=purchaser_sap_code,
-        purchaser_name=purchaser_name,
-        warehouse_id=warehouse_id,
-        company_id=company_id,
-        dealer_id=dealer_id,
-        order_date=order_date,
-        requested_by=user_id,
-        status='Open',
-        upload_batch_id=upload_batch_id,
-        created_at=current_time,
-        updated_at=current_time
-    )
-    potential_order.save()
-    potential_order_id = potential_order.potential_order_id
-    logger.debug("Potential order created", extra={'potential_order_id': potential_order_id})
-
-    # Create initial Open state history
-    try:
-        initial_state = order_repo.get_or_create_state('Open', 'Order is open and ready for processing')
-        order_repo.create_state_history(potential_order_id, initial_state.state_id, user_id, current_time)
-        logger.debug("State history created", extra={'potential_order_id': potential_order_id})
-    except Exception as e:
-        logger.warning("Error creating state history", extra={'potential_order_id': potential_order_id, 'error': str(e)})
-        # Don't fail order creation if state history fails
-
-    return potential_order_id
-
-
 # ---------------------------------------------------------------------------
 # Bulk status update (from Excel file upload on Manage Orders page)
 # ---------------------------------------------------------------------------
@@ -232,11 +198,9 @@ def process_bulk_status_update(df, target_status, _warehouse_id, _company_id, us
     # Pre-fetch all PotentialOrders in one query instead of N queries.    #
     # Also pre-load OrderState objects so we don't hit the DB per row.    #
     # ------------------------------------------------------------------ #
-    all_order_ids = [
-        str(row.get('Order ID', '') or '').strip()
-        for _, row in df.iterrows()
-    ]
-    all_order_ids = [oid for oid in all_order_ids if oid]
+    order_ids   = text_column(df, 'Order ID', default='')
+    box_counts  = integer_column(df, 'Number of Boxes') if needs_boxes else [None] * len(df)
+    all_order_ids = [oid for oid in order_ids if oid]
     potential_orders_map = order_repo.find_bulk_by_original_ids(all_order_ids)
 
     # Pre-load/create the target OrderState once
@@ -246,8 +210,7 @@ def process_bulk_status_update(df, target_status, _warehouse_id, _company_id, us
     if needs_boxes:
         invoiced_state = order_repo.get_or_create_state('Invoiced', 'Invoice uploaded for order')
 
-    for index, row in df.iterrows():
-        original_order_id = str(row.get('Order ID', '') or '').strip()
+    for original_order_id, raw_boxes in zip(order_ids, box_counts):
         if not original_order_id:
             error_rows.append({'order_id': '', 'name': '', 'reason': 'Missing Order ID'})
             continue
@@ -276,12 +239,8 @@ def process_bulk_status_update(df, target_status, _warehouse_id, _company_id, us
         # Parse number_of_boxes when needed
         number_of_boxes = 1
         if needs_boxes:
-            raw = str(row.get('Number of Boxes', '') or '').strip()
-            try:
-                number_of_boxes = int(float(raw))
-                if number_of_boxes < 1:
-                    raise ValueError()
-            except Exception:
+            number_of_boxes = raw_boxes
+            if number_of_boxes is None or number_of_boxes < 1:
                 error_rows.append({
                     'order_id': original_order_id, 'name': dealer_name,
                     'reason': 'Invalid or missing "Number of Boxes" (must be a positive integer)'
@@ -368,3 +327,145 @@ def process_bulk_status_update(df, target_status, _warehouse_id, _company_id, us
             })
 
     return {'orders_processed': orders_processed, 'error_rows': error_rows}
+
+
+# Bulk-export template: state history descriptions by target
+_TEMPLATE_STATE_DESCRIPTIONS = {
+    OrderStatus.INVOICED:  'Order invoiced and ready for dispatch',
+    OrderStatus.COMPLETED: 'Order completed and dispatched',
+}
+
+
+def process_bulk_import(rows, user_id):
+    """
+    Apply the status changes filled into the bulk-export template
+    (POST /api/orders/bulk-import).
+
+    Three phases, like the uploads:
+      1. Parse    — every row is checked against OrderStateMachine.TEMPLATE_TRANSITIONS
+      2. Fetch    — the referenced orders (and Order records for completions)
+                    in chunked IN queries, then checked in memory
+      3. Write    — per target state one set-based UPDATE, multi-row INSERTs
+                    for Order records and state history, in one transaction
+
+    Args:
+        rows: template data rows — (order id, customer, current status, expected status, ...)
+
+    Returns:
+        {'moved': [...], 'skipped': [...], 'errors': [...]}
+    """
+    moved, skipped, errors = [], [], []
+
+    # ── Phase 1: parse ───────────────────────────────────────────────────────
+    requested = {}   # potential_order_id → (order_id, current slug, target OrderStatus)
+    for row in rows:
+        order_id        = str(row[0] or '').strip() if row[0] else ''
+        current_status  = str(row[2] or '').strip().lower()
+        expected_status = str(row[3] or '').strip().lower()
+
+        if not order_id:
+            continue
+
+        if not expected_status:
+            skipped.append({'order_id': order_id, 'reason': 'No expected status provided'})
+            continue
+
+        if current_status == expected_status:
+            skipped.append({'order_id': order_id, 'reason': 'Status unchanged'})
+            continue
+
+        if current_status == 'invoiced' and expected_status == 'dispatch-ready':
+            errors.append({
+                'order_id': order_id,
+                'reason': 'invoiced → dispatch-ready is not allowed here. Use the Invoice Upload tab.'
+            })
+            continue
+
+        try:
+            target = OrderStateMachine.template_target(OrderStatus.from_frontend_slug(current_status))
+        except ValueError:
+            target = None
+        if target is None or target.to_frontend_slug() != expected_status:
+            valid_next = target.to_frontend_slug() if target else 'none'
+            errors.append({
+                'order_id': order_id,
+                'reason': f'Invalid transition: {current_status} → {expected_status}. Valid next: {valid_next}'
+            })
+            continue
+
+        try:
+            numeric_id = int(order_id.replace('PO', ''))
+        except ValueError:
+            errors.append({'order_id': order_id, 'reason': 'Invalid order ID format'})
+            continue
+
+        if numeric_id in requested:
+            errors.append({'order_id': order_id, 'reason': 'Order appears more than once in the file'})
+            continue
+        requested[numeric_id] = (order_id, current_status, target)
+
+    # ── Phase 2: fetch and validate ──────────────────────────────────────────
+    potential_orders = order_repo.find_bulk_by_ids(list(requested))
+    final_orders = order_repo.find_orders_by_potential_ids([
+        pot_id for pot_id, (_, _, target) in requested.items()
+        if target == OrderStatus.COMPLETED and pot_id in potential_orders
+    ])
+
+    by_target = {}   # OrderStatus → [(potential_order, order_id, current slug)]
+    for pot_id, (order_id, current_status, target) in requested.items():
+        potential_order = potential_orders.get(pot_id)
+        if not potential_order:
+            errors.append({'order_id': order_id, 'reason': 'Order not found'})
+            continue
+
+        db_current = potential_order.status.lower().replace(' ', '-')
+        if db_current != current_status:
+            errors.append({
+                'order_id': order_id,
+                'reason': f'Status mismatch: DB has "{db_current}", Excel shows "{current_status}"'
+            })
+            continue
+
+        if target == OrderStatus.COMPLETED and pot_id not in final_orders:
+            errors.append({'order_id': order_id,
+                           'reason': 'No final order found for dispatch-ready order'})
+            continue
+
+        by_target.setdefault(target, []).append((potential_order, order_id, current_status))
+
+    # ── Phase 3: write, grouped by target state ──────────────────────────────
+    current_time = datetime.utcnow()
+    ts_str = current_time.strftime('%Y%m%d%H%M')
+    history_rows = []
+    with mysql_manager.unit_of_work():
+        for target, entries in by_target.items():
+            pot_ids = [po.potential_order_id for po, _, _ in entries]
+            state = order_repo.get_or_create_state(
+                target.value, _TEMPLATE_STATE_DESCRIPTIONS.get(target, f'Order moved to {target.value}')
+            )
+
+            if target == OrderStatus.INVOICED:
+                order_repo.bulk_create_orders([
+                    (po.potential_order_id, f"ORD-{po.potential_order_id}-{ts_str}",
+                     'Dispatch Ready', po.box_count, current_time)
+                    for po, _, _ in entries
+                ])
+            elif target == OrderStatus.COMPLETED:
+                order_repo.bulk_complete_orders(
+                    [final_orders[pot_id].order_id for pot_id in pot_ids], current_time
+                )
+
+            order_repo.bulk_set_status(pot_ids, target.value, current_time)
+            history_rows.extend((pot_id, state.state_id, user_id, current_time) for pot_id in pot_ids)
+
+            for po, order_id, current_status in entries:
+                entry = {'order_id': order_id, 'from': current_status, 'to': target.to_frontend_slug()}
+                if target == OrderStatus.INVOICED:
+                    entry['boxes'] = po.box_count
+                moved.append(entry)
+
+        order_repo.bulk_create_state_history(history_rows)
+
+    logger.info("Bulk import applied", extra={'moved': len(moved), 'skipped': len(skipped),
+                                              'errors': len(errors)})
+    return {'moved': moved, 'skipped': skipped, 'errors': errors}
@@ -29,6 +29,9 @@ class OrderStateMachine:
     • BULK_TRANSITIONS  : forward-only chain used by the Excel bulk-upload endpoint.
       Only these transitions are valid when updating orders from a CSV file.
 
+    • TEMPLATE_TRANSITIONS : the bulk-export template (/api/orders/bulk-import) —
+      BULK_TRANSITIONS plus Packed → Invoiced.
+
     • SINGLE_ORDER_TRANSITIONS : valid targets for the per-order status update endpoint.
       Includes the Picking → Open back-transition that was in the original route-layer dict.
 
@@ -49,6 +52,13 @@ class OrderStateMachine:
     # Reverse lookup: target → required source (used by bulk-status-update business logic)
     _SOURCE_FOR_TARGET: dict = {v: k for k, v in BULK_TRANSITIONS.items()}
 
+    # ── Bulk-export template transitions (key = current → value = allowed target) ─
+    # Packed → Invoiced creates the Order record without an invoice upload.
+    TEMPLATE_TRANSITIONS: dict = {
+        **BULK_TRANSITIONS,
+        OrderStatus.PACKED: OrderStatus.INVOICED,
+    }
+
     # ── Per-order transitions (used by individual order status update endpoint) ─
     # This DIFFERS from BULK_TRANSITIONS — it allows the Picking → Open back-transition.
     SINGLE_ORDER_TRANSITIONS: dict = {
@@ -86,6 +96,11 @@ class OrderStateMachine:
         """True when a bulk-upload can move an order from `current` to `target`."""
         return cls.BULK_TRANSITIONS.get(current) == target
 
+    @classmethod
+    def template_target(cls, current: OrderStatus) -> 'OrderStatus | None':
+        """The status the bulk-export template may move an order in `current` to, or None."""
+        return cls.TEMPLATE_TRANSITIONS.get(current)
+
     @classmethod
     def can_single_transition(cls, current: OrderStatus, target: OrderStatus) -> bool:
         """True when a single-order endpoint can move an order from `current` to `target`."""
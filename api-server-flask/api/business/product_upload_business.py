@@ -5,7 +5,8 @@ Product Upload Business Logic for MySQL.
 Performance design
 ──────────────────
 process_product_upload_dataframe runs in three phases:
-  Phase 1 — two DB calls (via repositories):
+  Phase 1 — columnar normalisation of the four used columns, then
+             two DB calls (via repositories):
              1. Bulk pre-fetch all potential orders by Order #
              2. Bulk pre-fetch all existing products by Part #
   Phase 2 — pure Python: classify every row against in-memory maps (zero DB calls).
@@ -14,18 +15,23 @@ process_product_upload_dataframe runs in three phases:
              2. Re-fetch newly inserted product IDs
              3. DELETE existing potential_order_product rows for affected orders (replace mode)
              4. INSERT new potential_order_product rows via executemany
-Total DB round-trips: ~5 regardless of row count.
+             Steps 3+4 run per chunk of WRITE_CHUNK_SIZE orders, each in a savepoint.
+             In a chunked (resumable) upload an order's lines are replaced only
+             the first time the upload reaches it; later chunks append.
+Total DB round-trips: ~5 regardless of row count (+2 per extra chunk).
 """
 
 from datetime import datetime
 
+from ..db_manager import mysql_manager, iter_chunks
 from ..repositories import order_repo, product_repo
+from ..utils.upload_utils import normalise_columns
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-def process_product_upload_dataframe(df, _company_id, _user_id, _upload_batch_id=None):
+def process_product_upload_dataframe(df, _company_id, _user_id, _upload_batch_id=None, run_state=None):
     """
     Process a dataframe of product data and link products to orders.
 
@@ -36,6 +42,8 @@ def process_product_upload_dataframe(df, _company_id, _user_id, _upload_batch_id
         _company_id:      Company ID (part of uniform upload API; not used in SQL)
         _user_id:         User performing the upload (part of uniform upload API; not used in SQL)
         _upload_batch_id: Upload batch tracking ID (part of uniform upload API; not used in SQL)
+        run_state:        State shared by the chunks of one chunked upload (see
+                          remember_product_lines); None for a single-frame upload
 
     Returns:
         dict: { products_processed, orders_updated, error_rows }
@@ -43,19 +51,13 @@ def process_product_upload_dataframe(df, _company_id, _user_id, _upload_batch_id
     current_time = datetime.utcnow()
 
     # ── Phase 1: bulk DB lookups ──────────────────────────────────────────────
-    unique_order_ids = list({
-        str(row.get('Order #', '') or '').strip()
-        for _, row in df.iterrows()
-        if str(row.get('Order #', '') or '').strip()
-    })
-
-    unique_part_numbers = list({
-        str(row.get('Part #', '') or '').strip()
-        for _, row in df.iterrows()
-        if str(row.get('Part #', '') or '').strip()
-    })
-
-    orders_map = order_repo.find_bulk_by_original_ids(unique_order_ids)
+    columns = normalise_columns(
+        df, text=('Order #', 'Part #', 'Part Description'), integer=('Reserved Qty',)
+    )
+    unique_order_ids    = list({oid for oid in columns['Order #'] if oid})
+    unique_part_numbers = list({part for part in columns['Part #'] if part})
+
+    orders_map = order_repo.find_bulk_by_original_ids(unique_order_ids, as_records=True)
     logger.debug("Pre-fetched orders",
                  extra={'fetched': len(orders_map), 'requested': len(unique_order_ids)})
 
@@ -68,14 +70,18 @@ def process_product_upload_dataframe(df, _company_id, _user_id, _upload_batch_id
     order_products = {}
     new_products = {}           # part_no → description (to be created)
     error_rows = []
-    processed_line_keys = set()  # (potential_order_id, part_no) — skip duplicates within upload
-
-    for index, row in df.iterrows():
+    run_state = {} if run_state is None else run_state
+    # (Order #, part_no) — skip duplicates within the upload, across chunks too
+    processed_line_keys = run_state.setdefault('product_line_keys', set())
+    replaced_orders     = run_state.setdefault('product_replaced_orders', set())  # Order #s
+
+    rows = zip(df.index, columns['Order #'], columns['Part #'],
+               columns['Part Description'], columns['Reserved Qty'])
+    for index, original_order_id, part_no, description, qty in rows:
         try:
-            original_order_id = str(row.get('Order #', '') or '').strip()
-            part_no = str(row.get('Part #', '') or '').strip()
-            description = str(row.get('Part Description', '') or '').strip()
-            qty_raw = row.get('Reserved Qty', '') or ''
+            original_order_id = original_order_id or ''
+            part_no = part_no or ''
+            description = description or ''
 
             if not original_order_id:
                 error_rows.append({'order_id': '', 'name': '', 'reason': f"Row {index}: Missing Order #"})
@@ -95,15 +101,10 @@ def process_product_upload_dataframe(df, _company_id, _user_id, _upload_batch_id
                 })
                 continue
 
-            try:
-                qty = int(float(str(qty_raw).strip())) if str(qty_raw).strip() else 0
-                if qty < 0:
-                    qty = 0
-            except (ValueError, TypeError):
-                qty = 0
+            qty = max(qty or 0, 0)
 
             pot_id = potential_order.potential_order_id
-            line_key = (pot_id, part_no)
+            line_key = (original_order_id, part_no)
 
             # Skip duplicate line items within this upload (same order + same part)
             if line_key in processed_line_keys:
@@ -118,7 +119,6 @@ def process_product_upload_dataframe(df, _company_id, _user_id, _upload_batch_id
             order_products[pot_id].append((part_no, description, qty))
 
         except Exception as e:
-            original_order_id = str(row.get('Order #', '') or '').strip()
             error_rows.append({
                 'order_id': original_order_id,
                 'name': '',
@@ -138,49 +138,79 @@ def process_product_upload_dataframe(df, _company_id, _user_id, _upload_batch_id
         products_map.update(fresh)
         logger.debug("Inserted new products", extra={'count': len(new_products)})
 
-    # 3b. DELETE existing potential_order_product rows for affected orders (replace mode)
-    affected_order_ids = list(order_products.keys())
-    product_repo.bulk_delete_order_products(affected_order_ids)
-    logger.debug("Cleared existing products for orders",
-                 extra={'order_count': len(affected_order_ids)})
-
-    # 3c. Build and INSERT new potential_order_product rows
-    pop_rows = []
-    for pot_id, lines in order_products.items():
-        for part_no, _description, qty in lines:
-            product = products_map.get(part_no)
-            if not product:
-                error_rows.append({
-                    'order_id': '',
-                    'name': '',
-                    'reason': f"Product {part_no} could not be created or found"
-                })
-                continue
-            pop_rows.append((
-                pot_id,
-                product['product_id'],
-                qty,
-                0,          # quantity_packed
-                qty,        # quantity_remaining
-                None,       # mrp
-                None,       # total_price
-                current_time,
-                current_time,
-            ))
-
-    products_saved = product_repo.bulk_insert_order_products(pop_rows)
+    # 3b/3c. Replace potential_order_product rows per chunk of orders: the
+    # DELETE and INSERT for a chunk run in one savepoint, so a failed chunk
+    # leaves those orders' existing lines untouched.
+    original_ids   = {po.potential_order_id: oid for oid, po in orders_map.items()}
+    products_saved = 0
+    orders_updated = 0
+    for chunk_ids in iter_chunks(order_products):
+        pop_rows = []
+        for pot_id in chunk_ids:
+            for part_no, _description, qty in order_products[pot_id]:
+                product = products_map.get(part_no)
+                if not product:
+                    error_rows.append({
+                        'order_id': '',
+                        'name': '',
+                        'reason': f"Product {part_no} could not be created or found"
+                    })
+                    continue
+                pop_rows.append((
+                    pot_id,
+                    product['product_id'],
+                    qty,
+                    0,          # quantity_packed
+                    qty,        # quantity_remaining
+                    None,       # mrp
+                    None,       # total_price
+                    current_time,
+                    current_time,
+                ))
+
+        replace_ids = [pot_id for pot_id in chunk_ids if original_ids.get(pot_id) not in replaced_orders]
+        try:
+            with mysql_manager.savepoint():
+                product_repo.bulk_delete_order_products(replace_ids)
+                products_saved += product_repo.bulk_insert_order_products(pop_rows)
+        except Exception as e:
+            logger.exception("Product write chunk failed", extra={'orders': len(chunk_ids)})
+            error_rows.extend(
+                {'order_id': original_ids.get(pot_id, ''), 'name': '',
+                 'reason': f"Database error while saving products: {str(e)}"}
+                for pot_id in chunk_ids
+            )
+            continue
+        replaced_orders.update(original_ids.get(pot_id) for pot_id in chunk_ids)
+        orders_updated += len(chunk_ids)
+        logger.debug("Replaced products for orders", extra={'order_count': len(chunk_ids)})
 
     logger.info(
         "Product upload complete",
         extra={
             'product_lines': products_saved,
-            'orders_updated': len(order_products),
+            'orders_updated': orders_updated,
             'error_count': len(error_rows),
         }
     )
 
     return {
         'products_processed': products_saved,
-        'orders_updated': len(order_products),
+        'orders_updated': orders_updated,
         'error_rows': error_rows,
     }
+
+
+def remember_product_lines(df, run_state):
+    """
+    Record a chunk an earlier run already committed (resumed upload) in
+    run_state, so its orders are appended to rather than replaced again.
+    No DB calls.
+    """
+    columns = normalise_columns(df, text=('Order #', 'Part #'))
+    processed_line_keys = run_state.setdefault('product_line_keys', set())
+    replaced_orders     = run_state.setdefault('product_replaced_orders', set())
+    for original_order_id, part_no in zip(columns['Order #'], columns['Part #']):
+        if original_order_id and part_no:
+            processed_line_keys.add((original_order_id, part_no))
+            replaced_orders.add(original_order_id)
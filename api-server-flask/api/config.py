@@ -44,6 +44,36 @@ class BaseConfig():
     DB_POOL_SIZE    = int(os.getenv('DB_POOL_SIZE',    '10'))
     DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
     DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '3600'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))        # seconds to wait for a free connection
+    DB_POOL_PRE_PING_IDLE = int(os.getenv('DB_POOL_PRE_PING_IDLE', '30'))  # ping only if idle longer than this
+
+    # Background upload jobs (services/upload_jobs.py)
+    UPLOAD_JOB_HEARTBEAT_SECONDS = int(os.getenv('UPLOAD_JOB_HEARTBEAT_SECONDS', '30'))  # running job's owner bumps heartbeat_at this often
+    UPLOAD_JOB_STALE_SECONDS   = int(os.getenv('UPLOAD_JOB_STALE_SECONDS', '300'))    # 'running' with no heartbeat this long → owner died
+    UPLOAD_JOB_RETENTION_DAYS  = int(os.getenv('UPLOAD_JOB_RETENTION_DAYS', '7'))     # finished jobs kept this long
+
+    # Process-wide dealer id cache (business/dealer_business.py)
+    DEALER_CACHE_SIZE         = int(os.getenv('DEALER_CACHE_SIZE', '50000'))          # entries (code + name keys)
+    DEALER_CACHE_TTL_SECONDS  = int(os.getenv('DEALER_CACHE_TTL_SECONDS', '3600'))
+
+    # Authenticated-user cache (core/auth.py) — short TTL, invalidated on every users write
+    AUTH_USER_CACHE_SIZE        = int(os.getenv('AUTH_USER_CACHE_SIZE', '10000'))
+    AUTH_USER_CACHE_TTL_SECONDS = int(os.getenv('AUTH_USER_CACHE_TTL_SECONDS', '60'))
+
+    # Role permissions cache (permissions.py) — all roles in one entry, invalidated by the role admin views
+    PERMISSION_CACHE_TTL_SECONDS = int(os.getenv('PERMISSION_CACHE_TTL_SECONDS', '300'))
+
+    # Dashboard status counts (PotentialOrder.count_grouped_by_status) — per (warehouse, company); 0 disables
+    STATUS_COUNT_CACHE_TTL_SECONDS = int(os.getenv('STATUS_COUNT_CACHE_TTL_SECONDS', '10'))
+
+    # Bulk order export — files larger than this are spooled to disk instead of memory
+    EXPORT_SPOOL_MAX_BYTES = int(os.getenv('EXPORT_SPOOL_MAX_BYTES', str(8 * 1024 * 1024)))
+
+    # Large id lookups (BaseRepository._query_in) — ids per IN (...) statement, the id count
+    # above which a temporary table is joined instead, and worker threads for parallel=True
+    IN_LIST_CHUNK_SIZE = int(os.getenv('IN_LIST_CHUNK_SIZE', '1000'))
+    IN_LIST_TEMP_TABLE_THRESHOLD = int(os.getenv('IN_LIST_TEMP_TABLE_THRESHOLD', '20000'))
+    IN_LIST_MAX_WORKERS = int(os.getenv('IN_LIST_MAX_WORKERS', '4'))
 
     # MySQL specific settings
     MYSQL_CHARSET   = os.getenv('MYSQL_CHARSET',   'utf8mb4')
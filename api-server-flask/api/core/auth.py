@@ -15,19 +15,148 @@ Usage:
         @upload_permission_required('orders')
         def post(self, current_user):
             ...
+
+Authentication makes no DB round-trip on the hot path: users are served from
+a short-TTL cache keyed by email (invalidate_user_cache() after a users
+write that changes a cached column), and the blocklist check is a lookup in an in-memory set of revoked
+token hashes, topped up from jwt_token_blocklist every few seconds.
+
+The blocklist stores only SHA-256 digests with each token's exp; rows whose
+token has expired are deleted by prune_revoked_tokens(), which every worker
+runs hourly from its refresh.
 """
 
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta
 from functools import wraps
 
 import jwt
 from flask import request
 
 from ..config import BaseConfig
-from ..db_manager import mysql_manager, partition_filter
+from ..db_manager import mysql_manager
+from ..core.cache import TTLCache
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Lifetime of the tokens issued by /api/users/login ('exp' claim).
+TOKEN_LIFETIME = timedelta(hours=8)
+
+# users rows by email; each request builds its own Users from the row.
+_user_cache = TTLCache('auth_users', BaseConfig.AUTH_USER_CACHE_SIZE,
+                       BaseConfig.AUTH_USER_CACHE_TTL_SECONDS)
+
+
+def token_hash(token: str) -> str:
+    """SHA-256 hex digest of a raw JWT — how revoked tokens are stored and compared."""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def token_expiry(token: str) -> datetime:
+    """UTC datetime of the token's 'exp' claim (now + TOKEN_LIFETIME if it has none)."""
+    try:
+        exp = jwt.decode(token, options={"verify_signature": False}).get('exp')
+    except jwt.InvalidTokenError:
+        exp = None
+    if exp is None:
+        return datetime.utcnow() + TOKEN_LIFETIME
+    return datetime.utcfromtimestamp(exp)
+
+
+def prune_revoked_tokens() -> int:
+    """Delete blocklist rows whose token has expired; returns the number deleted."""
+    from ..repositories import user_repo
+    # Commits on its own, whatever unit of work the caller is in.
+    with mysql_manager.detached():
+        deleted = user_repo.delete_expired_tokens(datetime.utcnow())
+    if deleted:
+        logger.info("Pruned expired blocklist tokens", extra={'deleted': deleted})
+    return deleted
+
+
+class RevokedTokens:
+    """
+    In-memory set of revoked token hashes for this process.
+
+    Refreshed from jwt_token_blocklist at most every REFRESH_SECONDS, reading
+    only rows created since the previous refresh (less REFRESH_OVERLAP, for
+    logouts whose transaction committed late). Hashes whose token has expired
+    are dropped — those tokens fail the 'exp' check anyway. A logout in this
+    process is added at once; other workers see it on their next refresh.
+    Every PRUNE_SECONDS the refresh also deletes expired rows from the table.
+    """
+
+    REFRESH_SECONDS = 2
+    REFRESH_OVERLAP = timedelta(seconds=60)
+    PRUNE_SECONDS = 3600
+
+    def __init__(self):
+        self._revoked = {}          # token hash → expires_at
+        self._since = None          # created_at lower bound for the next refresh
+        self._refreshed_at = 0.0
+        self._pruned_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def is_revoked(self, token: str) -> bool:
+        self._refresh()
+        return token_hash(token) in self._revoked
+
+    def add(self, digest: str, expires_at: datetime) -> None:
+        self._revoked[digest] = expires_at
+
+    def _refresh(self) -> None:
+        if time.monotonic() - self._refreshed_at < self.REFRESH_SECONDS:
+            return
+        with self._lock:
+            if time.monotonic() - self._refreshed_at < self.REFRESH_SECONDS:
+                return   # another thread refreshed while we waited
+            from ..repositories import user_repo
+            started = datetime.utcnow()
+            rows = user_repo.find_revoked_tokens_since(self._since, started)
+            revoked = dict(self._revoked)
+            revoked.update((r['token_hash'], r['expires_at']) for r in rows)
+            self._revoked = {h: exp for h, exp in revoked.items() if exp > started}
+            self._since = started - self.REFRESH_OVERLAP
+            self._refreshed_at = time.monotonic()
+            if self._refreshed_at - self._pruned_at >= self.PRUNE_SECONDS:
+                self._pruned_at = self._refreshed_at
+                try:
+                    prune_revoked_tokens()
+                except Exception as e:
+                    logger.warning("Blocklist prune failed", extra={'error': str(e)})
+
+
+_revoked_tokens = RevokedTokens()
+
+
+def _load_user(email):
+    """Users instance for *email* (cached row), or None."""
+    from ..models import Users
+    row = _user_cache.get(email)
+    if row is None:
+        from ..repositories import user_repo
+        row = user_repo.find_row_by_email(email)
+        if row is None:
+            return None
+        _user_cache.set(email, row)
+    return Users(**row)
+
+
+def invalidate_user_cache():
+    """Drop cached users in every worker — call after a users write that changes a cached row."""
+    _user_cache.invalidate()
+
+
+def revoke_token(token: str) -> None:
+    """Add *token* to the blocklist (committed with the request) and to this process's set."""
+    from ..repositories import user_repo
+    digest, expires_at = token_hash(token), token_expiry(token)
+    user_repo.revoke_token(digest, expires_at)
+    mysql_manager.on_commit(lambda: _revoked_tokens.add(digest, expires_at))
+
 
 def token_required(f):
     """
@@ -49,20 +178,13 @@ def token_required(f):
             return {"success": False, "msg": "Valid JWT token is missing"}, 400
 
         try:
-            from ..models import Users
-
             data = jwt.decode(token, BaseConfig.SECRET_KEY, algorithms=["HS256"])
-            current_user = Users.get_by_email(data["email"])
+            current_user = _load_user(data["email"])
 
             if not current_user:
                 return {"success": False, "msg": "User does not exist."}, 401
 
-            pf_sql, pf_params = partition_filter('jwt_token_blocklist')
-            blocked_token = mysql_manager.execute_query(
-                f"SELECT id FROM jwt_token_blocklist WHERE jwt_token = %s AND {pf_sql}",
-                (token, *pf_params)
-            )
-            if blocked_token:
+            if _revoked_tokens.is_revoked(token):
                 return {"success": False, "msg": "Token revoked."}, 401
 
             if not current_user.check_jwt_auth_active():
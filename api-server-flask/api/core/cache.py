@@ -0,0 +1,137 @@
+# -*- encoding: utf-8 -*-
+"""
+In-process lookup caches: bounded (LRU), time-limited (TTL), with hit/miss
+counters and invalidation that reaches every gunicorn worker.
+
+Usage:
+    from ..core.cache import TTLCache
+    dealer_cache = TTLCache('dealers', maxsize=50000, ttl_seconds=3600)
+
+    dealer_id = dealer_cache.get(key)       # None on a miss or an expired entry
+    dealer_cache.set(key, dealer_id)
+    dealer_cache.invalidate()               # after a write
+
+Each worker process holds its own copy. invalidate() clears it and bumps the
+cache's row in `cache_versions` — inside the caller's unit of work, so the
+bump commits together with the write. Every worker re-reads that version at
+most every VERSION_CHECK_SECONDS and drops its entries when it has moved.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from ..db_manager import mysql_manager
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+VERSION_CHECK_SECONDS = 5
+
+# name → TTLCache, for cache_stats()
+_caches = {}
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire ttl_seconds after they were set."""
+
+    def __init__(self, name: str, maxsize: int, ttl_seconds: int):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()        # key → (value, expires_at)
+        self._lock = threading.Lock()
+        self._version = None                 # last cache_versions.version seen
+        self._version_checked_at = 0.0
+        _caches[name] = self
+
+    def get(self, key, default=None):
+        """Return the cached value, or default on a miss / expired entry."""
+        self._sync_version()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: dict) -> None:
+        """Store several entries, evicting the least recently used beyond maxsize."""
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop this process's entries only."""
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate(self) -> None:
+        """Drop the entries in this process and, through cache_versions, in every other worker."""
+        self.clear()
+        mysql_manager.execute_query(
+            "INSERT INTO cache_versions (name, version) VALUES (%s, 1) "
+            "ON DUPLICATE KEY UPDATE version = version + 1",
+            (self.name,), fetch=False
+        )
+        # Entries other threads cache before the write commits may be stale:
+        # clear again once it has, and let other workers re-check promptly.
+        mysql_manager.on_commit(self.clear)
+        self._version_checked_at = 0.0
+        logger.debug("Cache invalidated", extra={'cache': self.name})
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'size':        len(self._entries),
+            'maxsize':     self.maxsize,
+            'ttl_seconds': self.ttl_seconds,
+            'hits':        self.hits,
+            'misses':      self.misses,
+            'evictions':   self.evictions,
+            'hit_rate':    round(self.hits / lookups, 3) if lookups else None,
+        }
+
+    def _sync_version(self) -> None:
+        """Clear the cache if another worker bumped its version since the last check."""
+        now = time.monotonic()
+        if now - self._version_checked_at < VERSION_CHECK_SECONDS:
+            return
+        self._version_checked_at = now
+        try:
+            # On a connection of its own: inside a unit of work the read would
+            # see the transaction's snapshot, not the latest committed version
+            with mysql_manager.detached():
+                rows = mysql_manager.execute_query(
+                    "SELECT version FROM cache_versions WHERE name = %s", (self.name,)
+                )
+        except Exception as e:
+            logger.warning("Cache version check failed", extra={'cache': self.name, 'error': str(e)})
+            return
+        version = rows[0]['version'] if rows else 0
+        if self._version is not None and version != self._version:
+            self.clear()
+            logger.debug("Cache cleared by version bump",
+                         extra={'cache': self.name, 'version': version})
+        self._version = version
+
+
+def cache_stats() -> dict:
+    """Counters of every cache in this process, keyed by cache name (served by /health)."""
+    return {name: cache.stats() for name, cache in _caches.items()}
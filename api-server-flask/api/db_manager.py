@@ -22,22 +22,27 @@ order_product           │ created_at
 order_box               │ created_at
 box_product             │ created_at
 upload_batches          │ uploaded_at
-jwt_token_blocklist     │ created_at
 
 Tables NOT partitioned  (constants / slow-growing reference data)
 ────────────────────────
 warehouse, company, dealer, product, box, users, roles, order_state,
 transport_routes, customer_route_mappings, daily_route_manifests,
-company_schema_mappings, invoice_processing_config, user_warehouse_company
+company_schema_mappings, invoice_processing_config, user_warehouse_company,
+upload_jobs, cache_versions, order_status_counts,
+jwt_token_blocklist (pruned by expiry instead)
 """
 
 import logging
 import os
 import pymysql
 import threading
+import time
 from contextlib import contextmanager
 from datetime import datetime, date
 
+from .config import BaseConfig
+from .core.exceptions import ConnectionException
+
 logger = logging.getLogger(__name__)
 
 # Install PyMySQL as MySQLdb for compatibility
@@ -60,7 +65,6 @@ PARTITION_COLUMN: dict = {
     'order_box':               'created_at',
     'box_product':             'created_at',
     'upload_batches':          'uploaded_at',
-    'jwt_token_blocklist':     'created_at',
 }
 
 PARTITIONED_TABLES = frozenset(PARTITION_COLUMN.keys())
@@ -149,17 +153,94 @@ def _generate_monthly_partitions(col: str, months_back: int = None) -> str:
     return f"PARTITION BY RANGE COLUMNS ({col}) (\n" + ",\n".join(parts) + "\n)"
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Write batching
+# ─────────────────────────────────────────────────────────────────────────────
+
+WRITE_CHUNK_SIZE = 500   # rows per executemany / savepoint in bulk upload writes
+
+
+def iter_chunks(items, size: int = WRITE_CHUNK_SIZE):
+    """Yield successive lists of at most `size` items from a sequence."""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class _Savepoint:
+    """Handle yielded by MySQLManager.savepoint()."""
+
+    def __init__(self, manager, name, depth):
+        self._manager = manager
+        self.name = name
+        self.depth = depth
+
+    def rollback(self):
+        """Discard everything done since the savepoint was taken."""
+        self._manager.execute_query(f"ROLLBACK TO SAVEPOINT {self.name}", fetch=False)
+        self._manager._drop_on_commit(self.depth)
+
+
 class MySQLManager:
-    """MySQL Connection Manager with connection pooling"""
+    """
+    MySQL Connection Manager with a bounded connection pool.
+
+    Pool behaviour
+    ──────────────
+    - At most DB_POOL_SIZE + DB_MAX_OVERFLOW connections are open at once.
+      When all of them are checked out, callers block for up to
+      DB_POOL_TIMEOUT seconds and then get a ConnectionException (HTTP 503).
+    - Up to DB_POOL_SIZE idle connections are kept; overflow connections are
+      closed when they are returned.
+    - A connection is only pinged when it has been idle for longer than
+      DB_POOL_PRE_PING_IDLE seconds, not on every checkout.
+    - Connections older than DB_POOL_RECYCLE seconds are closed and replaced
+      on checkout.
+    - pool_stats() exposes counters for monitoring.
+    The DB_POOL_* settings are read from BaseConfig.
+
+    Unit of work
+    ────────────
+    Inside unit_of_work() (or between begin_unit_of_work() and
+    end_unit_of_work(), which the Flask app calls around every request) all
+    get_connection / get_cursor / execute_query calls on the same thread share
+    one connection and one transaction. The connection is checked out lazily
+    on first use and committed once at the end; nested get_cursor(commit=True)
+    calls do not commit on their own. on_commit() defers a callback (e.g. a
+    cache update) until that commit, and drops it on rollback;
+    before_commit() runs one inside the transaction, just before it commits.
+    """
 
     def __init__(self):
-        self.pool = []
-        self.pool_size = int(os.getenv('DB_POOL_SIZE', '10'))
-        self.max_overflow = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+        self.pool = []                 # idle connections (LIFO)
+        self.pool_size = BaseConfig.DB_POOL_SIZE
+        self.max_overflow = BaseConfig.DB_MAX_OVERFLOW
+        self.pool_timeout = BaseConfig.DB_POOL_TIMEOUT
+        self.pool_recycle = BaseConfig.DB_POOL_RECYCLE
+        self.pre_ping_idle = BaseConfig.DB_POOL_PRE_PING_IDLE
         self.pool_lock = threading.Lock()
+        self._pool_available = threading.Condition(self.pool_lock)
+        self._open_count = 0           # idle + checked out
+        self._checked_out = 0
+        self._conn_times = {}          # id(conn) -> [created_at, last_returned_at]
+        self._stats = {
+            'created': 0,
+            'discarded': 0,
+            'recycled': 0,
+            'pings': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+        }
+        self._uow = threading.local()  # per-thread unit-of-work state
         self.config = self._get_db_config()
         self._initialize_pool()
 
+    @property
+    def max_connections(self):
+        return self.pool_size + self.max_overflow
+
     def _get_db_config(self):
         """Get database configuration from environment variables"""
         return {
@@ -178,66 +259,423 @@ class MySQLManager:
 
     def _initialize_pool(self):
         """Initialize connection pool"""
-        with self.pool_lock:
-            for _ in range(self.pool_size):
-                try:
-                    conn = self._create_connection()
-                    self.pool.append(conn)
-                except Exception as e:
-                    logger.warning("Error creating pool connection", extra={'error': str(e)})
+        for _ in range(self.pool_size):
+            try:
+                conn = self._create_connection()
+            except Exception as e:
+                logger.warning("Error creating pool connection", extra={'error': str(e)})
+                continue
+            with self.pool_lock:
+                self._open_count += 1
+                self.pool.append(conn)
 
     def _create_connection(self):
         """Create a new MySQL connection"""
-        return pymysql.connect(**self.config)
+        conn = pymysql.connect(**self.config)
+        now = time.monotonic()
+        with self.pool_lock:
+            self._conn_times[id(conn)] = [now, now]
+            self._stats['created'] += 1
+        return conn
 
-    @contextmanager
-    def get_connection(self):
-        """Get a connection from the pool"""
-        conn = None
+    def _close_connection(self, conn):
+        """Close a connection and forget its bookkeeping. Never raises."""
+        with self.pool_lock:
+            self._conn_times.pop(id(conn), None)
         try:
-            with self.pool_lock:
+            conn.close()
+        except Exception:
+            pass
+
+    # ── Checkout / checkin ───────────────────────────────────────────────────
+
+    def _checkout(self):
+        """
+        Take a connection out of the pool, creating one if the cap allows it
+        and blocking (up to pool_timeout) if it does not.
+        """
+        conn = None
+        wait_started = None
+        with self._pool_available:
+            deadline = time.monotonic() + self.pool_timeout
+            while True:
                 if self.pool:
                     conn = self.pool.pop()
-                else:
-                    conn = self._create_connection()
+                    break
+                if self._open_count < self.max_connections:
+                    self._open_count += 1   # reserve the slot before connecting
+                    break
+                now = time.monotonic()
+                if wait_started is None:
+                    wait_started = now
+                    self._stats['waits'] += 1
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    self._record_wait(now - wait_started)
+                    logger.warning("Connection pool exhausted",
+                                   extra={'in_use': self._checked_out,
+                                          'max_connections': self.max_connections,
+                                          'pool_timeout': self.pool_timeout})
+                    raise ConnectionException(
+                        f"Database connection pool exhausted "
+                        f"({self.max_connections} connections in use, waited {self.pool_timeout:g}s)"
+                    )
+                self._pool_available.wait(remaining)
+            self._checked_out += 1
+            if wait_started is not None:
+                self._record_wait(time.monotonic() - wait_started)
 
-            # Test connection
-            conn.ping(reconnect=True)
-            yield conn
+        try:
+            if conn is None:
+                return self._create_connection()
+            return self._revalidate(conn)
+        except Exception:
+            self._release_slot()
+            raise
+
+    def _revalidate(self, conn):
+        """
+        Recycle connections past DB_POOL_RECYCLE and ping ones that have sat
+        idle longer than DB_POOL_PRE_PING_IDLE. Returns a usable connection.
+        """
+        now = time.monotonic()
+        with self.pool_lock:
+            created_at, returned_at = self._conn_times.get(id(conn), (now, now))
 
-        except Exception as e:
-            if conn:
+        if self.pool_recycle > 0 and now - created_at > self.pool_recycle:
+            self._close_connection(conn)
+            with self.pool_lock:
+                self._stats['recycled'] += 1
+            return self._create_connection()
+
+        if now - returned_at > self.pre_ping_idle:
+            with self.pool_lock:
+                self._stats['pings'] += 1
+            try:
+                conn.ping(reconnect=False)
+            except Exception as e:
+                logger.info("Discarding stale pooled connection", extra={'error': str(e)})
+                self._close_connection(conn)
+                with self.pool_lock:
+                    self._stats['discarded'] += 1
+                return self._create_connection()
+        return conn
+
+    def _checkin(self, conn, discard=False):
+        """Return a connection to the pool (or close it) and wake one waiter."""
+        close = discard
+        with self._pool_available:
+            self._checked_out -= 1
+            if discard:
+                self._stats['discarded'] += 1
+            if not close and len(self.pool) >= self.pool_size:
+                close = True   # overflow connection — don't keep it idle
+            if close:
+                self._open_count -= 1
+            else:
+                times = self._conn_times.get(id(conn))
+                if times is not None:
+                    times[1] = time.monotonic()
+                self.pool.append(conn)
+            self._pool_available.notify()
+        if close:
+            self._close_connection(conn)
+
+    def _release_slot(self):
+        """Give back a reserved slot whose connection could not be produced."""
+        with self._pool_available:
+            self._checked_out -= 1
+            self._open_count -= 1
+            self._pool_available.notify()
+
+    def _record_wait(self, waited):
+        # caller holds pool_lock
+        self._stats['wait_time_total'] += waited
+        self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+
+    def _stats_locked(self):
+        # caller holds pool_lock
+        return {
+            'pool_size':     self.pool_size,
+            'max_overflow':  self.max_overflow,
+            'open':          self._open_count,
+            'in_use':        self._checked_out,
+            'idle':          len(self.pool),
+            **self._stats,
+        }
+
+    def pool_stats(self):
+        """Snapshot of pool counters, for health checks and monitoring."""
+        with self.pool_lock:
+            stats = self._stats_locked()
+        stats['wait_time_total'] = round(stats['wait_time_total'], 3)
+        stats['wait_time_max'] = round(stats['wait_time_max'], 3)
+        return stats
+
+    # ── Unit of work ─────────────────────────────────────────────────────────
+
+    def in_unit_of_work(self):
+        """True if the current thread has an open unit of work."""
+        return getattr(self._uow, 'active', False)
+
+    def begin_unit_of_work(self):
+        """
+        Start a unit of work on the current thread. No-op if one is already
+        open — the caller then simply joins it.
+
+        Returns True if this call opened it (and must therefore end it).
+        """
+        if self.in_unit_of_work():
+            return False
+        self._uow.active = True
+        self._uow.conn = None
+        self._uow.savepoint_depth = 0
+        self._uow.on_commit = []
+        self._uow.before_commit = []
+        return True
+
+    def end_unit_of_work(self, commit=True):
+        """
+        Commit (or roll back) the current unit of work and return its
+        connection to the pool. Safe to call when none is open.
+        """
+        if not self.in_unit_of_work():
+            return
+        if commit and getattr(self._uow, 'before_commit', None):
+            try:
+                self._run_before_commit()
+            except Exception:
+                self.end_unit_of_work(commit=False)
+                raise
+        conn = self._uow.conn
+        callbacks = getattr(self._uow, 'on_commit', [])
+        self._uow.active = False
+        self._uow.conn = None
+        self._uow.on_commit = []
+        self._uow.before_commit = []
+        if conn is None:
+            return   # nothing touched the database
+
+        broken = False
+        try:
+            if commit:
+                conn.commit()
+            else:
+                conn.rollback()
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self._checkin(conn, discard=broken)
+        if commit:
+            self._run_on_commit(callbacks)
+
+    def commit_unit_of_work(self):
+        """
+        Commit what the current unit of work has done so far and keep it open
+        on the same connection — a checkpoint for long jobs that must not lose
+        finished work if they die later (e.g. resumable uploads).
+
+        Must not be called inside a savepoint. No-op outside a unit of work.
+        """
+        if not self.in_unit_of_work():
+            return
+        if getattr(self._uow, 'savepoint_depth', 0):
+            raise RuntimeError("commit_unit_of_work() called inside a savepoint")
+        self._run_before_commit()
+        if self._uow.conn is not None:
+            self._uow.conn.commit()
+        callbacks, self._uow.on_commit = getattr(self._uow, 'on_commit', []), []
+        self._run_on_commit(callbacks)
+
+    def on_commit(self, callback):
+        """
+        Call callback() once the current unit of work commits; never if the
+        work is rolled back (including a rollback to an enclosing savepoint).
+        Outside a unit of work every query has already committed, so the
+        callback runs at once.
+
+        For process-local state derived from uncommitted writes — e.g. caching
+        the id of a row just INSERTed.
+        """
+        if not self.in_unit_of_work():
+            callback()
+            return
+        self._uow.on_commit.append((self._uow.savepoint_depth, callback))
+
+    def before_commit(self, callback):
+        """
+        Call callback() inside the current unit of work, just before it
+        commits, so its queries are part of the same transaction. Dropped if
+        the work is rolled back (including a rollback to an enclosing
+        savepoint); if it raises, the whole unit of work is rolled back.
+        Outside a unit of work the callback runs at once.
+
+        For writes to hot rows such as summary counters: deferred to the end,
+        their row locks are held only for the moment of the commit.
+        """
+        if not self.in_unit_of_work():
+            callback()
+            return
+        self._uow.before_commit.append((self._uow.savepoint_depth, callback))
+
+    def _run_before_commit(self):
+        callbacks, self._uow.before_commit = getattr(self._uow, 'before_commit', []), []
+        for _depth, callback in callbacks:
+            callback()
+
+    def _drop_on_commit(self, depth):
+        """Forget callbacks registered at savepoint `depth` or deeper (it was rolled back)."""
+        self._uow.on_commit = [(d, cb) for d, cb in self._uow.on_commit if d < depth]
+        self._uow.before_commit = [(d, cb) for d, cb in self._uow.before_commit if d < depth]
+
+    @staticmethod
+    def _run_on_commit(callbacks):
+        for _depth, callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.warning("on_commit callback failed", exc_info=True)
+
+    @contextmanager
+    def detached(self):
+        """
+        Run a block outside the current unit of work: its queries use their
+        own pooled connection and commit immediately. For writes that must be
+        visible to other requests at once and survive a rollback of the
+        surrounding work — e.g. background job progress.
+        """
+        saved = (self.in_unit_of_work(),
+                 getattr(self._uow, 'conn', None),
+                 getattr(self._uow, 'savepoint_depth', 0),
+                 getattr(self._uow, 'on_commit', []),
+                 getattr(self._uow, 'before_commit', []))
+        self._uow.active = False
+        self._uow.conn = None
+        try:
+            yield
+        finally:
+            (self._uow.active, self._uow.conn,
+             self._uow.savepoint_depth, self._uow.on_commit,
+             self._uow.before_commit) = saved
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Run a block on one connection with a single commit at the end.
+
+        Usage (CLI jobs, background work, or to scope a block explicitly):
+
+            with mysql_manager.unit_of_work():
+                order_repo.create_state_history(...)
+                PotentialOrder(...).save()
+
+        Nested use joins the outer unit of work; only the outermost block
+        commits. Any exception rolls the whole unit back.
+        """
+        if not self.begin_unit_of_work():
+            yield
+            return
+        try:
+            yield
+        except BaseException:
+            self.end_unit_of_work(commit=False)
+            raise
+        self.end_unit_of_work(commit=True)
+
+    @contextmanager
+    def savepoint(self):
+        """
+        Nested rollback point inside the current unit of work.
+
+        If the block raises, only the work done inside it is rolled back and
+        the exception propagates — the enclosing transaction stays usable, so
+        callers can record the failure and carry on with the next chunk:
+
+            for chunk in iter_chunks(rows):
                 try:
-                    conn.rollback()
-                except Exception:
-                    # Bug 42 fix: rollback failed — connection is broken.
-                    # Close it and set to None so the finally block discards it
-                    # instead of returning a dead connection to the pool.
-                    try:
-                        conn.close()
-                    except Exception:
-                        pass
-                    conn = None
+                    with mysql_manager.savepoint():
+                        repo.bulk_insert(chunk)
+                except Exception as e:
+                    error_rows.extend(...)
+
+        The yielded handle's rollback() discards the block's work without
+        raising. Outside a unit of work the block gets its own one.
+        """
+        if not self.in_unit_of_work():
+            with self.unit_of_work():
+                with self.savepoint() as handle:
+                    yield handle
+            return
+
+        depth = getattr(self._uow, 'savepoint_depth', 0) + 1
+        self._uow.savepoint_depth = depth
+        # Sibling savepoints reuse the name (MySQL replaces it); they are
+        # released implicitly at commit, so no RELEASE round-trip is needed.
+        handle = _Savepoint(self, f"sp_{depth}", depth)
+        try:
+            self.execute_query(f"SAVEPOINT {handle.name}", fetch=False)
+            try:
+                yield handle
+            except BaseException:
+                # If this fails too (e.g. a deadlock already rolled back the
+                # whole transaction) that error propagates instead — earlier
+                # chunks are gone and must not be reported as saved.
+                handle.rollback()
+                raise
+            # Kept work now belongs to the enclosing level
+            self._uow.on_commit = [(min(d, depth - 1), cb) for d, cb in self._uow.on_commit]
+            self._uow.before_commit = [(min(d, depth - 1), cb) for d, cb in self._uow.before_commit]
+        finally:
+            self._uow.savepoint_depth = depth - 1
+
+    @contextmanager
+    def get_connection(self):
+        """Get a connection from the pool (or the current unit of work's)"""
+        if self.in_unit_of_work():
+            if self._uow.conn is None:
+                self._uow.conn = self._checkout()
+            # The unit of work owns commit / rollback / checkin.
+            yield self._uow.conn
+            return
+
+        conn = self._checkout()
+        broken = False
+        try:
+            yield conn
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                # Bug 42 fix: rollback failed — connection is broken.
+                # Discard it instead of returning a dead connection to the pool.
+                broken = True
             raise e
         finally:
-            if conn:
-                with self.pool_lock:
-                    if len(self.pool) < self.pool_size:
-                        self.pool.append(conn)
-                    else:
-                        conn.close()
+            self._checkin(conn, discard=broken)
 
     @contextmanager
     def get_cursor(self, commit=True):
-        """Get a cursor with automatic connection management"""
+        """
+        Get a cursor with automatic connection management.
+
+        Inside a unit of work the cursor runs on the shared connection and
+        neither commits nor rolls back — the unit of work does that once.
+        """
+        joined = self.in_unit_of_work()
         with self.get_connection() as conn:
             cursor = conn.cursor()
             try:
                 yield cursor
-                if commit:
+                if commit and not joined:
                     conn.commit()
             except Exception as e:
-                conn.rollback()
+                if not joined:
+                    conn.rollback()
                 raise e
             finally:
                 cursor.close()
@@ -250,6 +688,35 @@ class MySQLManager:
                 return cursor.fetchall()
             return cursor.rowcount
 
+    def stream_query(self, query, params=None, fetch_size=1000):
+        """
+        Yield the rows of a large SELECT one by one without buffering the
+        whole result (server-side cursor). For exports:
+
+            for row in mysql_manager.stream_query(sql, params):
+                writer.writerow(...)
+
+        The rows are read on a pooled connection of their own, outside any
+        unit of work, which is held until the generator is exhausted or
+        closed — consume it promptly. A generator closed (or failing) before
+        the end closes its connection rather than read the remaining rows.
+        """
+        conn = self._checkout()
+        discard = True
+        try:
+            cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+            cursor.execute(query, params or ())
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                yield from rows
+            cursor.close()
+            conn.rollback()    # end the read snapshot
+            discard = False
+        finally:
+            self._checkin(conn, discard=discard)
+
     def execute_many(self, query, params_list):
         """Execute many queries with different parameters"""
         with self.get_cursor() as cursor:
@@ -265,13 +732,195 @@ class MySQLManager:
 mysql_manager = MySQLManager()
 
 
+def bulk_update_rows(table: str, key_col: str, ids, set_values: dict = None,
+                     per_row: dict = None, fill_null=(), fill_empty=(),
+                     chunk_size: int = WRITE_CHUNK_SIZE) -> int:
+    """
+    UPDATE the rows whose key_col is in ids with one statement per chunk
+    of ids. (executemany of a per-row UPDATE is one round-trip per row —
+    PyMySQL only batches INSERT ... VALUES.)
+
+        UPDATE t SET a = %s, b = CASE key WHEN %s THEN %s ... ELSE b END
+        WHERE key IN (%s, ...)
+
+    set_values  {column: value}        — the same value on every row
+    per_row     {column: {id: value}}  — a value per row; rows without one keep theirs
+    fill_null   per_row columns written only where currently NULL
+    fill_empty  per_row string columns written only where currently NULL or ''
+
+    Chunks of chunk_size ids keep each statement far below max_allowed_packet.
+    Runs on the thread's unit of work like every other write.
+    Returns the number of rows changed.
+    """
+    set_values = set_values or {}
+    per_row = per_row or {}
+    changed = 0
+    for chunk in iter_chunks(ids, chunk_size):
+        assignments, params = [], []
+        for col, value in set_values.items():
+            assignments.append(f"{col} = %s")
+            params.append(value)
+        for col, values in per_row.items():
+            whens = [(key, values[key]) for key in chunk if key in values]
+            if not whens:
+                continue
+            case = f"CASE {key_col} {' '.join(['WHEN %s THEN %s'] * len(whens))} ELSE {col} END"
+            if col in fill_empty:
+                case = f"COALESCE(NULLIF({col}, ''), {case})"
+            elif col in fill_null:
+                case = f"COALESCE({col}, {case})"
+            assignments.append(f"{col} = {case}")
+            params.extend(v for pair in whens for v in pair)
+        if not assignments:
+            continue
+        changed += mysql_manager.execute_query(
+            f"UPDATE {table} SET {', '.join(assignments)} "
+            f"WHERE {key_col} IN ({', '.join(['%s'] * len(chunk))})",
+            params + list(chunk), fetch=False
+        )
+    return changed
+
+
+def insert_rows_returning_ids(table: str, columns, rows, chunk_size: int = WRITE_CHUNK_SIZE) -> list:
+    """
+    INSERT parameter rows (in columns order) with one multi-row INSERT per
+    chunk and return the generated AUTO_INCREMENT ids, in the order of rows.
+
+    One multi-row INSERT of literal values is a "simple insert": InnoDB
+    hands it one consecutive block of ids starting at LAST_INSERT_ID(),
+    spaced by auto_increment_increment.
+    """
+    rows = list(rows)
+    if not rows:
+        return []
+    row_sql = f"({', '.join(['%s'] * len(columns))})"
+    step = None
+    ids = []
+    with mysql_manager.get_cursor() as cursor:
+        for chunk in iter_chunks(rows, chunk_size):
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_sql] * len(chunk))}",
+                [v for row in chunk for v in row]
+            )
+            first_id = cursor.lastrowid      # read before any other statement resets it
+            if step is None:
+                cursor.execute("SELECT @@auto_increment_increment AS step")
+                step = cursor.fetchone()['step']
+            ids.extend(first_id + i * step for i in range(len(chunk)))
+    return ids
+
+
 class MySQLModel:
     """Base class for MySQL models"""
 
+    # Column metadata for bulk_insert / bulk_upsert / bulk_update. A model
+    # declares it to opt in; models whose writes have side effects (e.g.
+    # PotentialOrder and order_status_counts) go through their repository.
+    TABLE = None            # table name, backquoted if reserved (`order`)
+    PRIMARY_KEY = None      # AUTO_INCREMENT id column
+    COLUMNS = ()            # columns written on INSERT (primary key excluded)
+    UPSERT_COLUMNS = ()     # columns ON DUPLICATE KEY UPDATE overwrites
+    TIMESTAMP_COLUMNS = ('created_at', 'updated_at')   # filled with now when unset
+
     def __init__(self, **kwargs):
         for key, value in kwargs.items():
             setattr(self, key, value)
 
+    @classmethod
+    def _insert_rows(cls, objs, now):
+        """Parameter rows in COLUMNS order; unset TIMESTAMP_COLUMNS become now."""
+        rows = []
+        for obj in objs:
+            row = []
+            for col in cls.COLUMNS:
+                value = getattr(obj, col, None)
+                if value is None and col in cls.TIMESTAMP_COLUMNS:
+                    value = now
+                row.append(value)
+            rows.append(row)
+        return rows
+
+    @classmethod
+    def _require(cls, *attrs):
+        """Raise if the model has not declared the metadata a bulk method needs."""
+        missing = [attr for attr in attrs if not getattr(cls, attr)]
+        if missing:
+            raise NotImplementedError(
+                f"{cls.__name__} must declare {', '.join(missing)} to use bulk writes"
+            )
+
+    @classmethod
+    def _values_sql(cls, count):
+        row_sql = f"({', '.join(['%s'] * len(cls.COLUMNS))})"
+        return f"INSERT INTO {cls.TABLE} ({', '.join(cls.COLUMNS)}) VALUES {', '.join([row_sql] * count)}"
+
+    @classmethod
+    def bulk_insert(cls, objs, chunk_size: int = WRITE_CHUNK_SIZE) -> list:
+        """
+        INSERT objs with one multi-row INSERT per chunk and set each object's
+        PRIMARY_KEY (insert_rows_returning_ids). Returns the generated ids in
+        the order of objs.
+        """
+        cls._require('TABLE', 'PRIMARY_KEY', 'COLUMNS')
+        objs = list(objs)
+        if not objs:
+            return []
+        ids = insert_rows_returning_ids(
+            cls.TABLE, cls.COLUMNS, cls._insert_rows(objs, datetime.utcnow()), chunk_size
+        )
+        for obj, new_id in zip(objs, ids):
+            setattr(obj, cls.PRIMARY_KEY, new_id)
+        return ids
+
+    @classmethod
+    def bulk_upsert(cls, objs, chunk_size: int = WRITE_CHUNK_SIZE) -> int:
+        """
+        INSERT ... ON DUPLICATE KEY UPDATE objs, one statement per chunk;
+        rows that hit a unique key get their UPSERT_COLUMNS overwritten.
+
+        Ids are not set: which rows were inserted rather than updated is not
+        knowable from a multi-row statement. Returns MySQL's affected-row
+        count (1 per inserted row, 2 per changed row).
+        """
+        cls._require('TABLE', 'COLUMNS', 'UPSERT_COLUMNS')
+        objs = list(objs)
+        if not objs:
+            return 0
+        now = datetime.utcnow()
+        update_sql = ', '.join(f"{col}=VALUES({col})" for col in cls.UPSERT_COLUMNS)
+        affected = 0
+        with mysql_manager.get_cursor() as cursor:
+            for chunk in iter_chunks(objs, chunk_size):
+                rows = cls._insert_rows(chunk, now)
+                affected += cursor.execute(
+                    f"{cls._values_sql(len(rows))} ON DUPLICATE KEY UPDATE {update_sql}",
+                    [v for row in rows for v in row]
+                )
+        return affected
+
+    @classmethod
+    def bulk_update(cls, objs, columns, chunk_size: int = WRITE_CHUNK_SIZE) -> int:
+        """
+        Write `columns` of already-saved objs back with set-based UPDATEs
+        (bulk_update_rows). updated_at, when a column of the model and not
+        listed, is set to now. Returns the number of rows changed.
+        """
+        cls._require('TABLE', 'PRIMARY_KEY')
+        objs = [obj for obj in objs if getattr(obj, cls.PRIMARY_KEY, None)]
+        if not objs:
+            return 0
+        per_row = {
+            col: {getattr(obj, cls.PRIMARY_KEY): getattr(obj, col) for obj in objs}
+            for col in columns
+        }
+        set_values = {}
+        if 'updated_at' in cls.COLUMNS and 'updated_at' not in columns:
+            set_values['updated_at'] = datetime.utcnow()
+        return bulk_update_rows(
+            cls.TABLE, cls.PRIMARY_KEY, [getattr(obj, cls.PRIMARY_KEY) for obj in objs],
+            set_values=set_values, per_row=per_row, chunk_size=chunk_size
+        )
+
     @classmethod
     def create_table_sql(cls):
         """Override in subclasses to define table creation SQL"""
@@ -288,6 +937,53 @@ class MySQLModel:
         return {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
 
 
+class RowRecord:
+    """
+    Base for compact read/write row records built by row_record().
+
+    A record holds exactly COLUMNS in __slots__ — no per-instance __dict__ —
+    so the bulk pipelines can hold one per upload row or fetched order cheaply.
+    Records carry data only: no save(), no finders.
+    """
+
+    __slots__ = ()
+    COLUMNS = ()
+
+    def __init__(self, **kwargs):
+        for col in self.COLUMNS:
+            setattr(self, col, kwargs.get(col))
+
+    @classmethod
+    def from_row(cls, row):
+        """Build a record from a DictCursor row; columns the record lacks are ignored."""
+        record = cls.__new__(cls)
+        for col in cls.COLUMNS:
+            setattr(record, col, row.get(col))
+        return record
+
+    def as_tuple(self):
+        """Values in COLUMNS order — one executemany parameter row."""
+        return tuple(getattr(self, col) for col in self.COLUMNS)
+
+    def to_dict(self):
+        return dict(zip(self.COLUMNS, self.as_tuple()))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={v!r}' for k, v in self.to_dict().items())})"
+
+
+def row_record(name: str, columns) -> type:
+    """
+    Create a RowRecord subclass holding exactly `columns`.
+
+        InvoiceRecord = row_record('InvoiceRecord', ('invoice_number', ...))
+        sql  = f"INSERT INTO invoice ({', '.join(InvoiceRecord.COLUMNS)}) VALUES (...)"
+        rows = [rec.as_tuple() for rec in records]
+    """
+    columns = tuple(columns)
+    return type(name, (RowRecord,), {'__slots__': columns, 'COLUMNS': columns})
+
+
 # Initialize database function
 def initialize_database():
     """Initialize database tables with MySQL"""
@@ -333,17 +1029,19 @@ def create_all_tables():
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
     """
 
-    # JWT Token Blocklist — partitioned by created_at (grows with logins)
-    _jwt_parts = _generate_monthly_partitions('created_at')
-    jwt_blocklist_sql = f"""
+    # JWT Token Blocklist — SHA-256 of each revoked token, never the token
+    # itself. Rows are deleted once the token's exp has passed
+    # (core.auth.prune_revoked_tokens), so the table stays small unpartitioned.
+    jwt_blocklist_sql = """
     CREATE TABLE IF NOT EXISTS jwt_token_blocklist (
-        id         INT      NOT NULL AUTO_INCREMENT,
-        jwt_token  TEXT     NOT NULL,
+        id         INT      NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        token_hash CHAR(64) CHARACTER SET ascii NOT NULL,
+        expires_at DATETIME NOT NULL,
         created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-        PRIMARY KEY (id, created_at),
+        UNIQUE INDEX uq_jwt_token_hash (token_hash),
+        INDEX idx_jwt_token_expires (expires_at),
         INDEX idx_jwt_token_created (created_at)
-    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-    {_jwt_parts};
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
     """
 
     # Warehouse table
@@ -450,6 +1148,7 @@ def create_all_tables():
         upload_batch_id    INT NULL,
         created_at         DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
         updated_at         DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        status_changed_at  DATETIME NULL,
         PRIMARY KEY (potential_order_id, created_at),
         INDEX idx_po_original_order_id (original_order_id),
         INDEX idx_po_status            (status),
@@ -457,7 +1156,8 @@ def create_all_tables():
         INDEX idx_po_warehouse_status  (warehouse_id, status),
         INDEX idx_po_company_status    (company_id, status),
         INDEX idx_po_invoice_submitted (invoice_submitted),
-        INDEX idx_po_created_at        (created_at)
+        INDEX idx_po_created_at        (created_at),
+        INDEX idx_po_updated_at        (updated_at)
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
     {_po_parts};
     """
@@ -690,6 +1390,10 @@ def create_all_tables():
         uploaded_at  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
         record_count INT DEFAULT 0,
         status       VARCHAR(20) DEFAULT 'active',
+        rows_done    INT DEFAULT 0,
+        error_count  INT DEFAULT 0,
+        last_chunk   INT DEFAULT 0,
+        chunk_rows   INT NULL,
         reverted_by  INT NULL,
         reverted_at  DATETIME NULL,
         PRIMARY KEY (id, uploaded_at),
@@ -700,6 +1404,62 @@ def create_all_tables():
     {_ub_parts};
     """
 
+    # Background upload jobs (services/upload_jobs.py) — not partitioned:
+    # rows are small and finished jobs are pruned after UPLOAD_JOB_RETENTION_DAYS.
+    upload_jobs_sql = """
+    CREATE TABLE IF NOT EXISTS upload_jobs (
+        id              INT          NOT NULL AUTO_INCREMENT PRIMARY KEY,
+        upload_type     VARCHAR(20)  NOT NULL,
+        filename        VARCHAR(255),
+        file_path       VARCHAR(512) NOT NULL,
+        context         TEXT         NOT NULL,
+        status          VARCHAR(20)  NOT NULL DEFAULT 'queued',
+        phase           VARCHAR(30)  NULL,
+        percent         TINYINT      NOT NULL DEFAULT 0,
+        rows_total      INT          NULL,
+        rows_done       INT          NOT NULL DEFAULT 0,
+        processed_count INT          NOT NULL DEFAULT 0,
+        error_count     INT          NOT NULL DEFAULT 0,
+        upload_batch_id INT          NULL,
+        http_status     INT          NULL,
+        result          MEDIUMTEXT   NULL,
+        worker          VARCHAR(100) NULL,
+        heartbeat_at    DATETIME     NULL,
+        created_by      INT,
+        created_at      DATETIME     NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        started_at      DATETIME     NULL,
+        finished_at     DATETIME     NULL,
+        updated_at      DATETIME     DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        INDEX idx_upload_jobs_status  (status),
+        INDEX idx_upload_jobs_created (created_at)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """
+
+    # Process-local cache invalidation (core/cache.py): a write bumps the
+    # cache's version, other gunicorn workers see the bump and drop their copy.
+    cache_versions_sql = """
+    CREATE TABLE IF NOT EXISTS cache_versions (
+        name       VARCHAR(64) NOT NULL PRIMARY KEY,
+        version    BIGINT      NOT NULL DEFAULT 0,
+        updated_at DATETIME    DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """
+
+    # Dashboard order counts per (warehouse, company, status, created_at month),
+    # kept in step with potential_order by repositories/status_count_repository.py
+    order_status_counts_sql = """
+    CREATE TABLE IF NOT EXISTS order_status_counts (
+        warehouse_id  INT         NOT NULL,
+        company_id    INT         NOT NULL,
+        status        VARCHAR(50) NOT NULL,
+        created_month DATE        NOT NULL,
+        order_count   INT         NOT NULL DEFAULT 0,
+        updated_at    DATETIME    DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (warehouse_id, company_id, status, created_month),
+        INDEX idx_osc_month (created_month)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    """
+
     # E-way bill automation tables
     transport_routes_sql = """
     CREATE TABLE IF NOT EXISTS transport_routes (
@@ -775,7 +1535,8 @@ def create_all_tables():
         potential_order_sql, potential_order_product_sql, order_sql,
         order_state_history_sql, order_box_sql, order_product_sql,
         box_product_sql, invoice_sql, user_warehouse_company_sql,
-        roles_sql, role_order_states_sql, role_uploads_sql, upload_batches_sql,
+        roles_sql, role_order_states_sql, role_uploads_sql, upload_batches_sql, upload_jobs_sql,
+        cache_versions_sql, order_status_counts_sql,
         transport_routes_sql, customer_route_mappings_sql, daily_route_manifests_sql,
         company_schema_mappings_sql, invoice_processing_config_sql,
     ]
@@ -789,6 +1550,10 @@ def create_all_tables():
     _migrate_box_count()
     _drop_city_tables()
     _migrate_roles_table()
+    _migrate_upload_batches_table()
+    _migrate_upload_jobs_table()
+    _migrate_jwt_blocklist_table()
+    _seed_order_status_counts()
 
     # Insert default order states
     insert_default_states()
@@ -850,12 +1615,122 @@ def _migrate_roles_table():
             pass  # Column already exists
 
 
+def _migrate_upload_batches_table():
+    """Add resumable-upload progress columns to upload_batches if missing (idempotent)."""
+    migrations = [
+        "ALTER TABLE upload_batches ADD COLUMN rows_done INT DEFAULT 0",
+        "ALTER TABLE upload_batches ADD COLUMN error_count INT DEFAULT 0",
+        "ALTER TABLE upload_batches ADD COLUMN last_chunk INT DEFAULT 0",
+        "ALTER TABLE upload_batches ADD COLUMN chunk_rows INT NULL",
+    ]
+    for sql in migrations:
+        try:
+            mysql_manager.execute_query(sql, fetch=False)
+        except Exception:
+            pass  # Column already exists
+
+
+def _migrate_upload_jobs_table():
+    """Add the worker heartbeat column to upload_jobs if missing (idempotent)."""
+    try:
+        mysql_manager.execute_query(
+            "ALTER TABLE upload_jobs ADD COLUMN heartbeat_at DATETIME NULL AFTER worker", fetch=False
+        )
+    except Exception:
+        pass  # Column already exists
+
+
+def _migrate_jwt_blocklist_table():
+    """
+    Convert a jwt_token_blocklist that stores raw tokens to the hashed layout
+    (idempotent). See migration_jwt_blocklist_hash.sql for the same steps.
+
+    A unique index on a partitioned table must include the partition column,
+    so partitioning is removed first. Existing rows get
+    expires_at = created_at + TOKEN_LIFETIME: a token is revoked after it is
+    issued, so that is never earlier than its real 'exp'.
+    """
+    from .core.auth import TOKEN_LIFETIME
+    columns = {
+        r['COLUMN_NAME'] for r in mysql_manager.execute_query(
+            "SELECT COLUMN_NAME FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'jwt_token_blocklist'"
+        ) or []
+    }
+    if 'jwt_token' not in columns:
+        return   # created hashed, or already migrated
+
+    partitions = mysql_manager.execute_query(
+        "SELECT COUNT(*) AS n FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'jwt_token_blocklist' "
+        "AND PARTITION_NAME IS NOT NULL"
+    )
+    steps = []
+    if partitions and partitions[0]['n']:
+        steps.append("ALTER TABLE jwt_token_blocklist REMOVE PARTITIONING")
+    if 'token_hash' not in columns:
+        steps.append(
+            "ALTER TABLE jwt_token_blocklist "
+            "ADD COLUMN token_hash CHAR(64) CHARACTER SET ascii NULL AFTER id, "
+            "ADD COLUMN expires_at DATETIME NULL AFTER token_hash, "
+            "MODIFY jwt_token TEXT NULL"
+        )
+    steps += [
+        # Backfill
+        "UPDATE jwt_token_blocklist "
+        "SET token_hash = SHA2(jwt_token, 256), "
+        f"expires_at = created_at + INTERVAL {int(TOKEN_LIFETIME.total_seconds())} SECOND "
+        "WHERE token_hash IS NULL",
+        # The same token revoked twice: keep the first row
+        "DELETE dup FROM jwt_token_blocklist dup "
+        "JOIN jwt_token_blocklist keep ON keep.token_hash = dup.token_hash AND keep.id < dup.id",
+        "ALTER TABLE jwt_token_blocklist "
+        "DROP PRIMARY KEY, ADD PRIMARY KEY (id), "
+        "MODIFY token_hash CHAR(64) CHARACTER SET ascii NOT NULL, "
+        "MODIFY expires_at DATETIME NOT NULL, "
+        "ADD UNIQUE INDEX uq_jwt_token_hash (token_hash), "
+        "ADD INDEX idx_jwt_token_expires (expires_at), "
+        "DROP COLUMN jwt_token",
+    ]
+    for sql in steps:
+        mysql_manager.execute_query(sql, fetch=False)
+    logger.info("jwt_token_blocklist migrated to hashed tokens")
+
+
+def _seed_order_status_counts():
+    """Fill order_status_counts from potential_order when the table is new (empty)."""
+    if mysql_manager.execute_query("SELECT 1 FROM order_status_counts LIMIT 1"):
+        return
+    from .repositories import status_count_repo
+    status_count_repo.rebuild()
+
+
+def _backfill_status_changed_at():
+    """
+    Set potential_order.status_changed_at on existing rows: the last
+    order_state_history entry, else updated_at / created_at. updated_at is
+    assigned to itself so ON UPDATE does not bump it (recent activity sorts on it).
+    """
+    updated = mysql_manager.execute_query(
+        """UPDATE potential_order po
+           LEFT JOIN (SELECT potential_order_id, MAX(changed_at) AS changed_at
+                      FROM order_state_history GROUP BY potential_order_id) h
+             ON h.potential_order_id = po.potential_order_id
+           SET po.status_changed_at = COALESCE(h.changed_at, po.updated_at, po.created_at),
+               po.updated_at = po.updated_at
+           WHERE po.status_changed_at IS NULL""",
+        fetch=False
+    )
+    logger.info("Backfilled potential_order.status_changed_at", extra={'rows': updated})
+
+
 def _migrate_potential_order_table():
     """Add columns to potential_order if missing (idempotent)."""
     migrations = [
         "ALTER TABLE potential_order ADD COLUMN upload_batch_id INT NULL",
         "ALTER TABLE potential_order ADD COLUMN invoice_submitted TINYINT(1) NOT NULL DEFAULT 0",
         "ALTER TABLE potential_order ADD INDEX idx_po_invoice_submitted (invoice_submitted)",
+        "ALTER TABLE potential_order ADD INDEX idx_po_updated_at (updated_at)",
     ]
     for sql in migrations:
         try:
@@ -863,6 +1738,16 @@ def _migrate_potential_order_table():
         except Exception:
             pass  # Column / index already exists
 
+    try:
+        mysql_manager.execute_query(
+            "ALTER TABLE potential_order ADD COLUMN status_changed_at DATETIME NULL AFTER updated_at",
+            fetch=False
+        )
+    except Exception:
+        pass  # Column already exists
+    else:
+        _backfill_status_changed_at()
+
     # Seed invoice_processing_config bypass types if table exists but is empty
     try:
         mysql_manager.execute_query(
@@ -5,7 +5,13 @@ MySQL Models - Direct MySQL implementation replacing SQLAlchemy
 
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
-from .db_manager import mysql_manager, MySQLModel, partition_filter
+from .config import BaseConfig
+from .core.cache import TTLCache
+from .db_manager import mysql_manager, MySQLModel, partition_filter, row_record
+from .utils.pagination import keyset_condition
+
+# PotentialOrder.count_grouped_by_status results keyed by (warehouse_id, company_id)
+_status_count_cache = TTLCache('status_counts', 1024, BaseConfig.STATUS_COUNT_CACHE_TTL_SECONDS)
 
 
 class Users(MySQLModel):
@@ -21,10 +27,17 @@ class Users(MySQLModel):
         self.date_joined = kwargs.get('date_joined')
         self.status = kwargs.get('status', 'pending')   # pending | active | blocked
         self.role = kwargs.get('role', 'viewer')         # admin | manager | warehouse_staff | dispatcher | viewer
+        # Columns as stored — the auth cache serves them, so a change invalidates it
+        self._saved_fields = self._cached_fields() if self.id else None
+
+    def _cached_fields(self):
+        return (self.username, self.email, self.password, bool(self.jwt_auth_active),
+                self.status, self.role)
 
     def save(self):
-        """Save user to database"""
+        """Save user to database (and drop cached auth users if a cached column changed)"""
         if self.id:
+            changed = self._cached_fields() != self._saved_fields
             mysql_manager.execute_query(
                 """UPDATE users SET username=%s, email=%s, password=%s,
                    jwt_auth_active=%s, status=%s, role=%s WHERE id=%s""",
@@ -42,6 +55,11 @@ class Users(MySQLModel):
                      self.date_joined or datetime.utcnow(), self.status, self.role)
                 )
                 self.id = cursor.lastrowid
+            changed = False     # not cached yet: only existing users are
+        if changed:
+            from .core.auth import invalidate_user_cache
+            invalidate_user_cache()
+        self._saved_fields = self._cached_fields()
 
     def set_password(self, password):
         """Hash and set password"""
@@ -107,22 +125,24 @@ class Users(MySQLModel):
 
 
 class JWTTokenBlocklist(MySQLModel):
-    """JWT Token Blocklist model"""
+    """JWT Token Blocklist model — the SHA-256 of a revoked token and its exp"""
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.id = kwargs.get('id')
-        self.jwt_token = kwargs.get('jwt_token')
+        self.token_hash = kwargs.get('token_hash')
+        self.expires_at = kwargs.get('expires_at')
         self.created_at = kwargs.get('created_at')
 
     def save(self):
-        """Save blocked token"""
+        """Save blocked token (no-op if this token is already blocked)"""
         with mysql_manager.get_cursor() as cursor:
             cursor.execute(
-                "INSERT INTO jwt_token_blocklist (jwt_token, created_at) VALUES (%s, %s)",
-                (self.jwt_token, self.created_at or datetime.utcnow())
+                "INSERT IGNORE INTO jwt_token_blocklist (token_hash, expires_at, created_at) "
+                "VALUES (%s, %s, %s)",
+                (self.token_hash, self.expires_at, self.created_at or datetime.utcnow())
             )
-            self.id = cursor.lastrowid
+            self.id = cursor.lastrowid or None
 
 
 class Warehouse(MySQLModel):
@@ -217,6 +237,10 @@ class Company(MySQLModel):
 class Dealer(MySQLModel):
     """Dealer model"""
 
+    TABLE = 'dealer'
+    PRIMARY_KEY = 'dealer_id'
+    COLUMNS = ('name', 'dealer_code', 'town', 'created_at', 'updated_at')
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.dealer_id = kwargs.get('dealer_id')
@@ -367,6 +391,10 @@ class Product(MySQLModel):
 class Box(MySQLModel):
     """Box model"""
 
+    TABLE = 'box'
+    PRIMARY_KEY = 'box_id'
+    COLUMNS = ('name', 'created_at', 'updated_at')
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.box_id = kwargs.get('box_id')
@@ -450,6 +478,12 @@ class OrderState(MySQLModel):
 class PotentialOrder(MySQLModel):
     """Potential Order model"""
 
+    # What the order list grid shows — find_by_filters(columns=LIST_COLUMNS)
+    LIST_COLUMNS = (
+        'potential_order_id', 'original_order_id', 'order_date', 'status', 'requested_by',
+        'invoice_submitted', 'created_at', 'updated_at', 'status_changed_at',
+    )
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.potential_order_id = kwargs.get('potential_order_id')
@@ -472,43 +506,56 @@ class PotentialOrder(MySQLModel):
         self.upload_batch_id = kwargs.get('upload_batch_id')
         self.created_at = kwargs.get('created_at')
         self.updated_at = kwargs.get('updated_at')
+        self.status_changed_at = kwargs.get('status_changed_at', self.created_at)
+        # Status as stored — a change moves the order in order_status_counts
+        self._saved_status = self.status if self.potential_order_id else None
 
     def save(self):
-        """Save potential order"""
+        """Save potential order (and keep order_status_counts in step)"""
+        from .repositories import status_count_repo
         if self.potential_order_id:
+            now = datetime.utcnow()
+            status_changed_at = None   # COALESCE keeps the stored value
+            if self.status != self._saved_status:
+                status_count_repo.move_orders([self.potential_order_id], self.status)
+                self.status_changed_at = status_changed_at = now
             mysql_manager.execute_query(
                 """UPDATE potential_order SET original_order_id=%s, b2b_po_number=%s,
                    order_type=%s, vin_number=%s, shipping_address=%s,
                    source_created_by=%s, purchaser_sap_code=%s, purchaser_name=%s,
                    warehouse_id=%s, company_id=%s, dealer_id=%s, order_date=%s,
-                   requested_by=%s, status=%s, box_count=%s, invoice_submitted=%s, updated_at=%s
+                   requested_by=%s, status=%s, box_count=%s, invoice_submitted=%s, updated_at=%s,
+                   status_changed_at=COALESCE(%s, status_changed_at)
                    WHERE potential_order_id=%s""",
                 (self.original_order_id, self.b2b_po_number,
                  self.order_type, self.vin_number, self.shipping_address,
                  self.source_created_by, self.purchaser_sap_code, self.purchaser_name,
                  self.warehouse_id, self.company_id, self.dealer_id, self.order_date,
                  self.requested_by, self.status, self.box_count, int(self.invoice_submitted),
-                 datetime.utcnow(), self.potential_order_id),
+                 now, status_changed_at, self.potential_order_id),
                 fetch=False
             )
         else:
+            self.created_at = self.status_changed_at = datetime.utcnow()
             with mysql_manager.get_cursor() as cursor:
                 cursor.execute(
                     """INSERT INTO potential_order (original_order_id, b2b_po_number,
                        order_type, vin_number, shipping_address, source_created_by,
                        purchaser_sap_code, purchaser_name, warehouse_id, company_id,
                        dealer_id, order_date, requested_by, status, box_count, upload_batch_id,
-                       created_at, updated_at)
+                       created_at, updated_at, status_changed_at)
                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                               %s, %s, %s, %s, %s, %s, %s, %s)""",
+                               %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
                     (self.original_order_id, self.b2b_po_number,
                      self.order_type, self.vin_number, self.shipping_address,
                      self.source_created_by, self.purchaser_sap_code, self.purchaser_name,
                      self.warehouse_id, self.company_id, self.dealer_id, self.order_date,
                      self.requested_by, self.status, self.box_count, self.upload_batch_id,
-                     datetime.utcnow(), datetime.utcnow())
+                     self.created_at, self.created_at, self.created_at)
                 )
                 self.potential_order_id = cursor.lastrowid
+            status_count_repo.add_orders([self])
+        self._saved_status = self.status
 
     @classmethod
     def get_by_id(cls, potential_order_id):
@@ -541,32 +588,47 @@ class PotentialOrder(MySQLModel):
         return result[0]['count'] if result else 0
 
     @classmethod
-    def find_by_filters(cls, status=None, warehouse_id=None, company_id=None, limit=1000, offset=0, sort_by='created_at'):
-        """Find orders by filters — scoped to the active 4-month partition window."""
-        pf_sql, pf_params = partition_filter('potential_order', alias='po')
-        query = f"""
-        SELECT po.*, d.name as dealer_name, u.username as assigned_username
-        FROM potential_order po
-        LEFT JOIN dealer d ON po.dealer_id = d.dealer_id
-        LEFT JOIN users u ON po.requested_by = u.id
-        WHERE {pf_sql}
+    def count_grouped_by_status(cls, warehouse_id=None, company_id=None):
         """
-        params = list(pf_params)
+        Count orders of every status, with optional filters, from the
+        order_status_counts summary (one small GROUP BY over a few counter
+        rows per month, not over potential_order).
+        Returns {status: count} including 0 for each OrderStatus with no orders.
 
-        if status:
-            query += " AND po.status = %s"
-            params.append(status)
-
-        if warehouse_id:
-            query += " AND po.warehouse_id = %s"
-            params.append(warehouse_id)
+        Results are cached per (warehouse_id, company_id) for
+        STATUS_COUNT_CACHE_TTL_SECONDS (0 disables the cache).
+        """
+        from .constants.order_states import OrderStatus
+        from .repositories import status_count_repo
+        use_cache = BaseConfig.STATUS_COUNT_CACHE_TTL_SECONDS > 0
+        key = (warehouse_id or None, company_id or None)
+        if use_cache:
+            cached = _status_count_cache.get(key)
+            if cached is not None:
+                return dict(cached)
+
+        counts = {s.value: 0 for s in OrderStatus}
+        counts.update(status_count_repo.counts_by_status(warehouse_id, company_id))
+
+        if use_cache:
+            _status_count_cache.set(key, counts)
+        return dict(counts)
 
-        if company_id:
-            query += " AND po.company_id = %s"
-            params.append(company_id)
+    @classmethod
+    def find_by_filters(cls, status=None, warehouse_id=None, company_id=None, limit=1000, offset=0,
+                        sort_by='created_at', statuses=None, after=None, columns=None):
+        """
+        Find orders by filters — scoped to the active 4-month partition window.
 
-        sort_col = 'updated_at' if sort_by == 'updated_at' else 'created_at'
-        query += f" ORDER BY po.{sort_col} DESC LIMIT %s OFFSET %s"
+        Newest first by sort_by, ties broken by potential_order_id. Pass
+        after=(ts, potential_order_id) from utils.pagination.decode_cursor to
+        read the page following that row (keyset); offset is for old clients.
+        columns limits the potential_order columns read (default all),
+        e.g. LIST_COLUMNS for list views.
+        """
+        query, params = cls._filters_query(status, warehouse_id, company_id,
+                                           sort_by, statuses, after, columns)
+        query += " LIMIT %s OFFSET %s"
         params.append(limit)
         params.append(offset)
 
@@ -574,16 +636,42 @@ class PotentialOrder(MySQLModel):
         return results
 
     @classmethod
-    def count_by_filters(cls, status=None, warehouse_id=None, company_id=None):
-        """Count orders matching filters — used for pagination total."""
+    def iter_by_filters(cls, status=None, warehouse_id=None, company_id=None,
+                        sort_by='created_at', statuses=None, columns=None):
+        """
+        Every order matching the filters, in find_by_filters order, streamed
+        from the server one row at a time (mysql_manager.stream_query) —
+        for exports of the whole window.
+        """
+        query, params = cls._filters_query(status, warehouse_id, company_id,
+                                           sort_by, statuses, None, columns)
+        return mysql_manager.stream_query(query, params)
+
+    @classmethod
+    def _filters_query(cls, status, warehouse_id, company_id, sort_by, statuses, after, columns):
+        """SELECT ... ORDER BY for find_by_filters / iter_by_filters, and its params."""
         pf_sql, pf_params = partition_filter('potential_order', alias='po')
-        query = f"SELECT COUNT(*) as cnt FROM potential_order po WHERE {pf_sql}"
+        po_cols = ', '.join(f'po.{c}' for c in columns) if columns else 'po.*'
+        query = f"""
+        SELECT {po_cols}, d.name as dealer_name, u.username as assigned_username
+        FROM potential_order po
+        LEFT JOIN dealer d ON po.dealer_id = d.dealer_id
+        LEFT JOIN users u ON po.requested_by = u.id
+        WHERE {pf_sql}
+        """
         params = list(pf_params)
 
         if status:
             query += " AND po.status = %s"
             params.append(status)
 
+        if statuses is not None:
+            if statuses:
+                query += f" AND po.status IN ({', '.join(['%s'] * len(statuses))})"
+                params.extend(statuses)
+            else:
+                query += " AND FALSE"
+
         if warehouse_id:
             query += " AND po.warehouse_id = %s"
             params.append(warehouse_id)
@@ -592,8 +680,14 @@ class PotentialOrder(MySQLModel):
             query += " AND po.company_id = %s"
             params.append(company_id)
 
-        result = mysql_manager.execute_query(query, params)
-        return result[0]['cnt'] if result else 0
+        sort_col = 'updated_at' if sort_by == 'updated_at' else 'created_at'
+        if after:
+            ks_sql, ks_params = keyset_condition(f'po.{sort_col}', 'po.potential_order_id', after)
+            query += f" AND {ks_sql}"
+            params.extend(ks_params)
+
+        query += f" ORDER BY po.{sort_col} DESC, po.potential_order_id DESC"
+        return query, params
 
     @classmethod
     def find_by_original_order_id(cls, original_order_id, warehouse_id=None, company_id=None):  # noqa: ARG003
@@ -634,6 +728,14 @@ class PotentialOrder(MySQLModel):
         return {r['original_order_id']: cls(**r) for r in results} if results else {}
 
 
+# What the upload pipelines read from each pre-fetched order — the bulk
+# finders return these instead of full PotentialOrder objects
+PotentialOrderRecord = row_record('PotentialOrderRecord', (
+    'potential_order_id', 'original_order_id', 'order_type', 'warehouse_id', 'company_id',
+    'dealer_id', 'status', 'box_count', 'invoice_submitted', 'created_at',
+))
+
+
 class PotentialOrderProduct(MySQLModel):
     """Potential Order Product model"""
 
@@ -801,6 +903,11 @@ class Order(MySQLModel):
 class OrderStateHistory(MySQLModel):
     """Order State History model"""
 
+    TABLE = 'order_state_history'
+    PRIMARY_KEY = 'order_state_history_id'
+    COLUMNS = ('potential_order_id', 'state_id', 'changed_by', 'changed_at')
+    TIMESTAMP_COLUMNS = ('changed_at',)
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.order_state_history_id = kwargs.get('order_state_history_id')
@@ -886,6 +993,10 @@ class OrderProduct(MySQLModel):
 class BoxProduct(MySQLModel):
     """Box Product model"""
 
+    TABLE = 'box_product'
+    PRIMARY_KEY = 'box_product_id'
+    COLUMNS = ('box_id', 'product_id', 'quantity', 'potential_order_id', 'created_at', 'updated_at')
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.box_product_id = kwargs.get('box_product_id')
@@ -1031,6 +1142,25 @@ class Invoice(MySQLModel):
         }
 
 
+# One invoice row of an upload, in the column order of the bulk INSERT.
+# Must match the fields set by invoice_business.create_invoice_from_row().
+InvoiceRecord = row_record('InvoiceRecord', (
+    'potential_order_id', 'warehouse_id', 'company_id', 'dealer_id',
+    'invoice_number', 'original_order_id', 'invoice_date', 'invoice_type',
+    'cancellation_date', 'total_invoice_amount', 'invoice_header_type',
+    'order_date', 'b2b_purchase_order_number', 'b2b_order_type',
+    'account_tin', 'cash_customer_name', 'contact_first_name',
+    'contact_last_name', 'customer_category',
+    'round_off_amount', 'invoice_round_off_amount', 'short_amount', 'realized_amount',
+    'hmcgl_card_no', 'campaign',
+    'packaging_forwarding_charges', 'tax_on_pf', 'type_of_tax_pf',
+    'irn_number', 'irn_status', 'ack_number', 'ack_date',
+    'credit_note_number', 'irn_cancel', 'irn_status_cancel',
+    'ack_number_cancel', 'ack_date_cancel',
+    'uploaded_by', 'upload_batch_id', 'created_at', 'updated_at',
+))
+
+
 class InvoiceProcessingConfig(MySQLModel):
     """
     Generic key-value configuration for invoice processing rules.
@@ -1193,6 +1323,11 @@ class TransportRoute(MySQLModel):
 class CustomerRouteMapping(MySQLModel):
     """Customer to Route Mapping model — keyed by dealer_id FK"""
 
+    TABLE = 'customer_route_mappings'
+    PRIMARY_KEY = 'mapping_id'
+    COLUMNS = ('dealer_id', 'route_id', 'distance', 'created_at', 'updated_at')
+    UPSERT_COLUMNS = ('route_id', 'distance', 'updated_at')   # unique on dealer_id
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.mapping_id = kwargs.get('mapping_id')
@@ -1281,6 +1416,11 @@ class CustomerRouteMapping(MySQLModel):
 class DailyRouteManifest(MySQLModel):
     """Daily Route Manifest model"""
 
+    TABLE = 'daily_route_manifests'
+    PRIMARY_KEY = 'manifest_id'
+    COLUMNS = ('route_id', 'vehicle_number', 'manifest_date', 'created_at', 'updated_at')
+    UPSERT_COLUMNS = ('vehicle_number', 'updated_at')   # unique on (route_id, manifest_date)
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.manifest_id = kwargs.get('manifest_id')
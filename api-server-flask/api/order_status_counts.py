@@ -0,0 +1,53 @@
+"""
+Order status counts — reconciliation for the order_status_counts summary.
+
+The dashboard counts (/api/orders/status, /api/status) are read from
+order_status_counts, which every order write keeps in step incrementally
+(repositories/status_count_repository.py). This command checks it against
+potential_order and rebuilds it if anything drifted — e.g. after a manual
+UPDATE in the database.
+
+Run modes
+─────────
+• Cron (recommended, off-hours):
+      # report drift every night, rebuild only if needed
+      15 3 * * * python -m api.order_status_counts check --fix
+
+• By hand:
+      python -m api.order_status_counts check      # list counters that are off
+      python -m api.order_status_counts rebuild    # recompute from potential_order
+"""
+
+import sys
+from .repositories import status_count_repo
+
+
+# ── CLI entry point ───────────────────────────────────────────────────────────
+
+def _cli():
+    import os
+    # Ensure Flask app env is loaded so db_manager connects
+    os.environ.setdefault('FLASK_APP', 'run.py')
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else 'help'
+
+    if cmd == 'check':
+        drift = status_count_repo.drift()
+        for d in drift:
+            print(f"  warehouse={d['warehouse_id']:<4} company={d['company_id']:<4} "
+                  f"{d['created_month']}  {d['status']:20s}  counted={d['counted']:>7}  actual={d['actual']:>7}")
+        print(f"{len(drift)} counter(s) out of step.")
+        if drift and '--fix' in sys.argv:
+            rows = status_count_repo.rebuild()
+            print(f"Rebuilt order_status_counts ({rows} rows).")
+
+    elif cmd == 'rebuild':
+        rows = status_count_repo.rebuild()
+        print(f"Rebuilt order_status_counts ({rows} rows).")
+
+    else:
+        print("Usage: python -m api.order_status_counts [check [--fix]|rebuild]")
+
+
+if __name__ == '__main__':
+    _cli()
@@ -1,58 +1,76 @@
 """
 Dynamic role-based permissions — all stored in DB, managed via Flask-Admin.
 No code changes needed to add/edit roles.
+
+Every role's permissions are loaded in one joined query and kept in a
+process-wide cache (TTLCache 'role_permissions'). The Flask-Admin role views
+call invalidate_permissions() after each write, which reaches every worker
+through cache_versions.
 """
 
+from .config import BaseConfig
+from .core.cache import TTLCache
 from .db_manager import mysql_manager
 
 ALL_ORDER_STATES = ['Open', 'Picking', 'Packed', 'Invoiced', 'Dispatch Ready', 'Completed', 'Partially Completed']
 ALL_UPLOAD_TYPES = ['orders', 'invoices', 'products']
 
 
+_NO_PERMISSIONS = {'order_states': [], 'uploads': [], 'all_warehouses': False, 'eway_bill_admin': False, 'eway_bill_filling': False, 'supply_sheet': False}
+
+# One entry: role name → permissions dict, for every role.
+_ALL_ROLES = 'all'
+_role_cache = TTLCache('role_permissions', 1, BaseConfig.PERMISSION_CACHE_TTL_SECONDS)
+
+
+def _load_all_permissions():
+    """Permissions of every role, keyed by role name — one query (states × uploads per role)."""
+    rows = mysql_manager.execute_query(
+        "SELECT r.name, r.all_warehouses, r.eway_bill_admin, r.eway_bill_filling, r.supply_sheet, "
+        "       s.state_name, u.upload_type "
+        "FROM roles r "
+        "LEFT JOIN role_order_states s ON s.role_id = r.role_id "
+        "LEFT JOIN role_uploads u ON u.role_id = r.role_id "
+        "ORDER BY r.role_id, s.id, u.id"
+    ) or []
+    roles = {}
+    for row in rows:
+        perms = roles.get(row['name'])
+        if perms is None:
+            perms = roles[row['name']] = {
+                'order_states': [],
+                'uploads': [],
+                'all_warehouses': bool(row['all_warehouses']),
+                'eway_bill_admin': bool(row['eway_bill_admin']),
+                'eway_bill_filling': bool(row['eway_bill_filling']),
+                'supply_sheet': bool(row['supply_sheet']),
+            }
+        if row['state_name'] and row['state_name'] not in perms['order_states']:
+            perms['order_states'].append(row['state_name'])
+        if row['upload_type'] and row['upload_type'] not in perms['uploads']:
+            perms['uploads'].append(row['upload_type'])
+    return roles
+
+
+def _all_permissions():
+    roles = _role_cache.get(_ALL_ROLES)
+    if roles is None:
+        roles = _load_all_permissions()
+        _role_cache.set(_ALL_ROLES, roles)
+    return roles
+
+
 def get_permissions(role_name):
-    """Fetch role permissions from DB. Returns safe empty defaults if role not found.
+    """Role permissions from the process-wide cache. Returns safe empty defaults if role not found.
 
-    Bug 22 fix: results are cached on Flask's request context (g) so repeated calls
-    within the same request (from @active_required, @upload_permission_required, and
-    manual checks) only hit the DB once.
+    The returned dict is shared — read it, do not modify it.
     """
-    try:
-        from flask import g
-        cache = g.get('_permissions_cache')
-        if cache is None:
-            g._permissions_cache = {}
-            cache = g._permissions_cache
-        if role_name in cache:
-            return cache[role_name]
-    except RuntimeError:
-        # Outside a request context (e.g. tests) — skip the cache
-        cache = None
-
-    role = mysql_manager.execute_query(
-        "SELECT role_id, all_warehouses, eway_bill_admin, eway_bill_filling, supply_sheet FROM roles WHERE name = %s", (role_name,)
-    )
-    if not role:
-        result = {'order_states': [], 'uploads': [], 'all_warehouses': False, 'eway_bill_admin': False, 'eway_bill_filling': False, 'supply_sheet': False}
-    else:
-        role_id = role[0]['role_id']
-        order_states = mysql_manager.execute_query(
-            "SELECT state_name FROM role_order_states WHERE role_id = %s", (role_id,)
-        )
-        uploads = mysql_manager.execute_query(
-            "SELECT upload_type FROM role_uploads WHERE role_id = %s", (role_id,)
-        )
-        result = {
-            'order_states': [r['state_name'] for r in order_states],
-            'uploads': [r['upload_type'] for r in uploads],
-            'all_warehouses': bool(role[0]['all_warehouses']),
-            'eway_bill_admin': bool(role[0]['eway_bill_admin']),
-            'eway_bill_filling': bool(role[0]['eway_bill_filling']),
-            'supply_sheet': bool(role[0]['supply_sheet']),
-        }
-
-    if cache is not None:
-        cache[role_name] = result
-    return result
+    return _all_permissions().get(role_name, _NO_PERMISSIONS)
+
+
+def invalidate_permissions():
+    """Drop cached role permissions in every worker — call after any roles / role_* write."""
+    _role_cache.invalidate()
 
 
 def can_see_order_state(role_name, state):
@@ -68,6 +86,5 @@ def has_all_warehouse_access(role_name):
 
 
 def get_all_roles():
-    """Return all role names from DB (used to populate dropdowns)."""
-    rows = mysql_manager.execute_query("SELECT name FROM roles ORDER BY name")
-    return [r['name'] for r in rows]
+    """Return all role names (used to populate dropdowns)."""
+    return sorted(_all_permissions())
@@ -16,6 +16,8 @@ from .invoice_repository import InvoiceRepository
 from .product_repository import ProductRepository
 from .user_repository import UserRepository
 from .reference_repository import ReferenceRepository
+from .upload_job_repository import UploadJobRepository
+from .status_count_repository import StatusCountRepository
 
 # Module-level singletons — import these in business-layer modules.
 order_repo = OrderRepository()
@@ -23,9 +25,13 @@ invoice_repo = InvoiceRepository()
 product_repo = ProductRepository()
 user_repo = UserRepository()
 reference_repo = ReferenceRepository()
+upload_job_repo = UploadJobRepository()
+status_count_repo = StatusCountRepository()
 
 __all__ = [
     'OrderRepository', 'InvoiceRepository', 'ProductRepository',
-    'UserRepository', 'ReferenceRepository',
+    'UserRepository', 'ReferenceRepository', 'UploadJobRepository',
+    'StatusCountRepository',
     'order_repo', 'invoice_repo', 'product_repo', 'user_repo', 'reference_repo',
+    'upload_job_repo', 'status_count_repo',
 ]
@@ -5,9 +5,21 @@ BaseRepository — common dependencies for all repository classes.
 Every repository subclass gets:
   self._db              — the MySQLManager singleton
   self._pf(table, ...)  — the partition_filter helper
+  self._bulk_update(...) — set-based UPDATE of many rows by key
+  self._query_in(...)   — a query over an id set of any size, without one giant IN list
 """
 
-from ..db_manager import mysql_manager, partition_filter
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from ..config import BaseConfig
+from ..db_manager import mysql_manager, partition_filter, bulk_update_rows, iter_chunks, WRITE_CHUNK_SIZE
+
+# Suffixes for _query_in's temporary tables — unique per process, so nested use cannot collide
+_temp_table_ids = itertools.count(1)
+
+# 'table.column' → column definition for _query_in's temporary tables (schema is fixed at runtime)
+_source_column_defs = {}
 
 
 class BaseRepository:
@@ -16,3 +28,102 @@ class BaseRepository:
     def __init__(self):
         self._db = mysql_manager
         self._pf = partition_filter
+
+    def _bulk_update(self, table: str, key_col: str, ids, set_values: dict = None,
+                     per_row: dict = None, fill_null=(), fill_empty=(),
+                     chunk_size: int = WRITE_CHUNK_SIZE) -> int:
+        """
+        Set-based UPDATE of the rows whose key_col is in ids — see
+        db_manager.bulk_update_rows for the statement shape and arguments.
+        Returns the number of rows changed.
+        """
+        return bulk_update_rows(table, key_col, ids, set_values=set_values, per_row=per_row,
+                                fill_null=fill_null, fill_empty=fill_empty, chunk_size=chunk_size)
+
+    def _query_in(self, query: str, ids, params: tuple = (), tail_params: tuple = (),
+                  fetch: bool = True, parallel: bool = False, source: str = None):
+        """
+        Run `query` for every id in ids. The query marks where the id list
+        goes with `{ids}`:
+
+            rows = self._query_in(
+                f"SELECT * FROM product WHERE product_string IN {{ids}}", part_numbers)
+
+        - Up to IN_LIST_CHUNK_SIZE ids: one statement.
+        - More: one statement per chunk of ids, results concatenated.
+          parallel=True runs the chunks on separate pooled connections —
+          only for reads that need not see the current unit of work's
+          uncommitted writes. Writes (fetch=False) always stay on it.
+        - Above IN_LIST_TEMP_TABLE_THRESHOLD ids, when `source` names the
+          compared column ('table.column'): the ids go into a temporary table
+          with that column's type and collation, and `{ids}` becomes a
+          subquery on it, which MySQL runs as a semi-join — one statement, no
+          matter the count. Without `source` the ids are chunked as above.
+
+        params are bound before the id list, tail_params after it. Duplicate
+        ids are dropped. Returns the rows, or the summed rowcount when
+        fetch=False.
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return [] if fetch else 0
+        if source and len(ids) > BaseConfig.IN_LIST_TEMP_TABLE_THRESHOLD:
+            return self._query_in_temp_table(query, ids, params, tail_params, fetch, source)
+
+        def run(chunk):
+            return self._db.execute_query(
+                query.replace('{ids}', f"({', '.join(['%s'] * len(chunk))})"),
+                tuple(params) + tuple(chunk) + tuple(tail_params), fetch=fetch
+            )
+
+        chunks = list(iter_chunks(ids, BaseConfig.IN_LIST_CHUNK_SIZE))
+        workers = min(BaseConfig.IN_LIST_MAX_WORKERS, len(chunks))
+        if parallel and fetch and workers > 1:
+            # Worker threads have no unit of work, so each checks out its own connection
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(run, chunks))
+        else:
+            results = [run(chunk) for chunk in chunks]
+        if not fetch:
+            return sum(results)
+        return [row for rows in results for row in rows or ()]
+
+    def _query_in_temp_table(self, query, ids, params, tail_params, fetch, source):
+        """_query_in above the threshold: join a temporary table of the ids."""
+        table = f"_in_ids_{next(_temp_table_ids)}"
+        # A temporary table exists only on the connection that created it
+        with self._db.unit_of_work():
+            # Non-unique index: ids distinct in Python may still compare equal
+            # under the column's collation (case, trailing spaces)
+            self._db.execute_query(
+                f"CREATE TEMPORARY TABLE {table} "
+                f"(id {self._source_column_def(source)} NOT NULL, INDEX (id))", fetch=False
+            )
+            try:
+                self._db.execute_many(f"INSERT INTO {table} (id) VALUES (%s)", [(i,) for i in ids])
+                return self._db.execute_query(
+                    query.replace('{ids}', f"(SELECT id FROM {table})"),
+                    tuple(params) + tuple(tail_params), fetch=fetch
+                )
+            finally:
+                self._db.execute_query(f"DROP TEMPORARY TABLE IF EXISTS {table}", fetch=False)
+
+    def _source_column_def(self, source: str) -> str:
+        """Type (with character set and collation) of the 'table.column' that `source` names."""
+        if source not in _source_column_defs:
+            table, column = source.split('.')
+            rows = self._db.execute_query(
+                """SELECT COLUMN_TYPE AS column_type, CHARACTER_SET_NAME AS charset,
+                          COLLATION_NAME AS collation
+                   FROM information_schema.COLUMNS
+                   WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s""",
+                (table, column)
+            )
+            if not rows:
+                raise ValueError(f"Unknown column for _query_in source: {source}")
+            col = rows[0]
+            definition = col['column_type']
+            if col['charset']:
+                definition += f" CHARACTER SET {col['charset']} COLLATE {col['collation']}"
+            _source_column_defs[source] = definition
+        return _source_column_defs[source]
@@ -12,25 +12,6 @@ from .base_repository import BaseRepository
 
 logger = get_logger(__name__)
 
-# Fixed column order for the bulk invoice INSERT.
-# Must match the fields set by invoice_business.create_invoice_from_row().
-_INVOICE_COLUMNS = (
-    'potential_order_id', 'warehouse_id', 'company_id', 'dealer_id',
-    'invoice_number', 'original_order_id', 'invoice_date', 'invoice_type',
-    'cancellation_date', 'total_invoice_amount', 'invoice_header_type',
-    'order_date', 'b2b_purchase_order_number', 'b2b_order_type',
-    'account_tin', 'cash_customer_name', 'contact_first_name',
-    'contact_last_name', 'customer_category',
-    'round_off_amount', 'invoice_round_off_amount', 'short_amount', 'realized_amount',
-    'hmcgl_card_no', 'campaign',
-    'packaging_forwarding_charges', 'tax_on_pf', 'type_of_tax_pf',
-    'irn_number', 'irn_status', 'ack_number', 'ack_date',
-    'credit_note_number', 'irn_cancel', 'irn_status_cancel',
-    'ack_number_cancel', 'ack_date_cancel',
-    'uploaded_by', 'upload_batch_id', 'created_at', 'updated_at',
-)
-
-
 class InvoiceRepository(BaseRepository):
     """Bulk DB writes for the invoice upload pipeline."""
 
@@ -39,23 +20,59 @@ class InvoiceRepository(BaseRepository):
         from ..models import InvoiceProcessingConfig
         return InvoiceProcessingConfig.get_bypass_order_types()
 
+    def find_original_ids_invoiced_in_batch(self, upload_batch_id, original_order_ids: list) -> set:
+        """
+        Return the subset of original_order_ids that already have an invoice
+        from this upload batch — i.e. orders an earlier chunk of a chunked
+        upload invoiced.
+        """
+        if not upload_batch_id or not original_order_ids:
+            return set()
+        pf_sql, pf_params = self._pf('invoice')
+        rows = self._query_in(
+            f"SELECT DISTINCT original_order_id FROM invoice "
+            f"WHERE {pf_sql} AND upload_batch_id = %s AND original_order_id IN {{ids}}",
+            original_order_ids, pf_params + (upload_batch_id,), source='invoice.original_order_id'
+        )
+        return {r['original_order_id'] for r in rows}
+
+    def find_existing_invoice_numbers(self, invoice_numbers, upload_batch_id=None) -> set:
+        """
+        Return the subset of invoice_numbers already stored (active partition
+        window), via idx_invoice_number. Invoices from upload_batch_id are not
+        counted — a chunked upload repeats its own invoice numbers across
+        chunks, one row per invoice line.
+        """
+        pf_sql, pf_params = self._pf('invoice')
+        batch_sql, batch_params = (
+            (" AND NOT (upload_batch_id <=> %s)", (upload_batch_id,)) if upload_batch_id else ("", ())
+        )
+        rows = self._query_in(
+            f"SELECT DISTINCT invoice_number FROM invoice "
+            f"WHERE {pf_sql} AND invoice_number IN {{ids}}{batch_sql}",
+            invoice_numbers, pf_params, batch_params, source='invoice.invoice_number'
+        )
+        return {r['invoice_number'] for r in rows}
+
     def bulk_insert_invoices(self, invoices: list) -> int:
         """
-        INSERT all Invoice objects in a single executemany call.
+        INSERT all InvoiceRecords in a single executemany call, which PyMySQL
+        sends as multi-row INSERT statements.
 
-        Uses INSERT IGNORE so duplicate invoice_numbers are silently skipped
-        rather than aborting the whole batch.
+        Duplicates are filtered out beforehand (find_existing_invoice_numbers),
+        so every row passed in is written.
 
         Returns:
-            Number of rows actually inserted.
+            Number of rows inserted.
         """
         if not invoices:
             return 0
+        from ..models import InvoiceRecord
 
-        col_str = ', '.join(_INVOICE_COLUMNS)
-        ph_str  = ', '.join(['%s'] * len(_INVOICE_COLUMNS))
-        sql = f"INSERT IGNORE INTO invoice ({col_str}) VALUES ({ph_str})"
-        rows = [tuple(getattr(inv, col) for col in _INVOICE_COLUMNS) for inv in invoices]
+        col_str = ', '.join(InvoiceRecord.COLUMNS)
+        ph_str  = ', '.join(['%s'] * len(InvoiceRecord.COLUMNS))
+        sql = f"INSERT INTO invoice ({col_str}) VALUES ({ph_str})"
+        rows = [inv.as_tuple() for inv in invoices]
 
         with self._db.get_cursor() as cursor:
             cursor.executemany(sql, rows)
@@ -64,8 +81,8 @@ class InvoiceRepository(BaseRepository):
     def bulk_transition_to_invoiced(self, orders_to_invoice: dict, dealer_backfills: dict,
                                     state_id: int, user_id: int, current_time) -> None:
         """
-        Transition a batch of PotentialOrders to Invoiced in three executemany calls:
-          1. UPDATE potential_order  — status + optional dealer backfill
+        Transition a batch of PotentialOrders to Invoiced in three statements:
+          1. UPDATE potential_order  — status + optional dealer backfill (set-based)
           2. INSERT `order`          — one row per unique potential order
           3. INSERT order_state_history
         """
@@ -74,21 +91,16 @@ class InvoiceRepository(BaseRepository):
 
         ts_str = current_time.strftime('%Y%m%d%H%M')
 
-        # 1. Bulk UPDATE potential_orders
-        po_params = [
-            (dealer_backfills.get(pot_id), current_time, pot_id)
-            for pot_id in orders_to_invoice
-        ]
-        with self._db.get_cursor() as cursor:
-            cursor.executemany(
-                """UPDATE potential_order
-                   SET status = 'Invoiced',
-                       invoice_submitted = 0,
-                       dealer_id = COALESCE(dealer_id, %s),
-                       updated_at = %s
-                   WHERE potential_order_id = %s""",
-                po_params
-            )
+        # 1. Bulk UPDATE potential_orders (dashboard counters first — they read the old status)
+        from . import status_count_repo
+        status_count_repo.move_orders(orders_to_invoice.keys(), 'Invoiced')
+        self._bulk_update(
+            'potential_order', 'potential_order_id', list(orders_to_invoice),
+            set_values={'status': 'Invoiced', 'invoice_submitted': 0,
+                        'updated_at': current_time, 'status_changed_at': current_time},
+            per_row={'dealer_id': dealer_backfills},
+            fill_null=('dealer_id',),
+        )
 
         # 2. Bulk INSERT Order records
         order_params = [
@@ -116,98 +128,71 @@ class InvoiceRepository(BaseRepository):
                 hist_params
             )
 
-    def bulk_migrate_products_to_order(self, orders_to_invoice: dict, current_time) -> None:
+    def bulk_migrate_products_to_order(self, orders_to_invoice: dict, current_time) -> int:
         """
         Copy potential_order_product rows into order_product for all just-invoiced orders.
 
-        Runs after bulk_transition_to_invoiced has committed the `order` records.
-        Uses two SELECTs + one executemany INSERT.
+        Runs after bulk_transition_to_invoiced has inserted the `order` records.
+        One INSERT ... SELECT joining each product line to its `order` row, so the
+        lines never leave the server. potential_order_id is not unique in
+        `order`, so each order joins only its newest row (MAX(order_id)) —
+        otherwise every line would be copied once per row.
+
+        Returns:
+            Number of order_product rows inserted.
         """
         if not orders_to_invoice:
-            return
+            return 0
 
         pot_ids = list(orders_to_invoice.keys())
         placeholders = ','.join(['%s'] * len(pot_ids))
-
-        # Fetch order_id for each potential_order_id
+        pf_sql_p, pf_params_p = self._pf('potential_order_product', alias='pop')
         pf_sql_o, pf_params_o = self._pf('order')
-        order_rows = self._db.execute_query(
-            f"SELECT order_id, potential_order_id FROM `order` "
-            f"WHERE {pf_sql_o} AND potential_order_id IN ({placeholders})",
-            pf_params_o + tuple(pot_ids)
-        )
-        if not order_rows:
-            return
-
-        pot_to_order = {r['potential_order_id']: r['order_id'] for r in order_rows}
-
-        # Bulk fetch product rows for those potential orders
-        pf_sql_p, pf_params_p = self._pf('potential_order_product')
-        pop_rows = self._db.execute_query(
-            f"SELECT potential_order_id, product_id, quantity, mrp, total_price "
-            f"FROM potential_order_product "
-            f"WHERE {pf_sql_p} AND potential_order_id IN ({placeholders})",
-            pf_params_p + tuple(pot_ids)
+        inserted = self._db.execute_query(
+            f"""INSERT IGNORE INTO order_product
+                (order_id, product_id, quantity, mrp, total_price, created_at, updated_at)
+                SELECT o.order_id, pop.product_id, pop.quantity, pop.mrp, pop.total_price, %s, %s
+                FROM potential_order_product pop
+                JOIN (SELECT potential_order_id, MAX(order_id) AS order_id
+                      FROM `order`
+                      WHERE {pf_sql_o} AND potential_order_id IN ({placeholders})
+                      GROUP BY potential_order_id) o
+                  ON o.potential_order_id = pop.potential_order_id
+                WHERE {pf_sql_p} AND pop.potential_order_id IN ({placeholders})""",
+            (current_time, current_time) + pf_params_o + tuple(pot_ids) + pf_params_p + tuple(pot_ids),
+            fetch=False
         )
-        if not pop_rows:
-            return
-
-        op_rows = [
-            (pot_to_order[r['potential_order_id']], r['product_id'],
-             r['quantity'], r['mrp'], r['total_price'], current_time, current_time)
-            for r in pop_rows
-            if r['potential_order_id'] in pot_to_order
-        ]
-
-        if op_rows:
-            with self._db.get_cursor() as cursor:
-                cursor.executemany(
-                    """INSERT IGNORE INTO order_product
-                       (order_id, product_id, quantity, mrp, total_price, created_at, updated_at)
-                       VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                    op_rows
-                )
-            logger.debug("Migrated product rows", extra={'product_rows': len(op_rows), 'orders': len(pot_to_order)})
+        logger.debug("Migrated product rows", extra={'product_rows': inserted, 'orders': len(pot_ids)})
+        return inserted
 
     def migrate_products_to_order_single(self, potential_order_id: int,
-                                          order_id: int, current_time) -> None:
+                                          order_id: int, current_time) -> int:
         """
         Copy potential_order_product rows into order_product for a single order.
         Used by the single-order invoicing path (update_order_to_invoiced).
+
+        Returns:
+            Number of order_product rows inserted.
         """
-        pf_sql, pf_params = self._pf('potential_order_product')
-        pop_rows = self._db.execute_query(
-            f"SELECT product_id, quantity, mrp, total_price FROM potential_order_product "
-            f"WHERE {pf_sql} AND potential_order_id = %s",
-            pf_params + (potential_order_id,)
+        pf_sql, pf_params = self._pf('potential_order_product', alias='pop')
+        inserted = self._db.execute_query(
+            f"""INSERT IGNORE INTO order_product
+                (order_id, product_id, quantity, mrp, total_price, created_at, updated_at)
+                SELECT %s, pop.product_id, pop.quantity, pop.mrp, pop.total_price, %s, %s
+                FROM potential_order_product pop
+                WHERE {pf_sql} AND pop.potential_order_id = %s""",
+            (order_id, current_time, current_time) + pf_params + (potential_order_id,),
+            fetch=False
         )
-        if not pop_rows:
-            return
-
-        op_rows = [
-            (order_id, r['product_id'], r['quantity'], r['mrp'],
-             r['total_price'], current_time, current_time)
-            for r in pop_rows
-        ]
-        with self._db.get_cursor() as cursor:
-            cursor.executemany(
-                """INSERT IGNORE INTO order_product
-                   (order_id, product_id, quantity, mrp, total_price, created_at, updated_at)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                op_rows
-            )
         logger.debug("Migrated product rows for single order",
-                     extra={'product_rows': len(op_rows), 'order_id': order_id})
+                     extra={'product_rows': inserted, 'order_id': order_id})
+        return inserted
 
     def bulk_flag_orders(self, orders_to_flag: dict, current_time) -> None:
-        """Set invoice_submitted=1 on a batch of PotentialOrders in one executemany call."""
+        """Set invoice_submitted=1 on a batch of PotentialOrders in one UPDATE."""
         if not orders_to_flag:
             return
-        params = [(current_time, pot_id) for pot_id in orders_to_flag]
-        with self._db.get_cursor() as cursor:
-            cursor.executemany(
-                """UPDATE potential_order
-                   SET invoice_submitted = 1, updated_at = %s
-                   WHERE potential_order_id = %s""",
-                params
-            )
+        self._bulk_update(
+            'potential_order', 'potential_order_id', list(orders_to_flag),
+            set_values={'invoice_submitted': 1, 'updated_at': current_time},
+        )
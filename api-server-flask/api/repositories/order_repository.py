@@ -5,34 +5,111 @@ and the Dealer name lookup used during bulk status updates.
 """
 
 from ..core.logging import get_logger
+from ..db_manager import insert_rows_returning_ids
 from .base_repository import BaseRepository
 
 logger = get_logger(__name__)
 
+# Fixed column order for the bulk potential_order INSERT.
+_POTENTIAL_ORDER_COLUMNS = (
+    'original_order_id', 'b2b_po_number', 'order_type', 'vin_number',
+    'shipping_address', 'source_created_by', 'purchaser_sap_code', 'purchaser_name',
+    'warehouse_id', 'company_id', 'dealer_id', 'order_date', 'requested_by',
+    'status', 'box_count', 'upload_batch_id', 'created_at', 'updated_at', 'status_changed_at',
+)
+
 
 class OrderRepository(BaseRepository):
     """Data access layer for order-domain entities."""
 
     # ── PotentialOrder ────────────────────────────────────────────────────────
 
-    def find_bulk_by_original_ids(self, order_ids: list) -> dict:
+    def find_bulk_by_original_ids(self, order_ids: list, as_records: bool = False) -> dict:
         """
-        Fetch multiple PotentialOrders in one IN query (active partition window).
+        Fetch multiple PotentialOrders by original_order_id (active partition
+        window), via _query_in.
+
+        as_records=True reads only PotentialOrderRecord's columns into slotted
+        records — for pipelines that classify orders and write them back in
+        bulk rather than through save().
 
         Returns:
-            dict mapping original_order_id → PotentialOrder instance
+            dict mapping original_order_id → PotentialOrder (or PotentialOrderRecord)
         """
         if not order_ids:
             return {}
-        from ..models import PotentialOrder
+        from ..models import PotentialOrder, PotentialOrderRecord
         pf_sql, pf_params = self._pf('potential_order')
-        placeholders = ','.join(['%s'] * len(order_ids))
-        rows = self._db.execute_query(
-            f"SELECT * FROM potential_order "
-            f"WHERE {pf_sql} AND original_order_id IN ({placeholders})",
-            pf_params + tuple(order_ids)
+        select = ', '.join(PotentialOrderRecord.COLUMNS) if as_records else '*'
+        build = PotentialOrderRecord.from_row if as_records else (lambda r: PotentialOrder(**r))
+        rows = self._query_in(
+            f"SELECT {select} FROM potential_order "
+            f"WHERE {pf_sql} AND original_order_id IN {{ids}}",
+            order_ids, pf_params, source='potential_order.original_order_id'
+        )
+        return {r['original_order_id']: build(r) for r in rows}
+
+    def find_existing_original_ids(self, order_ids: list) -> set:
+        """Return the subset of original_order_ids already present (active partition window)."""
+        pf_sql, pf_params = self._pf('potential_order')
+        rows = self._query_in(
+            f"SELECT DISTINCT original_order_id FROM potential_order "
+            f"WHERE {pf_sql} AND original_order_id IN {{ids}}",
+            order_ids, pf_params, source='potential_order.original_order_id'
+        )
+        return {r['original_order_id'] for r in rows}
+
+    def bulk_insert_potential_orders(self, orders: list) -> int:
+        """
+        INSERT PotentialOrder objects as multi-row INSERTs and set
+        potential_order_id on each from the block of ids the statement was
+        given (insert_rows_returning_ids).
+
+        Returns:
+            Number of rows inserted.
+        """
+        if not orders:
+            return 0
+
+        rows = [tuple(getattr(po, col) for col in _POTENTIAL_ORDER_COLUMNS) for po in orders]
+        ids = insert_rows_returning_ids('potential_order', _POTENTIAL_ORDER_COLUMNS, rows)
+        for po, potential_order_id in zip(orders, ids):
+            po.potential_order_id = potential_order_id
+
+        from . import status_count_repo
+        status_count_repo.add_orders(orders)
+        return len(orders)
+
+    def find_bulk_by_ids(self, potential_order_ids: list) -> dict:
+        """
+        Fetch PotentialOrders by primary key (active window), via _query_in.
+
+        Returns:
+            dict mapping potential_order_id → PotentialOrderRecord
+        """
+        from ..models import PotentialOrderRecord
+        pf_sql, pf_params = self._pf('potential_order')
+        select = ', '.join(PotentialOrderRecord.COLUMNS)
+        rows = self._query_in(
+            f"SELECT {select} FROM potential_order "
+            f"WHERE {pf_sql} AND potential_order_id IN {{ids}}",
+            potential_order_ids, pf_params, source='potential_order.potential_order_id'
+        )
+        return {r['potential_order_id']: PotentialOrderRecord.from_row(r) for r in rows}
+
+    def bulk_set_status(self, potential_order_ids: list, status: str, changed_at) -> int:
+        """
+        Move PotentialOrders to `status` with set-based UPDATEs, keeping the
+        dashboard counters in step. Returns rows changed.
+        """
+        if not potential_order_ids:
+            return 0
+        from . import status_count_repo
+        status_count_repo.move_orders(potential_order_ids, status)
+        return self._bulk_update(
+            'potential_order', 'potential_order_id', potential_order_ids,
+            set_values={'status': status, 'updated_at': changed_at, 'status_changed_at': changed_at},
         )
-        return {r['original_order_id']: PotentialOrder(**r) for r in rows} if rows else {}
 
     def find_by_id(self, potential_order_id: int):
         """Return a single PotentialOrder by primary key, or None."""
@@ -56,6 +133,40 @@ class OrderRepository(BaseRepository):
         )
         return Order(**rows[0]) if rows else None
 
+    def find_orders_by_potential_ids(self, potential_order_ids: list) -> dict:
+        """Order records for many PotentialOrders: potential_order_id → Order."""
+        from ..models import Order
+        pf_sql, pf_params = self._pf('order')
+        rows = self._query_in(
+            f"SELECT * FROM `order` WHERE {pf_sql} AND potential_order_id IN {{ids}}",
+            potential_order_ids, pf_params, source='order.potential_order_id'
+        )
+        return {r['potential_order_id']: Order(**r) for r in rows}
+
+    def bulk_create_orders(self, rows: list) -> None:
+        """
+        INSERT many `order` rows in one executemany call (a multi-row INSERT).
+
+        Args:
+            rows: list of (potential_order_id, order_number, status, box_count, created_at)
+        """
+        if not rows:
+            return
+        with self._db.get_cursor() as cursor:
+            cursor.executemany(
+                """INSERT INTO `order`
+                   (potential_order_id, order_number, status, box_count, created_at, updated_at)
+                   VALUES (%s, %s, %s, %s, %s, %s)""",
+                [(*row, row[-1]) for row in rows]
+            )
+
+    def bulk_complete_orders(self, order_ids: list, dispatched_at) -> int:
+        """Mark `order` records Completed / dispatched with set-based UPDATEs."""
+        return self._bulk_update(
+            '`order`', 'order_id', order_ids,
+            set_values={'status': 'Completed', 'dispatched_date': dispatched_at, 'updated_at': dispatched_at},
+        )
+
     # ── OrderState ───────────────────────────────────────────────────────────
 
     def find_state_by_name(self, state_name: str):
@@ -95,6 +206,57 @@ class OrderRepository(BaseRepository):
             changed_at=changed_at,
         ).save()
 
+    def bulk_create_state_history(self, rows: list) -> None:
+        """
+        INSERT many order_state_history rows in one executemany call.
+
+        Args:
+            rows: list of (potential_order_id, state_id, changed_by, changed_at)
+        """
+        if not rows:
+            return
+        with self._db.get_cursor() as cursor:
+            cursor.executemany(
+                """INSERT INTO order_state_history
+                   (potential_order_id, state_id, changed_by, changed_at)
+                   VALUES (%s, %s, %s, %s)""",
+                rows
+            )
+
+    def find_state_histories(self, potential_order_ids: list) -> dict:
+        """
+        State history (with state_name) of many PotentialOrders, oldest first.
+
+        Returns:
+            dict mapping potential_order_id → list of history row dicts
+        """
+        pf_sql, pf_params = self._pf('order_state_history', alias='osh')
+        rows = self._query_in(
+            f"SELECT osh.*, os.state_name"
+            f" FROM order_state_history osh"
+            f" JOIN order_state os ON osh.state_id = os.state_id"
+            f" WHERE {pf_sql} AND osh.potential_order_id IN {{ids}}"
+            f" ORDER BY osh.potential_order_id, osh.changed_at",
+            potential_order_ids, pf_params, source='order_state_history.potential_order_id'
+        )
+        histories = {}
+        for r in rows:
+            histories.setdefault(r['potential_order_id'], []).append(r)
+        return histories
+
+    # ── PotentialOrderProduct ────────────────────────────────────────────────
+
+    def count_products_by_order(self, potential_order_ids: list) -> dict:
+        """Product line count of many PotentialOrders: potential_order_id → count."""
+        pf_sql, pf_params = self._pf('potential_order_product')
+        rows = self._query_in(
+            f"SELECT potential_order_id, COUNT(*) AS cnt FROM potential_order_product"
+            f" WHERE {pf_sql} AND potential_order_id IN {{ids}}"
+            f" GROUP BY potential_order_id",
+            potential_order_ids, pf_params, source='potential_order_product.potential_order_id'
+        )
+        return {r['potential_order_id']: r['cnt'] for r in rows}
+
     # ── Dealer (name lookup only) ────────────────────────────────────────────
 
     def get_dealer_name(self, dealer_id: int) -> str:
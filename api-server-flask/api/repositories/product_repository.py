@@ -16,20 +16,17 @@ class ProductRepository(BaseRepository):
 
     def find_bulk_by_part_numbers(self, part_numbers: list) -> dict:
         """
-        Fetch products by product_string in one IN query.
+        Fetch products by product_string, via _query_in.
 
         Returns:
             dict mapping product_string → row dict (with product_id, etc.)
         """
-        if not part_numbers:
-            return {}
-        placeholders = ','.join(['%s'] * len(part_numbers))
-        rows = self._db.execute_query(
-            f"SELECT product_id, product_string, name, description "
-            f"FROM product WHERE product_string IN ({placeholders})",
-            tuple(part_numbers)
+        rows = self._query_in(
+            "SELECT product_id, product_string, name, description "
+            "FROM product WHERE product_string IN {ids}",
+            part_numbers, source='product.product_string'
         )
-        return {r['product_string']: r for r in rows} if rows else {}
+        return {r['product_string']: r for r in rows}
 
     def bulk_insert_products(self, new_products: dict, current_time) -> None:
         """
@@ -56,16 +53,13 @@ class ProductRepository(BaseRepository):
         DELETE all potential_order_product rows for the given potential_order_ids.
         Partition-aware. Used in replace-mode upload (wipe then re-insert).
         """
-        if not potential_order_ids:
-            return
         pf_sql, pf_params = self._pf('potential_order_product')
-        placeholders = ','.join(['%s'] * len(potential_order_ids))
-        with self._db.get_cursor() as cursor:
-            cursor.execute(
-                f"DELETE FROM potential_order_product "
-                f"WHERE {pf_sql} AND potential_order_id IN ({placeholders})",
-                pf_params + tuple(potential_order_ids)
-            )
+        self._query_in(
+            f"DELETE FROM potential_order_product "
+            f"WHERE {pf_sql} AND potential_order_id IN {{ids}}",
+            potential_order_ids, pf_params, fetch=False,
+            source='potential_order_product.potential_order_id'
+        )
 
     def bulk_insert_order_products(self, rows: list) -> int:
         """
@@ -60,3 +60,106 @@ class ReferenceRepository(BaseRepository):
     def save_dealer(self, dealer) -> None:
         """Persist a Dealer instance (INSERT or UPDATE)."""
         dealer.save()
+
+    def get_recent_dealers(self, limit: int) -> list:
+        """The `limit` most recently updated dealers as dicts (dealer_id, name, dealer_code)."""
+        return self._db.execute_query(
+            "SELECT dealer_id, name, dealer_code FROM dealer ORDER BY updated_at DESC LIMIT %s",
+            (limit,)
+        ) or []
+
+    def find_dealer_ids_by_names(self, names: list) -> dict:
+        """
+        Look up many dealers by name, via _query_in.
+
+        The dealer table uses a case-insensitive collation, so this matches the
+        same rows as Dealer.find_by_name. When a name exists more than once the
+        lowest dealer_id wins.
+
+        Returns:
+            dict mapping lower-cased name → dealer_id
+        """
+        rows = self._query_in(
+            "SELECT MIN(dealer_id) AS dealer_id, name FROM dealer "
+            "WHERE name IN {ids} GROUP BY name",
+            names, source='dealer.name'
+        )
+        found = {}
+        for r in rows:   # names differing only in case may land in different chunks
+            key = r['name'].strip().lower()
+            found[key] = min(found.get(key, r['dealer_id']), r['dealer_id'])
+        return found
+
+    def bulk_insert_dealers(self, names: list, current_time) -> int:
+        """INSERT one dealer per name in a single executemany call. Returns rows inserted."""
+        if not names:
+            return 0
+        with self._db.get_cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO dealer (name, created_at, updated_at) VALUES (%s, %s, %s)",
+                [(name, current_time, current_time) for name in names]
+            )
+            return cursor.rowcount
+
+    def find_dealers_by_names(self, names: list) -> dict:
+        """
+        Like find_dealer_ids_by_names, but keeps each dealer's code so callers
+        can tell which dealers still need one backfilled.
+
+        Returns:
+            dict mapping lower-cased name → {'dealer_id', 'dealer_code'} (lowest dealer_id wins)
+        """
+        rows = self._query_in(
+            "SELECT dealer_id, name, dealer_code FROM dealer WHERE name IN {ids}",
+            names, source='dealer.name'
+        )
+        found = {}
+        for r in sorted(rows, key=lambda r: r['dealer_id']):
+            found.setdefault(r['name'].strip().lower(),
+                             {'dealer_id': r['dealer_id'], 'dealer_code': r['dealer_code']})
+        return found
+
+    def find_dealer_ids_by_codes(self, dealer_codes: list) -> dict:
+        """
+        Look up many dealers by eway bill code, via _query_in (case-insensitive,
+        like the dealer table's collation).
+
+        Returns:
+            dict mapping lower-cased dealer_code → dealer_id
+        """
+        rows = self._query_in(
+            "SELECT dealer_id, dealer_code FROM dealer WHERE dealer_code IN {ids}",
+            dealer_codes, source='dealer.dealer_code'
+        )
+        return {r['dealer_code'].lower(): r['dealer_id'] for r in rows}
+
+    def bulk_insert_coded_dealers(self, dealers: list, current_time) -> int:
+        """
+        INSERT (name, dealer_code) pairs in a single executemany call; dealer_code
+        may be None. Returns rows inserted.
+        """
+        if not dealers:
+            return 0
+        with self._db.get_cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO dealer (name, dealer_code, created_at, updated_at) VALUES (%s, %s, %s, %s)",
+                [(name, code, current_time, current_time) for name, code in dealers]
+            )
+            return cursor.rowcount
+
+    def bulk_set_dealer_codes(self, codes_by_dealer: dict, current_time) -> int:
+        """
+        Backfill dealer_code on dealers that have none, with set-based
+        UPDATEs (_bulk_update, fill-only). Returns rows changed.
+
+        Args:
+            codes_by_dealer: {dealer_id: dealer_code}
+        """
+        if not codes_by_dealer:
+            return 0
+        return self._bulk_update(
+            'dealer', 'dealer_id', list(codes_by_dealer),
+            set_values={'updated_at': current_time},
+            per_row={'dealer_code': codes_by_dealer},
+            fill_empty=('dealer_code',),
+        )
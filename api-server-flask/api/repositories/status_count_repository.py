@@ -0,0 +1,182 @@
+# -*- encoding: utf-8 -*-
+"""
+StatusCountRepository — SQL for order_status_counts, the dashboard's order
+counter per (warehouse, company, status, month of created_at).
+
+Every write that adds, removes or re-statuses potential_order rows adjusts
+the counters in the same transaction:
+
+    status_count_repo.add_orders(orders)                    # after the INSERT
+    status_count_repo.move_orders(po_ids, 'Dispatch Ready') # BEFORE the UPDATE
+    status_count_repo.remove_upload_batch(batch_id)         # BEFORE the DELETE
+
+move_orders / remove_upload_batch read (and lock) the orders' current rows;
+the counter upserts run just before COMMIT (mysql_manager.before_commit), so
+the hot counter rows stay locked only for the commit itself.
+
+Counting by month keeps reads on the same partition window as a COUNT(*)
+over potential_order: counts_by_status() sums the months from
+partition_window_start() on. rebuild() recomputes the table from
+potential_order — see api/order_status_counts.py for the command.
+"""
+
+from collections import Counter
+from datetime import date
+
+from ..db_manager import iter_chunks, partition_window_start
+from ..core.logging import get_logger
+from .base_repository import BaseRepository
+
+logger = get_logger(__name__)
+
+# First day of the row's created_at month
+_MONTH_SQL = "DATE_SUB(DATE(created_at), INTERVAL DAYOFMONTH(created_at) - 1 DAY)"
+
+# potential_order columns → counter key (NULLs count under 0 / '')
+_KEY_SQL = (
+    "COALESCE(warehouse_id, 0) AS warehouse_id, COALESCE(company_id, 0) AS company_id, "
+    f"COALESCE(status, '') AS status, {_MONTH_SQL} AS created_month"
+)
+
+
+def _month(ts) -> date:
+    return date(ts.year, ts.month, 1)
+
+
+class StatusCountRepository(BaseRepository):
+    """Data access layer for the order_status_counts summary table."""
+
+    # ── Incremental maintenance ──────────────────────────────────────────────
+
+    def add_orders(self, orders) -> None:
+        """Count newly INSERTed PotentialOrder objects (created_at must be set)."""
+        deltas = Counter()
+        for po in orders:
+            deltas[(po.warehouse_id or 0, po.company_id or 0, po.status or '',
+                    _month(po.created_at))] += 1
+        self._apply_before_commit(deltas)
+
+    def move_orders(self, potential_order_ids, new_status: str) -> None:
+        """
+        Move the given orders' counts to new_status. Call in the same
+        transaction, just before the UPDATE that sets it: the orders' current
+        status is read (and locked) here. Orders already in new_status, and
+        orders before the partition window (no longer counted), are left alone.
+        """
+        pf_sql, pf_params = self._pf('potential_order')
+        deltas = Counter()
+        for chunk in iter_chunks(list(potential_order_ids)):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            for r in self._groups(
+                f"potential_order_id IN ({placeholders}) AND COALESCE(status, '') <> %s AND {pf_sql}",
+                (*chunk, new_status, *pf_params)
+            ):
+                deltas[(r['warehouse_id'], r['company_id'], r['status'], r['created_month'])] -= r['n']
+                deltas[(r['warehouse_id'], r['company_id'], new_status, r['created_month'])] += r['n']
+        self._apply_before_commit(deltas)
+
+    def remove_upload_batch(self, batch_id: int) -> None:
+        """Uncount the orders of an upload batch. Call just before DELETEing them."""
+        pf_sql, pf_params = self._pf('potential_order')
+        deltas = Counter()
+        for r in self._groups(f"upload_batch_id = %s AND {pf_sql}", (batch_id, *pf_params)):
+            deltas[(r['warehouse_id'], r['company_id'], r['status'], r['created_month'])] -= r['n']
+        self._apply_before_commit(deltas)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def counts_by_status(self, warehouse_id=None, company_id=None) -> dict:
+        """{status: count} over the active partition window, with optional filters."""
+        query = ("SELECT status, SUM(order_count) AS count FROM order_status_counts "
+                 "WHERE created_month >= %s")
+        params = [partition_window_start().date()]
+
+        if warehouse_id:
+            query += " AND warehouse_id = %s"
+            params.append(warehouse_id)
+
+        if company_id:
+            query += " AND company_id = %s"
+            params.append(company_id)
+
+        query += " GROUP BY status"
+        rows = self._db.execute_query(query, params) or []
+        return {r['status']: int(r['count']) for r in rows}
+
+    # ── Reconciliation ───────────────────────────────────────────────────────
+
+    def drift(self) -> list:
+        """
+        Counters in the active window that disagree with potential_order.
+        Returns [{warehouse_id, company_id, status, created_month, counted, actual}].
+        """
+        pf_sql, pf_params = self._pf('potential_order')
+        actual = {
+            (r['warehouse_id'], r['company_id'], r['status'], r['created_month']): r['n']
+            for r in self._groups(pf_sql, pf_params, lock=False)
+        }
+        counted = {
+            (r['warehouse_id'], r['company_id'], r['status'], r['created_month']): r['order_count']
+            for r in self._db.execute_query(
+                "SELECT warehouse_id, company_id, status, created_month, order_count "
+                "FROM order_status_counts WHERE created_month >= %s",
+                (partition_window_start().date(),)
+            ) or []
+        }
+        return [
+            {'warehouse_id': key[0], 'company_id': key[1], 'status': key[2],
+             'created_month': key[3], 'counted': counted.get(key, 0), 'actual': actual.get(key, 0)}
+            for key in sorted(set(actual) | set(counted))
+            if counted.get(key, 0) != actual.get(key, 0)
+        ]
+
+    def rebuild(self) -> int:
+        """
+        Recompute order_status_counts from potential_order (active window) in
+        one transaction. Order writes wait while it runs (and one may fail with
+        a deadlock and have to be retried), so run it off-hours. Returns rows written.
+        """
+        pf_sql, pf_params = self._pf('potential_order')
+        with self._db.unit_of_work():
+            self._db.execute_query("DELETE FROM order_status_counts", fetch=False)
+            written = self._db.execute_query(
+                f"""INSERT INTO order_status_counts
+                    (warehouse_id, company_id, status, created_month, order_count)
+                    SELECT COALESCE(warehouse_id, 0), COALESCE(company_id, 0),
+                           COALESCE(status, ''), {_MONTH_SQL}, COUNT(*)
+                    FROM potential_order
+                    WHERE {pf_sql}
+                    GROUP BY 1, 2, 3, 4""",
+                pf_params, fetch=False
+            )
+        logger.info("order_status_counts rebuilt", extra={'rows': written})
+        return written
+
+    # ── Helpers ──────────────────────────────────────────────────────────────
+
+    def _groups(self, where_sql: str, params, lock: bool = True) -> list:
+        """potential_order row counts per counter key for the rows matching where_sql."""
+        return self._db.execute_query(
+            f"SELECT {_KEY_SQL}, COUNT(*) AS n FROM potential_order "
+            f"WHERE {where_sql} GROUP BY 1, 2, 3, 4"
+            + (" FOR UPDATE" if lock else ""),
+            params
+        ) or []
+
+    def _apply_before_commit(self, deltas: Counter) -> None:
+        """Add deltas to the counters just before the current transaction commits."""
+        rows = sorted((*key, n) for key, n in deltas.items() if n)
+        if not rows:
+            return
+
+        def apply():
+            with self._db.get_cursor() as cursor:
+                cursor.executemany(
+                    """INSERT INTO order_status_counts
+                       (warehouse_id, company_id, status, created_month, order_count)
+                       VALUES (%s, %s, %s, %s, %s)
+                       ON DUPLICATE KEY UPDATE order_count = order_count + VALUES(order_count)""",
+                    rows
+                )
+
+        self._db.before_commit(apply)
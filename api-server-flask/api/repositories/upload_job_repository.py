@@ -0,0 +1,142 @@
+# -*- encoding: utf-8 -*-
+"""
+UploadJobRepository — SQL for the upload_jobs table (background upload queue).
+
+Rows are plain dicts; the job runner in services/upload_jobs.py owns the
+state machine:  queued → running → done | failed.
+"""
+
+from ..core.logging import get_logger
+from .base_repository import BaseRepository
+
+logger = get_logger(__name__)
+
+_JOB_COLUMNS = (
+    'id, upload_type, filename, file_path, context, status, phase, percent, '
+    'rows_total, rows_done, processed_count, error_count, upload_batch_id, '
+    'http_status, result, worker, heartbeat_at, created_by, created_at, started_at, finished_at, updated_at'
+)
+
+
+class UploadJobRepository(BaseRepository):
+    """Data access layer for background upload jobs."""
+
+    def create(self, upload_type: str, filename: str, file_path: str,
+               context_json: str, created_by) -> int:
+        """INSERT a queued job and return its id."""
+        with self._db.get_cursor() as cursor:
+            cursor.execute(
+                """INSERT INTO upload_jobs (upload_type, filename, file_path, context, created_by)
+                   VALUES (%s, %s, %s, %s, %s)""",
+                (upload_type, filename, file_path, context_json, created_by)
+            )
+            return cursor.lastrowid
+
+    def get(self, job_id: int):
+        """Return the job row as a dict, or None."""
+        rows = self._db.execute_query(
+            f"SELECT {_JOB_COLUMNS} FROM upload_jobs WHERE id = %s", (job_id,)
+        )
+        return rows[0] if rows else None
+
+    def claim(self, job_id: int, worker: str) -> bool:
+        """
+        Atomically move a queued job to running, owned by `worker`. Returns
+        False if another worker got there first (or the job is not queued).
+        """
+        claimed = self._db.execute_query(
+            """UPDATE upload_jobs
+               SET status = 'running', worker = %s, heartbeat_at = NOW(),
+                   started_at = COALESCE(started_at, NOW())
+               WHERE id = %s AND status = 'queued'""",
+            (worker, job_id), fetch=False
+        )
+        return claimed == 1
+
+    def update_progress(self, job_id: int, worker: str, **fields) -> None:
+        """
+        SET the given progress columns (phase, percent, rows_total, rows_done,
+        upload_batch_id) — only while `worker` still owns the running job.
+        """
+        if not fields:
+            return
+        assignments = ', '.join(f"{column} = %s" for column in fields)
+        self._db.execute_query(
+            f"UPDATE upload_jobs SET {assignments}, heartbeat_at = NOW() "
+            f"WHERE id = %s AND status = 'running' AND worker = %s",
+            (*fields.values(), job_id, worker), fetch=False
+        )
+
+    def heartbeat(self, job_id: int, worker: str) -> bool:
+        """Renew `worker`'s lease on a running job. False if the job is no longer its own."""
+        renewed = self._db.execute_query(
+            "UPDATE upload_jobs SET heartbeat_at = NOW() "
+            "WHERE id = %s AND status = 'running' AND worker = %s",
+            (job_id, worker), fetch=False
+        )
+        return renewed == 1
+
+    def finish(self, job_id: int, worker: str, status: str, http_status: int, processed_count: int,
+               error_count: int, result_json: str) -> bool:
+        """
+        Record a job's final state and response, if `worker` still owns it.
+        Returns False when the job was re-queued (or finished) meanwhile.
+        """
+        finished = self._db.execute_query(
+            """UPDATE upload_jobs
+               SET status = %s, phase = 'finished', percent = 100, http_status = %s,
+                   processed_count = %s, error_count = %s, result = %s, finished_at = NOW()
+               WHERE id = %s AND status = 'running' AND worker = %s""",
+            (status, http_status, processed_count, error_count, result_json, job_id, worker),
+            fetch=False
+        )
+        return finished == 1
+
+    def requeue(self, job_id: int, worker: str, context_json: str) -> bool:
+        """
+        Put a job that `worker` owned back in the queue with an updated context
+        (e.g. resume_batch_id). False if another recovery pass got there first.
+        """
+        requeued = self._db.execute_query(
+            "UPDATE upload_jobs SET status = 'queued', worker = NULL, context = %s "
+            "WHERE id = %s AND status = 'running' AND worker = %s",
+            (context_json, job_id, worker), fetch=False
+        )
+        return requeued == 1
+
+    def find_queued_ids(self) -> list:
+        """Ids of queued jobs, oldest first."""
+        rows = self._db.execute_query(
+            "SELECT id FROM upload_jobs WHERE status = 'queued' ORDER BY id"
+        )
+        return [r['id'] for r in rows] if rows else []
+
+    def find_running(self) -> list:
+        """
+        Running jobs, each with `stale` = 1 when its worker's heartbeat is
+        older than UPLOAD_JOB_STALE_SECONDS.
+        """
+        from ..config import BaseConfig
+        rows = self._db.execute_query(
+            f"SELECT {_JOB_COLUMNS}, "
+            f"COALESCE(heartbeat_at, started_at) < NOW() - INTERVAL %s SECOND AS stale "
+            f"FROM upload_jobs WHERE status = 'running'",
+            (BaseConfig.UPLOAD_JOB_STALE_SECONDS,)
+        )
+        return rows or []
+
+    def delete_finished_before(self, days: int) -> list:
+        """DELETE finished jobs older than `days`; return their file paths for cleanup."""
+        rows = self._db.execute_query(
+            "SELECT id, file_path FROM upload_jobs "
+            "WHERE status IN ('done', 'failed') AND finished_at < NOW() - INTERVAL %s DAY",
+            (days,)
+        )
+        if not rows:
+            return []
+        ids = [r['id'] for r in rows]
+        placeholders = ','.join(['%s'] * len(ids))
+        self._db.execute_query(
+            f"DELETE FROM upload_jobs WHERE id IN ({placeholders})", tuple(ids), fetch=False
+        )
+        return [r['file_path'] for r in rows]
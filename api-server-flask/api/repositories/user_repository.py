@@ -31,6 +31,13 @@ class UserRepository(BaseRepository):
         )
         return Users(**rows[0]) if rows else None
 
+    def find_row_by_email(self, email: str):
+        """Return the users row for *email* as a dict, or None (for caching)."""
+        rows = self._db.execute_query(
+            "SELECT * FROM users WHERE email = %s", (email,)
+        )
+        return rows[0] if rows else None
+
     def find_by_username(self, username: str):
         """Return a Users instance by username, or None."""
         from ..models import Users
@@ -43,16 +50,42 @@ class UserRepository(BaseRepository):
         """Persist a Users instance (INSERT or UPDATE)."""
         user.save()
 
-    def is_token_revoked(self, token: str) -> bool:
-        """Return True if *token* appears in the blocklist."""
-        pf_sql, pf_params = self._pf('jwt_token_blocklist')
+    def is_token_revoked(self, token_hash: str) -> bool:
+        """Return True if the token with this SHA-256 digest is in the blocklist."""
         rows = self._db.execute_query(
-            f"SELECT id FROM jwt_token_blocklist WHERE jwt_token = %s AND {pf_sql}",
-            (token, *pf_params)
+            "SELECT id FROM jwt_token_blocklist WHERE token_hash = %s", (token_hash,)
         )
         return bool(rows)
 
-    def revoke_token(self, token: str) -> None:
-        """Add *token* to the JWT blocklist."""
+    def find_revoked_tokens_since(self, since, now) -> list:
+        """
+        Blocklist rows (token_hash, expires_at) created at or after *since*
+        (every row if None) whose token has not expired by *now*.
+        """
+        if since is None:
+            return self._db.execute_query(
+                "SELECT token_hash, expires_at FROM jwt_token_blocklist WHERE expires_at > %s",
+                (now,)
+            ) or []
+        return self._db.execute_query(
+            "SELECT token_hash, expires_at FROM jwt_token_blocklist "
+            "WHERE created_at >= %s AND expires_at > %s",
+            (since, now)
+        ) or []
+
+    def revoke_token(self, token_hash: str, expires_at) -> None:
+        """Add a token (by SHA-256 digest) to the JWT blocklist until *expires_at*."""
         from ..models import JWTTokenBlocklist
-        JWTTokenBlocklist(jwt_token=token).save()
+        JWTTokenBlocklist(token_hash=token_hash, expires_at=expires_at).save()
+
+    def delete_expired_tokens(self, now, batch_size: int = 5000) -> int:
+        """Delete blocklist rows whose token expired before *now*, in batches. Returns rows deleted."""
+        deleted = 0
+        while True:
+            count = self._db.execute_query(
+                "DELETE FROM jwt_token_blocklist WHERE expires_at < %s LIMIT %s",
+                (now, batch_size), fetch=False
+            )
+            deleted += count
+            if count < batch_size:
+                return deleted
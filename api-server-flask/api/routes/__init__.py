@@ -28,3 +28,4 @@ def register_all_routes():
     from . import admin_routes          # noqa: F401
     from . import eway_bill_routes      # noqa: F401
     from . import supply_sheet_routes   # noqa: F401
+    from . import upload_job_routes     # noqa: F401
@@ -31,6 +31,8 @@ from flask_restx import Resource
 from ..extensions import rest_api
 from ..core.auth import token_required, active_required
 from ..db_manager import mysql_manager, partition_filter
+from ..business.dealer_business import invalidate_dealer_cache
+from ..repositories import status_count_repo
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -101,6 +103,9 @@ class UploadBatchList(Resource):
                     ub.filename,
                     ub.record_count,
                     ub.status,
+                    ub.rows_done,
+                    ub.error_count,
+                    ub.last_chunk,
                     ub.uploaded_at,
                     ub.reverted_at,
                     w.name       AS warehouse_name,
@@ -143,6 +148,9 @@ class UploadBatchList(Resource):
                     'filename':       r['filename'],
                     'record_count':   r['record_count'],
                     'status':         r['status'],
+                    'rows_done':      r['rows_done'],
+                    'error_count':    r['error_count'],
+                    'last_chunk':     r['last_chunk'],
                     'uploaded_at':    r['uploaded_at'].isoformat() if r['uploaded_at'] else None,
                     'reverted_at':    r['reverted_at'].isoformat() if r['reverted_at'] else None,
                     'warehouse_name': r['warehouse_name'],
@@ -435,6 +443,8 @@ def _delete_order_batch(batch_id: int) -> None:
             f"Affected orders: {sample_ids}{suffix}."
         )
 
+    status_count_repo.remove_upload_batch(batch_id)
+
     # Bug 18 fix: wrap all three DELETEs in a single connection so that a partial
     # failure leaves the DB unchanged instead of producing orphaned rows.
     with mysql_manager.get_cursor() as cursor:
@@ -485,11 +495,12 @@ def _delete_invoice_batch(batch_id: int) -> None:
 
     for order_id in order_ids:
         previous_state = _state_before_invoiced(order_id)
+        status_count_repo.move_orders([order_id], previous_state)
         mysql_manager.execute_query(
             """UPDATE potential_order
-               SET status = %s, invoice_submitted = 0, updated_at = %s
+               SET status = %s, invoice_submitted = 0, updated_at = %s, status_changed_at = %s
                WHERE potential_order_id = %s""",
-            (previous_state, now, order_id),
+            (previous_state, now, now, order_id),
             fetch=False,
         )
 
@@ -644,6 +655,9 @@ class DealerTownUpload(Resource):
             except Exception as e:
                 errors.append({'row': row_num, 'dealer_code': dealer_code, 'reason': str(e)})
 
+        if updated or created:
+            invalidate_dealer_cache()
+
         return {
             'success': True,
             'updated': updated,
@@ -734,6 +748,7 @@ class AdminDealerTown(Resource):
                 (town or None, datetime.utcnow(), dealer_id),
                 fetch=False
             )
+            invalidate_dealer_cache()
             return {
                 'success': True,
                 'dealer_id': dealer_id,
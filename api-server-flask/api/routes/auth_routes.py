@@ -3,16 +3,16 @@
 Authentication routes: Register, Login, EditUser, LogoutUser.
 """
 
-from datetime import datetime, timezone, timedelta
+from datetime import datetime
 
 import jwt
 from flask import request
 from flask_restx import Resource, fields
 
 from ..extensions import rest_api
-from ..core.auth import token_required
+from ..core.auth import token_required, revoke_token, TOKEN_LIFETIME
 from ..config import BaseConfig
-from ..models import Users, JWTTokenBlocklist
+from ..models import Users
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -100,7 +100,7 @@ class Login(Resource):
             "user_id": user_exists.id,
             "role":    user_exists.role,
             "status":  user_exists.status,
-            "exp":     datetime.utcnow() + timedelta(hours=8)
+            "exp":     datetime.utcnow() + TOKEN_LIFETIME
         }, BaseConfig.SECRET_KEY, algorithm="HS256")
 
         user_exists.set_jwt_auth_active(True)
@@ -162,8 +162,7 @@ class LogoutUser(Resource):
         raw = request.headers.get("authorization", "")
         _jwt_token = raw[7:] if raw.startswith("Bearer ") or raw.startswith("bearer ") else raw
 
-        jwt_block = JWTTokenBlocklist(jwt_token=_jwt_token, created_at=datetime.now(timezone.utc))
-        jwt_block.save()
+        revoke_token(_jwt_token)
 
         current_user.set_jwt_auth_active(False)
         current_user.save()
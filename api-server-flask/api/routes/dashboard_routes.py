@@ -12,22 +12,25 @@ Dashboard / listing routes:
 """
 
 from datetime import datetime
-from collections import defaultdict
 
+import csv
 import io
+import tempfile
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import PatternFill, Font, Alignment
 from flask import request, send_file
 from flask_restx import Resource, fields
 
+from ..config import BaseConfig
 from ..extensions import rest_api
 from ..core.auth import token_required, active_required
 from ..models import (
     Users, Warehouse, Company, PotentialOrder,
-    PotentialOrderProduct, OrderStateHistory, OrderState, Order,
-    mysql_manager
+    PotentialOrderProduct, OrderStateHistory,
 )
-from ..db_manager import partition_filter
+from ..repositories import order_repo
+from ..utils.pagination import decode_cursor, split_page
 from ..permissions import get_permissions, has_all_warehouse_access
 from ..core.logging import get_logger
 
@@ -91,7 +94,8 @@ order_model = rest_api.model('Order', {
     'current_state_time': fields.String(description='Time of current state'),
     'assigned_to':       fields.String(description='User assigned to this order'),
     'products':          fields.Integer(description='Number of products in this order'),
-    'state_history':     fields.List(fields.Nested(dash_state_history_model)),
+    'state_history':     fields.List(fields.Nested(dash_state_history_model),
+                                     description='State changes (list: only with include=history)'),
 })
 
 orders_response = rest_api.model('OrdersResponse', {
@@ -100,6 +104,7 @@ orders_response = rest_api.model('OrdersResponse', {
     'total':   fields.Integer(description='Total number of orders matching filters'),
     'page':    fields.Integer(description='Current page'),
     'limit':   fields.Integer(description='Page size'),
+    'next_cursor': fields.String(description='Cursor for the next page (null on the last page)'),
 })
 
 order_detail_response = rest_api.model('OrderDetailResponse', {
@@ -119,6 +124,7 @@ recent_order_model = rest_api.model('RecentOrder', {
 recent_orders_response = rest_api.model('RecentOrdersResponse', {
     'success':       fields.Boolean(description='Success status'),
     'recent_orders': fields.List(fields.Nested(recent_order_model), description='List of recent orders'),
+    'next_cursor':   fields.String(description='Cursor for the next page (null on the last page)'),
 })
 
 dash_error_response = rest_api.model('DashErrorResponse', {
@@ -139,23 +145,97 @@ FRONTEND_TO_DB_STATUS = {
 
 DB_TO_FRONTEND_STATUS = {v: k for k, v in FRONTEND_TO_DB_STATUS.items()}
 
-# open→picking, picking→packed, packed→invoiced, dispatch-ready→completed
-VALID_BULK_TRANSITIONS = {
-    'open':           'picking',
-    'picking':        'packed',
-    'packed':         'invoiced',
-    'dispatch-ready': 'completed',
+# Bulk export template: rows 1-3 are header / notes, data from row 4 (bulk-import reads it back)
+EXPORT_MIMETYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv':  'text/csv',
 }
+_EXPORT_HEADERS = ['Order ID', 'Customer Name', 'Current Status', 'Expected Status', 'Number of Boxes']
+_EXPORT_NOTES = [
+    '(do not edit)', '(do not edit)', '(do not edit)',
+    'Fill: picking / packed / invoiced / completed',
+    'Fill only when moving packed → invoiced',
+]
+_EXPORT_BLOCKED_NOTE = 'invoiced → dispatch-ready is NOT allowed here. Use the Invoice Upload tab.'
+_EXPORT_DATA_ROW = 4
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def _ensure_state(name, description):
-    """Get or create an OrderState by name."""
-    state = OrderState.find_by_name(name)
-    if not state:
-        state = OrderState(state_name=name, description=description)
-        state.save()
-    return state
+def _export_rows(orders):
+    """Template data rows for an iterable of potential_order rows."""
+    for order_data in orders:
+        current_fe_status = DB_TO_FRONTEND_STATUS.get(order_data['status'],
+                                                       order_data['status'].lower().replace(' ', '-'))
+        yield [f"PO{order_data['potential_order_id']}", order_data.get('dealer_name', 'Unknown'),
+               current_fe_status, '', '']
+
+
+def _write_export_xlsx(rows, out):
+    """Write the template to `out` as a write-only workbook (rows are streamed to the file)."""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet('Orders')
+
+    # Write-only sheets take dimensions before the first row
+    ws.column_dimensions['A'].width = 14
+    ws.column_dimensions['B'].width = 32
+    ws.column_dimensions['C'].width = 20
+    ws.column_dimensions['D'].width = 30
+    ws.column_dimensions['E'].width = 22
+    ws.row_dimensions[1].height = 20
+    ws.row_dimensions[2].height = 18
+
+    def styled(value, fill=None, font=None, centered=False):
+        cell = WriteOnlyCell(ws, value=value)
+        if fill:
+            cell.fill = fill
+        if font:
+            cell.font = font
+        if centered:
+            cell.alignment = Alignment(horizontal='center', vertical='center')
+        return cell
+
+    header_fill = PatternFill(start_color='1565C0', end_color='1565C0', fill_type='solid')
+    header_font = Font(color='FFFFFF', bold=True)
+    ws.append([styled(h, header_fill, header_font, centered=True) for h in _EXPORT_HEADERS])
+
+    note_fill = PatternFill(start_color='FFF9C4', end_color='FFF9C4', fill_type='solid')
+    note_font = Font(italic=True, color='5D4037')
+    ws.append([styled(n, note_fill, note_font, centered=True) for n in _EXPORT_NOTES])
+
+    blocked_fill = PatternFill(start_color='FFCDD2', end_color='FFCDD2', fill_type='solid')
+    ws.append([styled('NOTE', blocked_fill),
+               styled(_EXPORT_BLOCKED_NOTE, blocked_fill, Font(bold=True, color='B71C1C'))])
+    ws.merged_cells.add('B3:E3')
+
+    readonly_fill = PatternFill(start_color='F5F5F5', end_color='F5F5F5', fill_type='solid')
+    for row in rows:
+        ws.append([styled(v, readonly_fill) for v in row[:3]] + row[3:])
+
+    wb.save(out)
+
+
+def _write_export_csv(rows, out):
+    """Write the template to binary `out` as UTF-8 CSV (BOM included, for Excel)."""
+    text = io.TextIOWrapper(out, encoding='utf-8-sig', newline='')
+    writer = csv.writer(text)
+    writer.writerow(_EXPORT_HEADERS)
+    writer.writerow(_EXPORT_NOTES)
+    writer.writerow(['NOTE', _EXPORT_BLOCKED_NOTE])
+    writer.writerows(rows)
+    text.flush()
+    text.detach()   # leave `out` open for the response
+
+
+def _read_import_rows(file):
+    """Data rows of an uploaded bulk template — .xlsx, or .csv as exported with format=csv."""
+    if (file.filename or '').lower().endswith('.csv'):
+        reader = csv.reader(io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline=''))
+        return ((row + [None] * len(_EXPORT_HEADERS))[:len(_EXPORT_HEADERS)]
+                for line_no, row in enumerate(reader, 1) if line_no >= _EXPORT_DATA_ROW)
+    ws = openpyxl.load_workbook(io.BytesIO(file.read()), read_only=True).active
+    return (tuple(row) + (None,) * (len(_EXPORT_HEADERS) - len(row))
+            for row in ws.iter_rows(min_row=_EXPORT_DATA_ROW, values_only=True))
+
 
 # ── Endpoints ────────────────────────────────────────────────────────────────
 
@@ -232,10 +312,10 @@ class OrderStatusCount(Resource):
                 ('partially-completed', 'Partially Completed', 'Partially Completed'),
             ]
 
+            counts = PotentialOrder.count_grouped_by_status(warehouse_id, company_id)
             response_data = {}
             for key, db_status, label in all_statuses:
-                count = PotentialOrder.count_by_status(db_status, warehouse_id, company_id)
-                response_data[key] = {'count': count, 'label': label}
+                response_data[key] = {'count': counts.get(db_status, 0), 'label': label}
 
             return {'success': True, 'status_counts': response_data}, 200
 
@@ -252,6 +332,9 @@ class OrdersList(Resource):
         'warehouse_id': 'Warehouse ID',
         'company_id':   'Company ID',
         'limit':        'Limit number of results (default 100)',
+        'cursor':       'next_cursor from the previous page (omit for the first page)',
+        'page':         'Page number (legacy OFFSET paging, ignored when cursor is given)',
+        'include':      'Comma-separated expansions: history (full state history per order)',
     })
     @rest_api.marshal_with(orders_response)
     @rest_api.response(400, 'Error', dash_error_response)
@@ -264,7 +347,9 @@ class OrdersList(Resource):
             company_id   = request.args.get('company_id',   type=int)
             limit        = request.args.get('limit', 100,  type=int)
             page         = request.args.get('page',  1,    type=int)
-            offset       = (page - 1) * limit
+            after        = decode_cursor(request.args.get('cursor'))
+            offset       = 0 if after else (page - 1) * limit
+            include      = set(filter(None, request.args.get('include', '').split(',')))
 
             status_map = {
                 'open': 'Open', 'picking': 'Picking', 'packed': 'Packed',
@@ -273,12 +358,17 @@ class OrdersList(Resource):
             }
             db_status = status_map.get(status.lower(), '') if status else ''
 
-            total = PotentialOrder.count_by_filters(
-                status=db_status, warehouse_id=warehouse_id, company_id=company_id
-            )
-            potential_orders = PotentialOrder.find_by_filters(
-                status=db_status, warehouse_id=warehouse_id, company_id=company_id,
-                limit=limit, offset=offset
+            # Total from the status counters — no COUNT(*) over the window per page
+            counts = PotentialOrder.count_grouped_by_status(warehouse_id, company_id)
+            total  = counts.get(db_status, 0) if db_status else sum(counts.values())
+
+            potential_orders, next_cursor = split_page(
+                PotentialOrder.find_by_filters(
+                    status=db_status, warehouse_id=warehouse_id, company_id=company_id,
+                    limit=limit + 1, offset=offset, after=after,
+                    columns=PotentialOrder.LIST_COLUMNS
+                ),
+                limit, 'created_at', 'potential_order_id'
             )
 
             frontend_status_map = {
@@ -287,53 +377,33 @@ class OrdersList(Resource):
                 'Completed': 'completed', 'Partially Completed': 'partially-completed',
             }
 
-            # Bulk-fetch product counts and state history to avoid N+1 queries
+            # Bulk-fetch product counts (and state history if asked for) to avoid N+1 queries
             order_ids       = [o['potential_order_id'] for o in potential_orders]
-            product_counts  = {}
-            state_histories = {}
-            if order_ids:
-                placeholders = ','.join(['%s'] * len(order_ids))
-                pf_pop_sql, pf_pop_params = partition_filter('potential_order_product')
-                count_rows = mysql_manager.execute_query(
-                    f"SELECT potential_order_id, COUNT(*) as cnt FROM potential_order_product"
-                    f" WHERE {pf_pop_sql} AND potential_order_id IN ({placeholders})"
-                    f" GROUP BY potential_order_id",
-                    pf_pop_params + tuple(order_ids)
-                )
-                product_counts = {r['potential_order_id']: r['cnt'] for r in (count_rows or [])}
-
-                pf_osh_sql, pf_osh_params = partition_filter('order_state_history', alias='osh')
-                history_rows = mysql_manager.execute_query(
-                    f"SELECT osh.*, os.state_name"
-                    f" FROM order_state_history osh"
-                    f" JOIN order_state os ON osh.state_id = os.state_id"
-                    f" WHERE {pf_osh_sql} AND osh.potential_order_id IN ({placeholders})"
-                    f" ORDER BY osh.potential_order_id, osh.changed_at",
-                    pf_osh_params + tuple(order_ids)
-                )
-                _hist_map = defaultdict(list)
-                for h in (history_rows or []):
-                    _hist_map[h['potential_order_id']].append(h)
-                state_histories = dict(_hist_map)
+            product_counts  = order_repo.count_products_by_order(order_ids)
+            state_histories = None
+            if 'history' in include:
+                state_histories = order_repo.find_state_histories(order_ids)
 
             orders = []
             for order_data in potential_orders:
                 try:
                     dealer_name       = order_data.get('dealer_name') or 'Unknown Dealer'
                     product_count     = product_counts.get(order_data['potential_order_id'], 0)
-                    state_history_data = state_histories.get(order_data['potential_order_id'], [])
 
-                    formatted_history = []
-                    for history in state_history_data:
-                        formatted_history.append({
-                            'state_name': history['state_name'],
-                            'timestamp':  history['changed_at'].isoformat() if history['changed_at'] else None,
-                            'user':       f"User {history['changed_by']}"
-                        })
+                    formatted_history = None
+                    if state_histories is not None:
+                        formatted_history = [
+                            {
+                                'state_name': history['state_name'],
+                                'timestamp':  history['changed_at'].isoformat() if history['changed_at'] else None,
+                                'user':       f"User {history['changed_by']}"
+                            }
+                            for history in state_histories.get(order_data['potential_order_id'], [])
+                        ]
 
                     current_state_time = (
-                        state_history_data[-1]['changed_at'] if state_history_data
-                        else order_data.get('updated_at') or order_data.get('created_at')
+                        order_data.get('status_changed_at')
+                        or order_data.get('updated_at') or order_data.get('created_at')
                     )
                     current_state_time_str = current_state_time.isoformat() if current_state_time else None
 
@@ -360,7 +430,8 @@ class OrdersList(Resource):
                                    extra={'potential_order_id': order_data.get('potential_order_id'),
                                           'error': str(row_err)})
 
-            return {'success': True, 'orders': orders, 'total': total, 'page': page, 'limit': limit}, 200
+            return {'success': True, 'orders': orders, 'total': total, 'page': page, 'limit': limit,
+                    'next_cursor': next_cursor}, 200
 
         except Exception as e:
             logger.exception("Error in /api/orders")
@@ -371,6 +442,12 @@ class OrdersList(Resource):
 class BulkOrderExport(Resource):
     """Download orders as Excel template for bulk status update."""
 
+    @rest_api.doc(params={
+        'status':       'Order status filter',
+        'warehouse_id': 'Warehouse ID',
+        'company_id':   'Company ID',
+        'format':       'xlsx (default) or csv',
+    })
     @token_required
     @active_required
     def get(self, current_user):
@@ -382,87 +459,39 @@ class BulkOrderExport(Resource):
 
             db_status = FRONTEND_TO_DB_STATUS.get(status.lower(), '') if status else ''
 
-            # Bug 21 fix: fetch all matching orders (no artificial cap).
-            total_count = PotentialOrder.count_by_filters(
-                status=db_status, warehouse_id=warehouse_id, company_id=company_id
-            )
-            potential_orders = PotentialOrder.find_by_filters(
+            fmt = request.args.get('format', 'xlsx').lower()
+            if fmt not in EXPORT_MIMETYPES:
+                return {'success': False, 'msg': f'Unsupported export format: {fmt}'}, 400
+
+            # Bug 21 fix: export all matching orders (no artificial cap) — streamed
+            # from the server and written row by row, never held in memory.
+            orders = PotentialOrder.iter_by_filters(
                 status=db_status,
                 warehouse_id=warehouse_id,
                 company_id=company_id,
-                limit=max(total_count, 1)
+                columns=('potential_order_id', 'status'),
             )
-
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = 'Orders'
-
-            header_fill = PatternFill(start_color='1565C0', end_color='1565C0', fill_type='solid')
-            header_font = Font(color='FFFFFF', bold=True)
-            headers = ['Order ID', 'Customer Name', 'Current Status', 'Expected Status', 'Number of Boxes']
-            for col, h in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=h)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-
-            note_fill = PatternFill(start_color='FFF9C4', end_color='FFF9C4', fill_type='solid')
-            note_font = Font(italic=True, color='5D4037')
-            notes = [
-                '(do not edit)', '(do not edit)', '(do not edit)',
-                'Fill: picking / packed / invoiced / completed',
-                'Fill only when moving packed → invoiced',
-            ]
-            for col, note in enumerate(notes, 1):
-                cell = ws.cell(row=2, column=col, value=note)
-                cell.fill = note_fill
-                cell.font = note_font
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-
-            blocked_fill = PatternFill(start_color='FFCDD2', end_color='FFCDD2', fill_type='solid')
-            ws.cell(row=3, column=1, value='NOTE').fill = blocked_fill
-            note_cell = ws.cell(row=3, column=2,
-                                value='invoiced → dispatch-ready is NOT allowed here. Use the Invoice Upload tab.')
-            note_cell.fill = blocked_fill
-            note_cell.font = Font(bold=True, color='B71C1C')
-            ws.merge_cells('B3:E3')
-
-            readonly_fill = PatternFill(start_color='F5F5F5', end_color='F5F5F5', fill_type='solid')
-            for row_idx, order_data in enumerate(potential_orders, 4):
-                current_fe_status = DB_TO_FRONTEND_STATUS.get(order_data['status'],
-                                                               order_data['status'].lower().replace(' ', '-'))
-                dealer_name = order_data.get('dealer_name', 'Unknown')
-
-                for col, val in enumerate([
-                    f"PO{order_data['potential_order_id']}",
-                    dealer_name,
-                    current_fe_status,
-                    '',
-                    '',
-                ], 1):
-                    cell = ws.cell(row=row_idx, column=col, value=val)
-                    if col <= 3:
-                        cell.fill = readonly_fill
-
-            ws.column_dimensions['A'].width = 14
-            ws.column_dimensions['B'].width = 32
-            ws.column_dimensions['C'].width = 20
-            ws.column_dimensions['D'].width = 30
-            ws.column_dimensions['E'].width = 22
-            ws.row_dimensions[1].height = 20
-            ws.row_dimensions[2].height = 18
-
-            output = io.BytesIO()
-            wb.save(output)
-            output.seek(0)
-
-            filename = f'orders_bulk_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-            return send_file(
+            output = tempfile.SpooledTemporaryFile(max_size=BaseConfig.EXPORT_SPOOL_MAX_BYTES)
+            try:
+                write = _write_export_csv if fmt == 'csv' else _write_export_xlsx
+                write(_export_rows(orders), output)
+                size = output.tell()
+                output.seek(0)
+            except Exception:
+                output.close()
+                raise
+            finally:
+                orders.close()
+
+            filename = f'orders_bulk_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{fmt}'
+            response = send_file(
                 output,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                mimetype=EXPORT_MIMETYPES[fmt],
                 as_attachment=True,
                 download_name=filename
             )
+            response.content_length = size
+            return response
 
         except Exception as e:
             return {'success': False, 'msg': f'Error generating export: {str(e)}'}, 400
@@ -482,141 +511,13 @@ class BulkOrderImport(Resource):
 
             file = request.files['file']
             try:
-                wb = openpyxl.load_workbook(io.BytesIO(file.read()))
-                ws = wb.active
+                rows = _read_import_rows(file)
             except Exception as e:
                 return {'success': False, 'msg': f'Invalid Excel file: {str(e)}'}, 400
 
-            moved, skipped, errors = [], [], []
-
-            # Data starts at row 4 (rows 1-3 are header / notes)
-            for row in ws.iter_rows(min_row=4, values_only=True):
-                order_id        = str(row[0] or '').strip() if row[0] else ''
-                current_status  = str(row[2] or '').strip().lower()
-                expected_status = str(row[3] or '').strip().lower()
-
-                if not order_id:
-                    continue
-
-                if not expected_status:
-                    skipped.append({'order_id': order_id, 'reason': 'No expected status provided'})
-                    continue
-
-                if current_status == expected_status:
-                    skipped.append({'order_id': order_id, 'reason': 'Status unchanged'})
-                    continue
-
-                if current_status == 'invoiced' and expected_status == 'dispatch-ready':
-                    errors.append({
-                        'order_id': order_id,
-                        'reason': 'invoiced → dispatch-ready is not allowed here. Use the Invoice Upload tab.'
-                    })
-                    continue
-
-                if VALID_BULK_TRANSITIONS.get(current_status) != expected_status:
-                    valid_next = VALID_BULK_TRANSITIONS.get(current_status, 'none')
-                    errors.append({
-                        'order_id': order_id,
-                        'reason': f'Invalid transition: {current_status} → {expected_status}. Valid next: {valid_next}'
-                    })
-                    continue
-
-                try:
-                    numeric_id = int(order_id.replace('PO', ''))
-                except ValueError:
-                    errors.append({'order_id': order_id, 'reason': 'Invalid order ID format'})
-                    continue
-
-                potential_order = PotentialOrder.get_by_id(numeric_id)
-                if not potential_order:
-                    errors.append({'order_id': order_id, 'reason': 'Order not found'})
-                    continue
-
-                db_current = DB_TO_FRONTEND_STATUS.get(potential_order.status,
-                                                        potential_order.status.lower().replace(' ', '-'))
-                if db_current != current_status:
-                    errors.append({
-                        'order_id': order_id,
-                        'reason': f'Status mismatch: DB has "{db_current}", Excel shows "{current_status}"'
-                    })
-                    continue
-
-                try:
-                    current_time = datetime.utcnow()
-
-                    if expected_status == 'invoiced':
-                        final_order = Order(
-                            potential_order_id=numeric_id,
-                            order_number=f"ORD-{numeric_id}-{current_time.strftime('%Y%m%d%H%M')}",
-                            status='Dispatch Ready',
-                            box_count=potential_order.box_count,
-                            created_at=current_time,
-                            updated_at=current_time
-                        )
-                        final_order.save()
-
-                        potential_order.status     = 'Invoiced'
-                        potential_order.updated_at = current_time
-                        potential_order.save()
-
-                        state = _ensure_state('Invoiced', 'Order invoiced and ready for dispatch')
-                        OrderStateHistory(
-                            potential_order_id=numeric_id,
-                            state_id=state.state_id,
-                            changed_by=current_user.id,
-                            changed_at=current_time
-                        ).save()
-
-                        moved.append({
-                            'order_id': order_id, 'from': current_status, 'to': expected_status,
-                            'boxes': potential_order.box_count
-                        })
-
-                    elif expected_status == 'completed':
-                        final_order = Order.find_by_potential_order_id(numeric_id)
-                        if not final_order:
-                            errors.append({'order_id': order_id,
-                                           'reason': 'No final order found for dispatch-ready order'})
-                            continue
-
-                        final_order.status          = 'Completed'
-                        final_order.dispatched_date = current_time
-                        final_order.updated_at      = current_time
-                        final_order.save()
-
-                        potential_order.status     = 'Completed'
-                        potential_order.updated_at = current_time
-                        potential_order.save()
-
-                        state = _ensure_state('Completed', 'Order completed and dispatched')
-                        OrderStateHistory(
-                            potential_order_id=numeric_id,
-                            state_id=state.state_id,
-                            changed_by=current_user.id,
-                            changed_at=current_time
-                        ).save()
-
-                        moved.append({'order_id': order_id, 'from': current_status, 'to': expected_status})
-
-                    else:
-                        # Simple transitions: open→picking, picking→packed
-                        new_db_status = FRONTEND_TO_DB_STATUS[expected_status]
-                        potential_order.status     = new_db_status
-                        potential_order.updated_at = current_time
-                        potential_order.save()
-
-                        state = _ensure_state(new_db_status, f'Order moved to {new_db_status}')
-                        OrderStateHistory(
-                            potential_order_id=numeric_id,
-                            state_id=state.state_id,
-                            changed_by=current_user.id,
-                            changed_at=current_time
-                        ).save()
-
-                        moved.append({'order_id': order_id, 'from': current_status, 'to': expected_status})
-
-                except Exception as e:
-                    errors.append({'order_id': order_id, 'reason': f'Error processing: {str(e)}'})
+            from ..business.order_business import process_bulk_import
+            result = process_bulk_import(rows, current_user.id)
+            moved, skipped, errors = result['moved'], result['skipped'], result['errors']
 
             return {
                 'success': True,
@@ -700,6 +601,7 @@ class RecentOrders(Resource):
         'warehouse_id': 'Warehouse ID',
         'company_id':   'Company ID',
         'limit':        'Maximum number of orders to return (default 10)',
+        'cursor':       'next_cursor from the previous page (omit for the first page)',
     })
     @rest_api.marshal_with(recent_orders_response)
     @rest_api.response(400, 'Error', dash_error_response)
@@ -710,43 +612,27 @@ class RecentOrders(Resource):
             warehouse_id = request.args.get('warehouse_id', type=int)
             company_id   = request.args.get('company_id',   type=int)
             limit        = request.args.get('limit', 10, type=int)
+            after        = decode_cursor(request.args.get('cursor'))
 
             allowed_states = get_permissions(current_user.role)['order_states']
 
-            potential_orders = PotentialOrder.find_by_filters(
-                warehouse_id=warehouse_id,
-                company_id=company_id,
-                limit=limit,
-                sort_by='updated_at'
+            potential_orders, next_cursor = split_page(
+                PotentialOrder.find_by_filters(
+                    warehouse_id=warehouse_id,
+                    company_id=company_id,
+                    statuses=sorted(allowed_states),
+                    limit=limit + 1,
+                    sort_by='updated_at',
+                    after=after,
+                    columns=PotentialOrder.LIST_COLUMNS
+                ),
+                limit, 'updated_at', 'potential_order_id'
             )
-            potential_orders = [o for o in potential_orders if o['status'] in allowed_states]
-
-            recent_ids = [o['potential_order_id'] for o in potential_orders]
-            recent_state_histories = {}
-            if recent_ids:
-                placeholders = ','.join(['%s'] * len(recent_ids))
-                pf_osh_sql, pf_osh_params = partition_filter('order_state_history', alias='osh')
-                history_rows = mysql_manager.execute_query(
-                    f"SELECT osh.*, os.state_name"
-                    f" FROM order_state_history osh"
-                    f" JOIN order_state os ON osh.state_id = os.state_id"
-                    f" WHERE {pf_osh_sql} AND osh.potential_order_id IN ({placeholders})"
-                    f" ORDER BY osh.potential_order_id, osh.changed_at",
-                    pf_osh_params + tuple(recent_ids)
-                )
-                _map = defaultdict(list)
-                for h in (history_rows or []):
-                    _map[h['potential_order_id']].append(h)
-                recent_state_histories = dict(_map)
 
             orders = []
             for order_data in potential_orders:
                 dealer_name        = order_data.get('dealer_name', 'Unknown Dealer')
-                state_history_data = recent_state_histories.get(order_data['potential_order_id'], [])
-
-                current_state_time = order_data['updated_at']
-                if state_history_data:
-                    current_state_time = state_history_data[-1]['changed_at']
+                current_state_time = order_data['status_changed_at'] or order_data['updated_at']
 
                 status_map = {
                     'Open': 'open', 'Picking': 'picking', 'Packed': 'packed',
@@ -764,7 +650,7 @@ class RecentOrders(Resource):
                     'assigned_to':       order_data.get('assigned_username') or f"User {order_data['requested_by']}",
                 })
 
-            return {'success': True, 'recent_orders': orders}, 200
+            return {'success': True, 'recent_orders': orders, 'next_cursor': next_cursor}, 200
 
         except Exception as e:
             logger.exception("Error in /api/orders/recent")
@@ -24,6 +24,7 @@ from flask import request, send_file
 from flask_restx import Resource, fields
 
 from ..extensions import rest_api
+from ..db_manager import mysql_manager
 from ..core.auth import token_required, active_required
 from ..models import (
     TransportRoute, CustomerRouteMapping,
@@ -194,7 +195,7 @@ class EwayCustomerRouteMappingsBulk(Resource):
             all_routes = TransportRoute.get_all()
             route_map  = {r.name.lower(): r.route_id for r in all_routes}
 
-            imported = 0
+            mappings = {}   # dealer_id → (row number, mapping); a later row for the same dealer wins
             errors   = []
             for i, row in enumerate(rows[1:], start=2):
                 try:
@@ -211,15 +212,29 @@ class EwayCustomerRouteMappingsBulk(Resource):
 
                     cust_name = str(row[ci_name]).strip() if (ci_name is not None and row[ci_name]) else code
                     dealer_id = get_or_create_dealer(dealer_name=cust_name, dealer_code=code)
-                    CustomerRouteMapping(
+                    mappings[dealer_id] = (i, CustomerRouteMapping(
                         dealer_id=dealer_id,
                         route_id=route_id,
                         distance=int(float(str(dist)))
-                    ).save()
-                    imported += 1
+                    ))
                 except Exception as row_err:
                     errors.append(f"Row {i}: {str(row_err)}")
 
+            imported = len(mappings)
+            try:
+                with mysql_manager.savepoint():
+                    CustomerRouteMapping.bulk_upsert(m for _, m in mappings.values())
+            except Exception:
+                # Redo row by row so the failing rows can be reported
+                imported = 0
+                for i, mapping in mappings.values():
+                    try:
+                        with mysql_manager.savepoint():
+                            mapping.save()
+                        imported += 1
+                    except Exception as row_err:
+                        errors.append(f"Row {i}: {str(row_err)}")
+
             return {
                 'success':  True,
                 'imported': imported,
@@ -337,12 +352,14 @@ class EwayManifest(Resource):
         try:
             data     = request.json
             date_str = data.get('date', datetime.utcnow().strftime('%Y-%m-%d'))
-            for asg in data.get('assignments', []):
+            DailyRouteManifest.bulk_upsert([
                 DailyRouteManifest(
                     route_id=asg['route_id'],
                     vehicle_number=asg['vehicle_number'],
                     manifest_date=date_str
-                ).save()
+                )
+                for asg in data.get('assignments', [])
+            ])
             return {'success': True, 'msg': 'Daily manifest saved'}, 200
         except Exception as e:
             return {'success': False, 'msg': str(e)}, 400
@@ -19,7 +19,9 @@ from ..extensions import rest_api
 from ..core.auth import token_required, active_required, upload_permission_required
 from ..models import Invoice, PotentialOrder, Warehouse, Company, mysql_manager
 from ..db_manager import partition_filter
+from ..utils.pagination import decode_cursor, keyset_condition, split_page
 from ..services import invoice_service
+from ..services.upload_jobs import upload_job_queue, queued_response
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -38,6 +40,9 @@ invoice_upload_parser.add_argument('warehouse_id',
 invoice_upload_parser.add_argument('company_id',
                                    type=int, location='form', required=True,
                                    help='Company ID must be provided')
+invoice_upload_parser.add_argument('resume_batch_id',
+                                   type=int, location='form',
+                                   help='Continue this unfinished resumable upload (same file)')
 
 invoice_upload_response = rest_api.model('InvoiceUploadResponse', {
     'success':            fields.Boolean(description='Success status of upload'),
@@ -74,9 +79,10 @@ invoice_model = rest_api.model('Invoice', {
 invoice_list_response = rest_api.model('InvoiceListResponse', {
     'success':     fields.Boolean(description='Success status'),
     'invoices':    fields.List(fields.Nested(invoice_model), description='List of invoices'),
-    'total_count': fields.Integer(description='Total number of invoices'),
+    'total_count': fields.Integer(description='Total number of invoices (first page or include_total=1, else null)'),
     'page':        fields.Integer(description='Current page'),
     'per_page':    fields.Integer(description='Items per page'),
+    'next_cursor': fields.String(description='Cursor for the next page (null on the last page)'),
 })
 
 invoice_error_response = rest_api.model('InvoiceErrorResponse', {
@@ -120,7 +126,12 @@ class InvoiceUpload(Resource):
                 return {'success': False, 'msg': f'Company with ID {company_id} not found',
                         'processed_count': 0, 'error_count': 0}, 400
 
-            return invoice_service.process_invoice_upload(uploaded_file, warehouse_id, company_id, current_user.id)
+            job_id = upload_job_queue.enqueue(
+                'invoices', uploaded_file,
+                {'warehouse_id': warehouse_id, 'company_id': company_id,
+                 'user_id': current_user.id, 'resume_batch_id': args['resume_batch_id']},
+            )
+            return queued_response(job_id)
 
         except Exception as e:
             return {'success': False, 'msg': f'Error processing upload: {str(e)}',
@@ -180,46 +191,67 @@ class InvoiceStatistics(Resource):
 class InvoiceList(Resource):
     """Get list of invoices with pagination and filtering."""
 
+    @rest_api.doc(params={
+        'warehouse_id':  'Warehouse ID',
+        'company_id':    'Company ID',
+        'batch_id':      'Upload batch ID',
+        'per_page':      'Page size (default 50, max 100)',
+        'cursor':        'next_cursor from the previous page (omit for the first page)',
+        'page':          'Page number (legacy OFFSET paging, ignored when cursor is given)',
+        'include_total': 'Count matching invoices on cursor pages too (1/0)',
+    })
     @rest_api.response(200, 'Success', invoice_list_response)
     @rest_api.response(400, 'Error', invoice_error_response)
     @token_required
     @active_required
     def get(self, _current_user):
-        """Get list of invoices."""
+        """Get list of invoices, newest first."""
         try:
             warehouse_id = request.args.get('warehouse_id', type=int)
             company_id   = request.args.get('company_id',   type=int)
             batch_id     = request.args.get('batch_id')
             page         = request.args.get('page',     1,  type=int)
             per_page     = request.args.get('per_page', 50, type=int)
+            after        = decode_cursor(request.args.get('cursor'))
 
             per_page = min(per_page, 100)
+            # The exact total costs a COUNT over the window: run it once, on the first page
+            include_total = request.args.get('include_total', '1' if not after else '0') not in ('0', 'false')
 
             pf_sql, pf_params = partition_filter('invoice')
-            base_query  = f"SELECT * FROM invoice WHERE {pf_sql}"
-            count_query = f"SELECT COUNT(*) as count FROM invoice WHERE {pf_sql}"
+            where  = pf_sql
             params = list(pf_params)
 
             if warehouse_id:
-                base_query  += " AND warehouse_id = %s"
-                count_query += " AND warehouse_id = %s"
+                where += " AND warehouse_id = %s"
                 params.append(warehouse_id)
             if company_id:
-                base_query  += " AND company_id = %s"
-                count_query += " AND company_id = %s"
+                where += " AND company_id = %s"
                 params.append(company_id)
             if batch_id:
-                base_query  += " AND upload_batch_id = %s"
-                count_query += " AND upload_batch_id = %s"
+                where += " AND upload_batch_id = %s"
                 params.append(batch_id)
 
-            total_result = mysql_manager.execute_query(count_query, params)
-            total_count  = total_result[0]['count'] if total_result else 0
-
-            base_query += " ORDER BY created_at DESC LIMIT %s OFFSET %s"
-            params.extend([per_page, (page - 1) * per_page])
-
-            invoices_data = mysql_manager.execute_query(base_query, params)
+            total_count = None
+            if include_total:
+                total_result = mysql_manager.execute_query(
+                    f"SELECT COUNT(*) as count FROM invoice WHERE {where}", params
+                )
+                total_count = total_result[0]['count'] if total_result else 0
+
+            if after:
+                ks_sql, ks_params = keyset_condition('created_at', 'invoice_id', after)
+                where += f" AND {ks_sql}"
+                params.extend(ks_params)
+
+            invoices_data, next_cursor = split_page(
+                mysql_manager.execute_query(
+                    f"SELECT * FROM invoice WHERE {where}"
+                    f" ORDER BY created_at DESC, invoice_id DESC LIMIT %s OFFSET %s",
+                    params + [per_page + 1, 0 if after else (page - 1) * per_page]
+                ) or [],
+                per_page, 'created_at', 'invoice_id'
+            )
 
             invoice_list = []
             for invoice_data in invoices_data:
@@ -245,6 +277,7 @@ class InvoiceList(Resource):
                 'total_count': total_count,
                 'page':        page,
                 'per_page':    per_page,
+                'next_cursor': next_cursor,
             }, 200
 
         except Exception as e:
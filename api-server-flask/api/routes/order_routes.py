@@ -25,7 +25,7 @@ from ..models import (
     mysql_manager
 )
 from ..db_manager import partition_filter
-from ..services import order_service
+from ..services.upload_jobs import upload_job_queue, queued_response
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -44,6 +44,9 @@ upload_parser.add_argument('warehouse_id',
 upload_parser.add_argument('company_id',
                            type=int, location='form', required=True,
                            help='Company ID must be provided')
+upload_parser.add_argument('resume_batch_id',
+                           type=int, location='form',
+                           help='Continue this unfinished resumable upload (same file)')
 
 order_upload_response = rest_api.model('OrderUploadResponse', {
     'success':            fields.Boolean(description='Success status of upload'),
@@ -190,7 +193,12 @@ class OrderUpload(Resource):
                 return {'success': False, 'msg': f'Company with ID {company_id} not found',
                         'processed_count': 0, 'error_count': 0}, 400
 
-            return order_service.process_order_upload(uploaded_file, warehouse_id, company_id, current_user.id)
+            job_id = upload_job_queue.enqueue(
+                'orders', uploaded_file,
+                {'warehouse_id': warehouse_id, 'company_id': company_id,
+                 'user_id': current_user.id, 'resume_batch_id': args['resume_batch_id']},
+            )
+            return queued_response(job_id)
 
         except Exception as e:
             return {'success': False, 'msg': f'Error processing upload: {str(e)}',
@@ -637,6 +645,7 @@ class OrderPackedUpdate(Resource):
 
                 # Step 2: Process boxes and their product assignments
                 total_box_quantities = {}
+                new_boxes = []           # [(Box, [BoxProduct, ...])] — written in bulk below
 
                 for box_index, box_data in enumerate(boxes_data):
                     if not isinstance(box_data, dict):
@@ -649,8 +658,7 @@ class OrderPackedUpdate(Resource):
                         continue
 
                     box = Box(name=box_name, created_at=current_time, updated_at=current_time)
-                    box.save()
-                    logger.debug("Box created", extra={'box_name': box_name, 'box_id': box.box_id})
+                    new_boxes.append((box, []))
 
                     for product_assignment in box_products:
                         if not isinstance(product_assignment, dict):
@@ -672,16 +680,24 @@ class OrderPackedUpdate(Resource):
                             total_box_quantities[product_id] = 0
                         total_box_quantities[product_id] += quantity
 
-                        BoxProduct(
-                            box_id=box.box_id,
+                        new_boxes[-1][1].append(BoxProduct(
                             product_id=product_id,
                             quantity=quantity,
                             potential_order_id=numeric_id,
                             created_at=current_time,
                             updated_at=current_time
-                        ).save()
-                        logger.debug("Added product to box",
-                                     extra={'product_id': product_id, 'box_name': box_name, 'quantity': quantity})
+                        ))
+
+                # One INSERT for the boxes, one for their products
+                Box.bulk_insert([box for box, _ in new_boxes])
+                box_products = []
+                for box, products in new_boxes:
+                    for box_product in products:
+                        box_product.box_id = box.box_id
+                    box_products.extend(products)
+                BoxProduct.bulk_insert(box_products)
+                logger.debug("Boxes created",
+                             extra={'boxes': len(new_boxes), 'box_products': len(box_products)})
 
                 # Step 3: Validate box quantities match packed quantities
                 for product_data in products_data:
@@ -9,7 +9,7 @@ from flask_restx import Resource, fields, reqparse
 from ..extensions import rest_api
 from ..core.auth import token_required, active_required, upload_permission_required
 from ..models import Company
-from ..services import product_service
+from ..services.upload_jobs import upload_job_queue, queued_response
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -27,6 +27,9 @@ product_upload_parser.add_argument('company_id',
                                    location='form',
                                    required=True,
                                    help='Company ID must be provided')
+product_upload_parser.add_argument('resume_batch_id',
+                                   type=int, location='form',
+                                   help='Continue this unfinished resumable upload (same file)')
 
 product_upload_response = rest_api.model('ProductUploadResponse', {
     'success':        fields.Boolean(description='Success status of upload'),
@@ -61,7 +64,12 @@ class ProductUpload(Resource):
                 return {'success': False, 'msg': f'Company with ID {company_id} not found',
                         'processed_count': 0, 'error_count': 0}, 400
 
-            return product_service.process_product_upload(uploaded_file, company_id, current_user.id)
+            job_id = upload_job_queue.enqueue(
+                'products', uploaded_file,
+                {'company_id': company_id, 'user_id': current_user.id,
+                 'resume_batch_id': args['resume_batch_id']},
+            )
+            return queued_response(job_id)
 
         except Exception as e:
             return {'success': False, 'msg': f'Error processing upload: {str(e)}',
@@ -17,6 +17,7 @@ from ..extensions import rest_api
 from ..core.auth import token_required, active_required, supply_sheet_required
 from ..db_manager import mysql_manager, partition_filter
 from ..models import SupplySheetCounter
+from ..repositories import order_repo
 from ..core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -303,27 +304,15 @@ def _finalize_orders(warehouse_id: int, company_id: int, dealer_ids: list, user_
     if not order_rows:
         return 0
 
-    po_ids      = [r['potential_order_id'] for r in order_rows]
-    po_ph       = ', '.join(['%s'] * len(po_ids))
+    po_ids = [r['potential_order_id'] for r in order_rows]
 
-    # Bulk UPDATE potential_order → Dispatch Ready
-    mysql_manager.execute_query(
-        f"""UPDATE potential_order
-            SET status = 'Dispatch Ready', updated_at = %s
-            WHERE potential_order_id IN ({po_ph})""",
-        (now,) + tuple(po_ids),
-        fetch=False
-    )
+    # Set-based UPDATE potential_order → Dispatch Ready (chunked, counters kept in step)
+    order_repo.bulk_set_status(po_ids, 'Dispatch Ready', now)
 
     # Bulk INSERT order_state_history
-    hist_params = [(po_id, dispatch_ready_id, user_id, now) for po_id in po_ids]
-    with mysql_manager.get_cursor() as cursor:
-        cursor.executemany(
-            """INSERT INTO order_state_history
-               (potential_order_id, state_id, changed_by, changed_at)
-               VALUES (%s, %s, %s, %s)""",
-            hist_params
-        )
+    order_repo.bulk_create_state_history(
+        [(po_id, dispatch_ready_id, user_id, now) for po_id in po_ids]
+    )
 
     return len(po_ids)
 
@@ -0,0 +1,32 @@
+# -*- encoding: utf-8 -*-
+"""
+Background upload job routes:
+  GET /api/uploads/<job_id>
+
+The upload endpoints (orders, invoices, products) answer 202 with a job id;
+clients poll this endpoint for phase / percent until status is done or
+failed, at which point 'result' holds the usual upload response.
+"""
+
+from flask_restx import Resource
+
+from ..extensions import rest_api
+from ..core.auth import token_required, active_required
+from ..permissions import has_all_warehouse_access
+from ..repositories import upload_job_repo
+from ..services.upload_jobs import serialize_job
+
+
+@rest_api.route('/api/uploads/<int:job_id>')
+class UploadJobStatus(Resource):
+    """Progress and final result of a background upload."""
+
+    @token_required
+    @active_required
+    def get(self, current_user, job_id):
+        job = upload_job_repo.get(job_id)
+        # Users only see their own jobs; all-warehouse roles see every job.
+        if not job or (job['created_by'] != current_user.id
+                       and not has_all_warehouse_access(current_user.role)):
+            return {'success': False, 'msg': f'Upload job {job_id} not found'}, 404
+        return {'success': True, 'job': serialize_job(job)}, 200
@@ -5,17 +5,27 @@ BaseUploadService — Template Method pattern for all upload pipelines.
 Every upload type (orders, invoices, products) follows the same 8-step skeleton:
   1. Save uploaded file to a temp path
   2. Validate file extension
-  3. Parse file into a Pandas DataFrame
-  4. Normalise column names and resolve required columns
+  3. Parse file into Pandas DataFrames (streamed in chunks — see stream_chunk_rows)
+  4. Normalise column names and resolve required columns (on the first chunk)
   5. Create an upload_batches tracking record
   6. Run the domain-specific processing inside a DB transaction
   7. Commit or rollback; update / delete the batch record accordingly
-  8. Clean up the temp file and return a standardised response
+     (steps 5–7 run in one unit of work: a single connection, a single commit)
+  8. Return a standardised response (execute() then removes the temp file;
+     an upload job keeps it until the job has succeeded)
+
+Resumable mode (context['resumable'] or context['resume_batch_id']) replaces
+the single commit of steps 5–7: the file is processed in resume_chunk_rows
+chunks, each committed together with the batch's progress, so a run that
+dies mid-file can be continued from its last committed chunk.
 
 Subclasses override only:
   • upload_type       — string key (e.g. 'orders')
   • required_columns  — list of column names that must exist after fuzzy resolution
   • process_dataframe — domain logic (receives df + context dict, returns result dict)
+and may set:
+  • stream_chunk_rows — rows per process_dataframe call; None (default) hands
+                        over the whole file as one DataFrame
 
 The backward-compatible module-level function wrappers in each subclass file
 mean that existing route calls (order_service.process_order_upload(...)) require
@@ -23,12 +33,16 @@ no changes.
 """
 
 import abc
+import itertools
 import os
 
-from ..db_manager import mysql_manager
+import pandas as pd
+
+from ..db_manager import mysql_manager, partition_filter
+from ..core.exceptions import UploadException
 from ..utils.upload_utils import (
-    cleanup_temp_file, create_upload_batch, make_upload_response,
-    read_upload_file, resolve_required_columns, save_temp_file,
+    UPLOAD_READ_CHUNK_ROWS, cleanup_temp_file, create_upload_batch, iter_upload_file,
+    make_upload_response, read_upload_file, resolve_required_columns, save_temp_file,
 )
 from ..core.logging import get_logger
 
@@ -52,6 +66,17 @@ class BaseUploadService(abc.ABC):
     def required_columns(self) -> list:
         """Column names that must be present after fuzzy resolution."""
 
+    # Rows per process_dataframe call. With a value set, the file is streamed
+    # and processed chunk by chunk in bounded memory; every chunk still runs in
+    # the upload's single transaction, so later chunks see earlier chunks'
+    # writes. Leave None when rows that must be classified together (e.g. all
+    # lines of one order) may be spread through the file.
+    stream_chunk_rows = None
+
+    # Rows per committed chunk in resumable mode. Stored on the batch row, so
+    # a resumed run splits the file exactly as the original run did.
+    resume_chunk_rows = UPLOAD_READ_CHUNK_ROWS
+
     @abc.abstractmethod
     def process_dataframe(self, df, context: dict) -> dict:
         """
@@ -67,6 +92,15 @@ class BaseUploadService(abc.ABC):
                 processed_count (int)   — rows successfully committed
                 error_rows      (list)  — list of {'order_id', 'name', 'reason'}
             May also contain any extra keys forwarded to make_upload_response().
+            When streaming, per-chunk results are merged: ints are summed,
+            lists concatenated, anything else keeps the last chunk's value.
+        """
+
+    def replay_chunk(self, df, context: dict) -> None:
+        """
+        Called instead of process_dataframe for chunks a resumed run skips
+        (already committed). Override to rebuild cross-chunk state kept in
+        context['run_state']; must not write to the database.
         """
 
     # ── Template method ───────────────────────────────────────────────────────
@@ -78,18 +112,41 @@ class BaseUploadService(abc.ABC):
         Args:
             uploaded_file: Werkzeug FileStorage object from the request.
             context:       Dict with at minimum {'user_id'} and optionally
-                           {'warehouse_id', 'company_id'}.
+                           {'warehouse_id', 'company_id'}; 'resumable': True
+                           or 'resume_batch_id' select resumable mode.
 
         Returns:
             (response_dict, http_status_code)
         """
-        temp_path = None
-        upload_batch_id = None
-
         try:
             # Step 1 — save to temp
             temp_path, ext = save_temp_file(uploaded_file, self._tmp_dir())
+        except Exception as e:
+            logger.exception("Upload pipeline error", extra={'upload_type': self.upload_type})
+            return {
+                'success': False,
+                'msg': f'Error processing file: {str(e)}',
+                'processed_count': 0, 'error_count': 0,
+            }, 400
+        try:
+            return self.execute_file(temp_path, ext, uploaded_file.filename, context)
+        finally:
+            cleanup_temp_file(temp_path)
 
+    def execute_file(self, temp_path, ext, filename, context: dict, progress=None) -> tuple:
+        """
+        Steps 2–7 for a file already saved to temp_path (background upload
+        jobs start here). The file is left in place: its owner removes it —
+        execute(), or the upload job once it has succeeded, since a job that
+        dies is resumed from the same file.
+
+        progress: optional callable(phase, **fields) told about each stage —
+                  'parsing', 'processing' (with upload_batch_id, then
+                  rows_done after each committed chunk) and 'finalising'.
+        """
+        upload_batch_id = None
+
+        try:
             # Step 2 — validate extension
             if ext not in _SUPPORTED_EXTENSIONS:
                 return {
@@ -98,40 +155,59 @@ class BaseUploadService(abc.ABC):
                     'processed_count': 0, 'error_count': 0,
                 }, 400
 
-            # Step 3 — parse
-            df = read_upload_file(temp_path, ext)
-            df = df.dropna(how='all')
-
-            # Step 4 — normalise columns + resolve required
-            df.columns = df.columns.str.replace('\n', ' ').str.replace('\r', ' ').str.strip()
-            df, error = resolve_required_columns(df, self.required_columns)
+            resume_batch = self._load_resume_batch(context, filename)
+            resumable = bool(context.get('resumable') or resume_batch)
+            if resume_batch:
+                chunk_rows = resume_batch['chunk_rows'] or self.resume_chunk_rows
+            else:
+                chunk_rows = self.resume_chunk_rows if resumable else self.stream_chunk_rows
+
+            # Step 3 — parse (only the first chunk is read here)
+            _report(progress, 'parsing')
+            frames = self._iter_frames(temp_path, ext, chunk_rows)
+            first_df = next(frames, None)
+            if first_df is None:
+                first_df = pd.DataFrame(columns=[], dtype=str)
+
+            # Step 4 — resolve required columns; later chunks take the same names
+            first_df, error = resolve_required_columns(first_df, self.required_columns)
             if error:
                 return {'success': False, 'msg': error, 'processed_count': 0, 'error_count': 0}, 400
-
-            # Step 5 — create batch record
-            upload_batch_id = create_upload_batch(
-                mysql_manager,
-                self.upload_type,
-                uploaded_file.filename,
-                context.get('warehouse_id'),
-                context.get('company_id'),
-                context['user_id'],
-            )
-            context = {**context, 'upload_batch_id': upload_batch_id}
-
-            # Step 6+7 — run in transaction
-            result = self._run_in_transaction(df, context, upload_batch_id)
-
-            # Step 8 — cleanup + respond
-            cleanup_temp_file(temp_path)
+            frames = itertools.chain([first_df], self._renamed(frames, first_df.columns))
+
+            if resumable:
+                return self._execute_resumable(
+                    frames, context, filename, chunk_rows, resume_batch, progress
+                )
+
+            with mysql_manager.unit_of_work():
+                # Step 5 — create batch record
+                upload_batch_id = create_upload_batch(
+                    mysql_manager,
+                    self.upload_type,
+                    filename,
+                    context.get('warehouse_id'),
+                    context.get('company_id'),
+                    context['user_id'],
+                )
+                context = {**context, 'upload_batch_id': upload_batch_id}
+                _report(progress, 'processing', upload_batch_id=upload_batch_id)
+
+                # Step 6+7 — run in transaction
+                result = self._run_in_transaction(frames, context, upload_batch_id)
+                _report(progress, 'finalising')
+
+            # Step 8 — respond
             extra = {k: v for k, v in result.items()
                      if k not in ('processed_count', 'error_rows')}
             extra.setdefault('upload_batch_id', upload_batch_id)
             return make_upload_response(result['processed_count'], result['error_rows'], **extra)
 
+        except UploadException as e:
+            return {'success': False, 'msg': e.message, 'processed_count': 0, 'error_count': 0}, e.http_status
+
         except Exception as e:
             logger.exception("Upload pipeline error", extra={'upload_type': self.upload_type})
-            cleanup_temp_file(temp_path)
             self._delete_batch(upload_batch_id)
             return {
                 'success': False,
@@ -139,24 +215,206 @@ class BaseUploadService(abc.ABC):
                 'processed_count': 0, 'error_count': 0,
             }, 400
 
+    # ── Resumable mode ────────────────────────────────────────────────────────
+
+    def _execute_resumable(self, frames, context, filename, chunk_rows, resume_batch, progress=None):
+        """
+        Steps 5–8 in resumable mode.
+
+        Each chunk runs in a savepoint and is committed together with the
+        batch's progress (rows_done, error_count, last_chunk); the batch stays
+        'processing' until the last chunk is in. A run that dies mid-file —
+        worker timeout, crash, a failing chunk — keeps every chunk before it,
+        and re-submitting the same file with resume_batch_id skips them.
+        """
+        with mysql_manager.unit_of_work():
+            if resume_batch:
+                upload_batch_id = resume_batch['id']
+                done_chunks = resume_batch['last_chunk'] or 0
+            else:
+                upload_batch_id = create_upload_batch(
+                    mysql_manager,
+                    self.upload_type,
+                    filename,
+                    context.get('warehouse_id'),
+                    context.get('company_id'),
+                    context['user_id'],
+                    status='processing',
+                    chunk_rows=chunk_rows,
+                )
+                if not upload_batch_id:
+                    raise UploadException("Could not create the upload batch record needed to resume this upload.")
+                done_chunks = 0
+                mysql_manager.commit_unit_of_work()
+
+            context = {**context, 'upload_batch_id': upload_batch_id, 'run_state': {}}
+            _report(progress, 'processing', upload_batch_id=upload_batch_id)
+            result, failure, chunk_number = self._run_chunks(
+                frames, context, upload_batch_id, done_chunks, progress
+            )
+            if failure is None:
+                _report(progress, 'finalising')
+                self._finish_resumable_batch(upload_batch_id)
+
+        extra = {k: v for k, v in result.items()
+                 if k not in ('processed_count', 'error_rows')}
+        extra['upload_batch_id'] = upload_batch_id
+        if done_chunks:
+            extra['resumed_from_chunk'] = done_chunks
+        response, status = make_upload_response(result['processed_count'], result['error_rows'], **extra)
+
+        if failure is not None:
+            response.update({
+                'success': False,
+                'resumable': True,
+                'last_chunk': chunk_number - 1,
+                'msg': (f"Upload stopped at chunk {chunk_number}: {failure}. "
+                        f"{chunk_number - 1} earlier chunk(s) are saved; upload the same file again "
+                        f"with resume_batch_id={upload_batch_id} to continue."),
+            })
+            status = 400
+        return response, status
+
+    def _run_chunks(self, frames, context, upload_batch_id, done_chunks, progress=None):
+        """
+        Process and commit chunk after chunk. Stops at the first chunk that
+        raises (it is rolled back alone).
+
+        Returns (merged_result, failure_or_None, chunk_number_reached).
+        """
+        result = {'processed_count': 0, 'error_rows': []}
+        chunk_number = 0
+        rows_done = 0
+        for chunk_number, df in enumerate(frames, 1):
+            rows_done += len(df)
+            if chunk_number <= done_chunks:
+                self.replay_chunk(df, context)
+                continue
+            try:
+                with mysql_manager.savepoint():
+                    chunk_result = self.process_dataframe(df, context)
+                    mysql_manager.execute_query(
+                        """UPDATE upload_batches
+                           SET rows_done    = rows_done    + %s,
+                               record_count = record_count + %s,
+                               error_count  = error_count  + %s,
+                               last_chunk   = %s
+                           WHERE id = %s""",
+                        (len(df), chunk_result.get('processed_count', 0),
+                         len(chunk_result.get('error_rows', [])), chunk_number, upload_batch_id),
+                        fetch=False,
+                    )
+                mysql_manager.commit_unit_of_work()
+            except Exception as e:
+                logger.exception("Resumable upload chunk failed",
+                                 extra={'upload_type': self.upload_type, 'batch_id': upload_batch_id,
+                                        'chunk': chunk_number})
+                return result, e, chunk_number
+
+            self._merge_results(result, chunk_result)
+            _report(progress, 'processing', rows_done=rows_done)
+            logger.debug("Upload chunk committed",
+                         extra={'upload_type': self.upload_type, 'batch_id': upload_batch_id,
+                                'chunk': chunk_number, 'rows': len(df)})
+        return result, None, chunk_number
+
+    def _finish_resumable_batch(self, upload_batch_id) -> None:
+        """Mark a finished resumable batch active — or drop it if nothing was saved."""
+        rows = mysql_manager.execute_query(
+            "SELECT record_count FROM upload_batches WHERE id = %s", (upload_batch_id,)
+        )
+        if rows and rows[0]['record_count']:
+            mysql_manager.execute_query(
+                "UPDATE upload_batches SET status = 'active' WHERE id = %s",
+                (upload_batch_id,), fetch=False
+            )
+        else:
+            self._delete_batch(upload_batch_id)
+
+    def _load_resume_batch(self, context, filename):
+        """Return the batch named by context['resume_batch_id'] (validated), or None."""
+        batch_id = context.get('resume_batch_id')
+        if not batch_id:
+            return None
+
+        pf_sql, pf_params = partition_filter('upload_batches')
+        rows = mysql_manager.execute_query(
+            f"""SELECT id, upload_type, filename, status, last_chunk, chunk_rows
+                FROM upload_batches WHERE id = %s AND {pf_sql}""",
+            (batch_id, *pf_params)
+        )
+        batch = rows[0] if rows else None
+        if not batch or batch['upload_type'] != self.upload_type:
+            raise UploadException(f"Upload batch {batch_id} not found for {self.upload_type} uploads.", 404)
+        if batch['status'] != 'processing':
+            raise UploadException(f"Upload batch {batch_id} cannot be resumed (status: {batch['status']}).", 409)
+        if batch['filename'] != filename:
+            raise UploadException(
+                f"Upload batch {batch_id} was created for '{batch['filename']}'. "
+                "Upload the same file to resume it.", 409
+            )
+        return batch
+
     # ── Internal helpers ──────────────────────────────────────────────────────
 
-    def _run_in_transaction(self, df, context: dict, upload_batch_id) -> dict:
-        """Wraps process_dataframe in a DB transaction; commits or rolls back."""
+    def _iter_frames(self, temp_path, ext, chunk_rows=None):
+        """Steps 3+4 per chunk: parse, drop blank rows, clean the column names."""
+        if chunk_rows:
+            frames = iter_upload_file(temp_path, ext, chunk_rows)
+        else:
+            frames = iter([read_upload_file(temp_path, ext)])
+        for df in frames:
+            df = df.dropna(how='all')
+            df.columns = [str(c).replace('\n', ' ').replace('\r', ' ').strip() for c in df.columns]
+            yield df
+
+    @staticmethod
+    def _renamed(frames, columns):
+        for df in frames:
+            df.columns = columns
+            yield df
+
+    @staticmethod
+    def _merge_results(total: dict, chunk: dict) -> dict:
+        for key, value in chunk.items():
+            if isinstance(value, list):
+                total.setdefault(key, []).extend(value)
+            elif isinstance(value, int) and not isinstance(value, bool):
+                total[key] = total.get(key, 0) + value
+            else:
+                total[key] = value
+        return total
+
+    def _run_in_transaction(self, frames, context: dict, upload_batch_id) -> dict:
+        """
+        Run process_dataframe on the upload's unit of work; commit or roll back.
+
+        Repository and model writes made by process_dataframe join the unit of
+        work opened in execute(), so nothing is committed until the upload
+        finishes. Implementations may wrap each write chunk in
+        mysql_manager.savepoint() to turn a failed chunk into error rows
+        without losing the chunks already written.
+        """
         try:
-            with mysql_manager.get_cursor(commit=False) as cursor:
-                result = self.process_dataframe(df, context)
+            with mysql_manager.savepoint() as upload_savepoint:
+                result = {'processed_count': 0, 'error_rows': []}
+                for chunk_number, df in enumerate(frames, 1):
+                    if df.empty and chunk_number > 1:
+                        continue
+                    self._merge_results(result, self.process_dataframe(df, context))
+                    logger.debug("Upload chunk processed",
+                                 extra={'upload_type': self.upload_type, 'chunk': chunk_number,
+                                        'rows': len(df), 'processed_count': result['processed_count']})
                 processed = result.get('processed_count', 0)
 
                 if processed > 0:
-                    cursor.connection.commit()
                     if upload_batch_id:
                         mysql_manager.execute_query(
                             "UPDATE upload_batches SET record_count=%s WHERE id=%s",
                             (processed, upload_batch_id), fetch=False
                         )
                 else:
-                    cursor.connection.rollback()
+                    upload_savepoint.rollback()
                     self._delete_batch(upload_batch_id)
 
                 return result
@@ -178,3 +436,13 @@ class BaseUploadService(abc.ABC):
 
     def _tmp_dir(self) -> str:
         return os.path.join(os.path.dirname(os.path.realpath(__file__)), 'tmp')
+
+
+def _report(progress, phase, **fields):
+    """Forward a stage change to the progress callback; never fails the upload."""
+    if progress is None:
+        return
+    try:
+        progress(phase, **fields)
+    except Exception:
+        logger.warning("Upload progress callback failed", exc_info=True)
@@ -33,6 +33,7 @@ class InvoiceUploadService(BaseUploadService):
             context.get('company_id'),
             context['user_id'],
             context['upload_batch_id'],
+            chunked='run_state' in context,
         )
         return {
             'processed_count': result['invoices_processed'],
@@ -47,11 +48,17 @@ class InvoiceUploadService(BaseUploadService):
 _service = InvoiceUploadService()
 
 
-def process_invoice_upload(uploaded_file, warehouse_id, company_id, user_id):
-    """Process an uploaded invoice file. Returns (result_dict, http_status_code)."""
+def process_invoice_upload(uploaded_file, warehouse_id, company_id, user_id,
+                           resumable=False, resume_batch_id=None):
+    """
+    Process an uploaded invoice file. Returns (result_dict, http_status_code).
+
+    resumable / resume_batch_id select BaseUploadService's resumable mode.
+    """
     return _service.execute(
         uploaded_file,
-        {'warehouse_id': warehouse_id, 'company_id': company_id, 'user_id': user_id},
+        {'warehouse_id': warehouse_id, 'company_id': company_id, 'user_id': user_id,
+         'resumable': resumable, 'resume_batch_id': resume_batch_id},
     )
 
 
@@ -10,8 +10,8 @@ import os
 
 from ..models import mysql_manager
 from ..business.order_business import process_order_dataframe
-from ..business.dealer_business import clear_dealer_cache
 from ..core.logging import get_logger
+from ..utils.upload_utils import UPLOAD_READ_CHUNK_ROWS
 from .base_upload_service import BaseUploadService
 
 logger = get_logger(__name__)
@@ -24,9 +24,11 @@ class OrderUploadService(BaseUploadService):
 
     upload_type = 'orders'
     required_columns = ['Sales Order #']
+    # One row per order, so the file can be streamed: an order repeated in a
+    # later chunk is caught by the existing-id lookup and reported as a duplicate.
+    stream_chunk_rows = UPLOAD_READ_CHUNK_ROWS
 
     def process_dataframe(self, df, context: dict) -> dict:
-        clear_dealer_cache()
         result = process_order_dataframe(
             df,
             context['warehouse_id'],
@@ -45,11 +47,17 @@ class OrderUploadService(BaseUploadService):
 _service = OrderUploadService()
 
 
-def process_order_upload(uploaded_file, warehouse_id, company_id, user_id):
-    """Process an uploaded order file. Returns (result_dict, http_status_code)."""
+def process_order_upload(uploaded_file, warehouse_id, company_id, user_id,
+                         resumable=False, resume_batch_id=None):
+    """
+    Process an uploaded order file. Returns (result_dict, http_status_code).
+
+    resumable / resume_batch_id select BaseUploadService's resumable mode.
+    """
     return _service.execute(
         uploaded_file,
-        {'warehouse_id': warehouse_id, 'company_id': company_id, 'user_id': user_id},
+        {'warehouse_id': warehouse_id, 'company_id': company_id, 'user_id': user_id,
+         'resumable': resumable, 'resume_batch_id': resume_batch_id},
     )
 
 
@@ -6,7 +6,9 @@ Backward-compatible module-level function kept so existing route calls
 (product_service.process_product_upload(...)) require no changes.
 """
 
-from ..business.product_upload_business import process_product_upload_dataframe
+from ..business.product_upload_business import (
+    process_product_upload_dataframe, remember_product_lines,
+)
 from ..core.logging import get_logger
 from .base_upload_service import BaseUploadService
 
@@ -25,6 +27,7 @@ class ProductUploadService(BaseUploadService):
             context.get('company_id'),
             context['user_id'],
             context['upload_batch_id'],
+            run_state=context.get('run_state'),
         )
         return {
             'processed_count': result['products_processed'],
@@ -32,16 +35,25 @@ class ProductUploadService(BaseUploadService):
             'orders_updated': result['orders_updated'],
         }
 
+    def replay_chunk(self, df, context: dict) -> None:
+        remember_product_lines(df, context['run_state'])
+
 
 # ── Backward-compatible shim ──────────────────────────────────────────────────
 
 _service = ProductUploadService()
 
 
-def process_product_upload(uploaded_file, company_id, user_id):
-    """Process an uploaded product file. Returns (result_dict, http_status_code)."""
+def process_product_upload(uploaded_file, company_id, user_id,
+                           resumable=False, resume_batch_id=None):
+    """
+    Process an uploaded product file. Returns (result_dict, http_status_code).
+
+    resumable / resume_batch_id select BaseUploadService's resumable mode.
+    """
     return _service.execute(
         uploaded_file,
         # warehouse_id is not applicable for product uploads; base service calls .get() safely
-        {'company_id': company_id, 'user_id': user_id},
+        {'company_id': company_id, 'user_id': user_id,
+         'resumable': resumable, 'resume_batch_id': resume_batch_id},
     )
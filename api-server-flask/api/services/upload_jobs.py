@@ -0,0 +1,295 @@
+# -*- encoding: utf-8 -*-
+"""
+Background upload jobs — uploads run off the request thread.
+
+The upload endpoints save the file, INSERT an upload_jobs row and answer at
+once (202 + job id). A worker thread in the same process claims queued jobs
+and runs them through BaseUploadService.execute_file(); the pipeline's
+stages become the job's phase / percent, which GET /api/uploads/<job_id>
+reports until the final response is stored on the row.
+
+No external broker: the upload_jobs table is the queue (claims are atomic
+UPDATEs, so several gunicorn workers can share it) and an in-process
+queue.Queue only wakes the worker. Each process starts its worker at boot
+(gunicorn post_fork hook, run.py for the dev server) so queued and orphaned
+jobs are picked up without waiting for a new upload.
+
+A claimed job is leased to one worker id (host:pid:token): the runner bumps
+heartbeat_at every UPLOAD_JOB_HEARTBEAT_SECONDS, and progress / finish only
+land while the row still names that worker. Jobs always run in resumable
+mode, so a job whose worker died — max_requests recycle, crash — is
+re-queued with resume_batch_id and continues from its last committed chunk:
+at once when its pid is gone from this host, otherwise once its heartbeat
+is older than UPLOAD_JOB_STALE_SECONDS. The staged file therefore stays on
+disk until the job succeeds; a failed job's file goes with its row after
+UPLOAD_JOB_RETENTION_DAYS.
+
+Job states:  queued → running → done | failed
+"""
+
+import json
+import os
+import queue
+import socket
+import threading
+import uuid
+
+from ..config import BaseConfig
+from ..db_manager import mysql_manager
+from ..repositories import upload_job_repo
+from ..utils.upload_utils import cleanup_temp_file, estimate_row_count, save_temp_file
+from ..core.logging import get_logger
+from .upload_factory import UploadProcessorFactory
+
+logger = get_logger(__name__)
+
+# Percent at which each phase starts; 'processing' fills the range up to 95
+# in proportion to rows_done / rows_total.
+_PHASE_PERCENT = {'queued': 0, 'parsing': 2, 'processing': 5, 'finalising': 95, 'finished': 100}
+
+
+class UploadJobQueue:
+    """Enqueue uploads and run them on a per-process background thread."""
+
+    POLL_SECONDS = 30   # idle worker re-scans the table (other processes' jobs, stale jobs)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = queue.Queue()
+        self._worker = None
+        self._worker_pid = None
+
+    # ── Public API ────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """
+        Start this process's worker thread (recovering orphaned jobs first).
+
+        Called once per serving process at boot — from gunicorn's post_fork
+        hook, never the preloading master, whose threads would not survive
+        the fork.
+        """
+        self._ensure_worker()
+
+    def enqueue(self, upload_type, uploaded_file, context: dict) -> int:
+        """
+        Save the file and queue it for processing. Returns the job id.
+
+        The job row is committed immediately (outside the request's unit of
+        work) so the worker can claim it before the request finishes.
+        """
+        service = UploadProcessorFactory.get(upload_type)
+        temp_path, _ext = save_temp_file(uploaded_file, os.path.join(service._tmp_dir(), 'jobs'))
+        job_context = {**context, 'resumable': True}
+        try:
+            with mysql_manager.detached():
+                job_id = upload_job_repo.create(
+                    service.upload_type, uploaded_file.filename, temp_path,
+                    json.dumps(job_context), context.get('user_id'),
+                )
+        except Exception:
+            cleanup_temp_file(temp_path)
+            raise
+
+        self._ensure_worker()
+        self._wakeup.put(job_id)
+        logger.info("Upload job queued",
+                    extra={'job_id': job_id, 'upload_type': service.upload_type})
+        return job_id
+
+    def run_job(self, job_id: int) -> None:
+        """Claim and run one queued job to completion (no-op if already claimed)."""
+        worker = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        if not upload_job_repo.claim(job_id, worker):
+            return
+        stop_heartbeat = self._start_heartbeat(job_id, worker)
+        try:
+            job = upload_job_repo.get(job_id)
+            file_path = job['file_path']
+            ext = os.path.splitext(file_path)[1].lower()
+
+            rows_total = estimate_row_count(file_path, ext)
+            upload_job_repo.update_progress(job_id, worker, rows_total=rows_total)
+            progress = self._progress_callback(job_id, worker, rows_total)
+
+            try:
+                service = UploadProcessorFactory.get(job['upload_type'])
+                response, status = service.execute_file(
+                    file_path, ext, job['filename'], json.loads(job['context']), progress
+                )
+            except Exception as e:
+                logger.exception("Upload job crashed", extra={'job_id': job_id})
+                response, status = {
+                    'success': False, 'msg': f'Error processing file: {str(e)}',
+                    'processed_count': 0, 'error_count': 0,
+                }, 500
+
+            finished = upload_job_repo.finish(
+                job_id, worker,
+                'done' if status < 400 else 'failed',
+                status,
+                response.get('processed_count', 0),
+                response.get('error_count', 0),
+                json.dumps(response, default=str),
+            )
+        finally:
+            stop_heartbeat.set()
+
+        if not finished:
+            # Re-queued meanwhile: the file now belongs to the job's next run
+            logger.warning("Upload job lease lost before finish; result discarded",
+                           extra={'job_id': job_id, 'worker': worker})
+            return
+        if status < 400:
+            cleanup_temp_file(file_path)
+        logger.info("Upload job finished",
+                    extra={'job_id': job_id, 'http_status': status,
+                           'processed_count': response.get('processed_count', 0)})
+
+    # ── Worker thread ─────────────────────────────────────────────────────────
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread in this process if it is not running (fork-safe)."""
+        with self._lock:
+            if (self._worker is not None and self._worker.is_alive()
+                    and self._worker_pid == os.getpid()):
+                return
+            # gunicorn preloads the app and forks: threads and queues do not
+            # survive the fork, so each worker process starts its own.
+            self._wakeup = queue.Queue()
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(
+                target=self._run_worker, name='upload-job-worker', daemon=True
+            )
+            self._worker.start()
+
+    def _run_worker(self) -> None:
+        self._recover()
+        while True:
+            try:
+                job_id = self._wakeup.get(timeout=self.POLL_SECONDS)
+            except queue.Empty:
+                job_id = None
+            try:
+                if job_id is None:
+                    self._recover()
+                else:
+                    self.run_job(job_id)
+            except Exception:
+                logger.exception("Upload job worker error", extra={'job_id': job_id})
+
+    def _start_heartbeat(self, job_id, worker) -> threading.Event:
+        """Renew the job's lease on a timer thread until the returned event is set."""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(BaseConfig.UPLOAD_JOB_HEARTBEAT_SECONDS):
+                try:
+                    if not upload_job_repo.heartbeat(job_id, worker):
+                        logger.warning("Upload job lease lost",
+                                       extra={'job_id': job_id, 'worker': worker})
+                        return
+                except Exception:
+                    logger.exception("Upload job heartbeat failed", extra={'job_id': job_id})
+
+        threading.Thread(target=beat, name=f'upload-job-heartbeat-{job_id}', daemon=True).start()
+        return stop
+
+    def _recover(self) -> None:
+        """
+        Re-queue jobs whose worker died (pid gone from this host, or no heartbeat
+        for UPLOAD_JOB_STALE_SECONDS), pick up jobs queued by other processes,
+        prune old finished jobs.
+        """
+        for job in upload_job_repo.find_running():
+            if not (job['stale'] or self._owner_is_dead(job['worker'])):
+                continue
+            if not os.path.exists(job['file_path']):
+                upload_job_repo.finish(
+                    job['id'], job['worker'], 'failed', 500,
+                    job['processed_count'], job['error_count'],
+                    json.dumps({'success': False, 'msg': 'Upload job was interrupted and its file is gone.',
+                                'processed_count': 0, 'error_count': 0,
+                                'upload_batch_id': job['upload_batch_id']}),
+                )
+                continue
+            context = json.loads(job['context'])
+            if job['upload_batch_id']:
+                context['resume_batch_id'] = job['upload_batch_id']
+            if not upload_job_repo.requeue(job['id'], job['worker'], json.dumps(context)):
+                continue
+            logger.warning("Re-queued interrupted upload job",
+                           extra={'job_id': job['id'], 'batch_id': job['upload_batch_id']})
+
+        for job_id in upload_job_repo.find_queued_ids():
+            self._wakeup.put(job_id)
+
+        for file_path in upload_job_repo.delete_finished_before(BaseConfig.UPLOAD_JOB_RETENTION_DAYS):
+            cleanup_temp_file(file_path)
+
+    @staticmethod
+    def _owner_is_dead(worker) -> bool:
+        """True when `worker` names a process on this host that no longer exists."""
+        host, _, rest = (worker or '').partition(':')
+        pid = rest.split(':', 1)[0]
+        if host != socket.gethostname() or not pid.isdigit() or int(pid) == os.getpid():
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            return False   # exists, owned by another user
+        return False
+
+    @staticmethod
+    def _progress_callback(job_id, worker, rows_total):
+        def progress(phase, rows_done=None, upload_batch_id=None):
+            fields = {'phase': phase, 'percent': _PHASE_PERCENT.get(phase, 0)}
+            if upload_batch_id is not None:
+                fields['upload_batch_id'] = upload_batch_id
+            if rows_done is not None:
+                fields['rows_done'] = rows_done
+                if rows_total:
+                    fields['percent'] = 5 + int(90 * min(rows_done / rows_total, 1))
+            # The job's own unit of work is open — progress must commit on its own.
+            with mysql_manager.detached():
+                upload_job_repo.update_progress(job_id, worker, **fields)
+        return progress
+
+
+def queued_response(job_id: int) -> tuple:
+    """202 response returned by the upload endpoints."""
+    return {
+        'success': True,
+        'msg': 'Upload queued for processing.',
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': f'/api/uploads/{job_id}',
+    }, 202
+
+
+def serialize_job(job: dict) -> dict:
+    """API shape of an upload_jobs row; the stored response is included once finished."""
+    finished = job['status'] in ('done', 'failed')
+    return {
+        'job_id':          job['id'],
+        'upload_type':     job['upload_type'],
+        'filename':        job['filename'],
+        'status':          job['status'],
+        'phase':           job['phase'] or job['status'],
+        'percent':         100 if finished else job['percent'],
+        'rows_total':      job['rows_total'],
+        'rows_done':       job['rows_done'],
+        'processed_count': job['processed_count'],
+        'error_count':     job['error_count'],
+        'upload_batch_id': job['upload_batch_id'],
+        'created_at':      job['created_at'].isoformat() if job['created_at'] else None,
+        'started_at':      job['started_at'].isoformat() if job['started_at'] else None,
+        'finished_at':     job['finished_at'].isoformat() if job['finished_at'] else None,
+        'result':          json.loads(job['result']) if finished and job['result'] else None,
+    }
+
+
+# Module-level singleton — one worker thread per process.
+upload_job_queue = UploadJobQueue()
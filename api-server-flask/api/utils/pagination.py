@@ -0,0 +1,61 @@
+# -*- encoding: utf-8 -*-
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Lists are ordered by (timestamp DESC, id DESC). Each page carries an opaque
+next_cursor — the sort key of its last row — and the next page asks for the
+rows strictly after it. Every page is the same short index range scan
+however deep it is (OFFSET re-reads all skipped rows), and rows inserted in
+the meantime do not shift later pages.
+
+Usage:
+    after = decode_cursor(request.args.get('cursor'))          # None → first page
+    rows  = PotentialOrder.find_by_filters(..., after=after, limit=limit + 1)
+    rows, next_cursor = split_page(rows, limit, 'created_at', 'potential_order_id')
+"""
+
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(ts: datetime, row_id: int) -> str:
+    """Opaque cursor for the row with sort key (ts, row_id)."""
+    raw = json.dumps([ts.isoformat(), row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(ts, row_id) from a cursor made by encode_cursor, or None if empty. ValueError if malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        ts, row_id = json.loads(raw)
+        return datetime.fromisoformat(ts), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def keyset_condition(ts_col: str, id_col: str, after) -> tuple:
+    """
+    SQL condition (and params) selecting rows after `after` in
+    (ts_col DESC, id_col DESC) order. Written out instead of a row
+    comparison so MySQL can use the index range.
+    """
+    ts, row_id = after
+    return f"({ts_col} < %s OR ({ts_col} = %s AND {id_col} < %s))", (ts, ts, row_id)
+
+
+def split_page(rows: list, limit: int, ts_key: str, id_key: str) -> tuple:
+    """
+    rows were fetched with LIMIT limit + 1. Returns (page rows, next_cursor),
+    next_cursor None on the last page.
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    if last[ts_key] is None:
+        return rows, None
+    return rows, encode_cursor(last[ts_key], last[id_key])
@@ -9,10 +9,13 @@ To add support for a new upload type:
 """
 
 import base64
+import codecs
 import csv
 import logging
 import os
 import uuid
+from datetime import datetime
+from decimal import Decimal
 from io import BytesIO
 
 import chardet
@@ -26,10 +29,17 @@ logger = logging.getLogger(__name__)
 # File-reading helpers (shared by order and invoice upload services)
 # ---------------------------------------------------------------------------
 
+UPLOAD_READ_CHUNK_ROWS = 5000          # rows per DataFrame when streaming a file
+ENCODING_SAMPLE_BYTES = 64 * 1024      # prefix handed to chardet
+
+
 def read_upload_file(temp_path, file_extension):
     """
     Parse an uploaded file into a DataFrame regardless of encoding/format.
 
+    Whole-file convenience wrapper over iter_upload_file(); pipelines that can
+    work in batches should iterate that instead.
+
     Args:
         temp_path: path to the saved temp file
         file_extension: '.csv', '.xls', or '.xlsx'
@@ -40,50 +50,180 @@ def read_upload_file(temp_path, file_extension):
     Raises:
         Exception on unrecoverable parse failure
     """
-    if file_extension in ('.xls', '.xlsx'):
-        try:
-            return pd.read_excel(temp_path, dtype=str)
-        except Exception as e:
-            raise Exception(f"Failed to parse Excel file: {str(e)}")
+    frames = list(iter_upload_file(temp_path, file_extension))
+    if not frames:
+        return pd.DataFrame(columns=[], dtype=str)
+    if len(frames) == 1:
+        return frames[0]
+    return pd.concat(frames, ignore_index=True)
 
-    if file_extension == '.csv':
-        with open(temp_path, 'rb') as f:
-            encoding = chardet.detect(f.read())['encoding'] or 'utf-8'
-        return _read_csv(temp_path, encoding)
 
-    raise Exception("Unsupported file format. Please upload a CSV or Excel file.")
+def iter_upload_file(temp_path, file_extension, chunk_rows=UPLOAD_READ_CHUNK_ROWS):
+    """
+    Stream an uploaded file as DataFrames of at most `chunk_rows` rows
+    (all cells as strings, like pd.read_*(dtype=str)).
 
+    Memory stays bounded by the chunk size, not the file size:
+      • CSV  — encoding sniffed from a bounded prefix, then the C parser
+               with `chunksize` (python-engine strategies only as fallback)
+      • XLSX — openpyxl read-only mode, rows pulled lazily from the sheet
+      • XLS  — xlrd has no streaming mode; the sheet is read once and sliced
+
+    Raises:
+        Exception on unrecoverable parse failure (on first iteration)
+    """
+    if file_extension == '.xlsx':
+        return _iter_xlsx(temp_path, chunk_rows)
+    if file_extension == '.xls':
+        return _iter_xls(temp_path, chunk_rows)
+    if file_extension == '.csv':
+        return _iter_csv(temp_path, detect_encoding(temp_path), chunk_rows)
+    raise Exception("Unsupported file format. Please upload a CSV or Excel file.")
 
-def _read_csv(temp_path, encoding):
-    """Try progressively looser strategies to parse a CSV file."""
-    if encoding and 'utf-16' in encoding.lower():
-        try:
-            return pd.read_csv(temp_path, encoding='utf-16', sep='\t',
-                               engine='python', dtype=str, index_col=False,
-                               on_bad_lines='warn')
-        except Exception:
-            pass
 
+def estimate_row_count(temp_path, file_extension):
+    """
+    Cheap data-row estimate for progress reporting, without parsing cells:
+    newline count for CSV, the sheet's declared dimensions for XLSX.
+    None when unknown (.xls, or a sheet without dimensions).
+    """
     try:
-        return pd.read_csv(temp_path, encoding=encoding, sep=',',
-                           quotechar='"', doublequote=True, escapechar='\\',
-                           engine='python', quoting=csv.QUOTE_MINIMAL,
-                           on_bad_lines='warn', dtype=str)
+        if file_extension == '.csv':
+            lines = 0
+            with open(temp_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    lines += block.count(b'\n')
+            return max(lines - 1, 0)
+        if file_extension == '.xlsx':
+            from openpyxl import load_workbook
+            workbook = load_workbook(temp_path, read_only=True)
+            try:
+                max_row = workbook.worksheets[0].max_row
+            finally:
+                workbook.close()
+            return max(max_row - 1, 0) if max_row else None
     except Exception:
-        pass
+        logger.warning("Could not estimate row count", exc_info=True)
+    return None
+
+
+def detect_encoding(temp_path, sample_bytes=ENCODING_SAMPLE_BYTES):
+    """Guess a file's encoding from its BOM, else from chardet on a bounded prefix."""
+    with open(temp_path, 'rb') as f:
+        sample = f.read(sample_bytes)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    encoding = chardet.detect(sample)['encoding'] or 'utf-8'
+    # A pure-ASCII prefix says nothing about the rest of the file; UTF-8 is
+    # the superset that still decodes it.
+    return 'utf-8' if encoding.lower() == 'ascii' else encoding
+
+
+def _csv_strategies(encoding):
+    """Progressively looser read_csv options, C parser first."""
+    strategies = []
+    if encoding and 'utf-16' in encoding.lower():
+        strategies.append(dict(encoding='utf-16', sep='\t', engine='c',
+                               index_col=False, on_bad_lines='warn'))
+    strict = dict(encoding=encoding, sep=',', quotechar='"', doublequote=True,
+                  escapechar='\\', quoting=csv.QUOTE_MINIMAL, on_bad_lines='warn')
+    strategies += [
+        dict(strict, engine='c'),
+        dict(strict, engine='python'),
+        dict(encoding='utf-16', sep=None, engine='python', index_col=False, on_bad_lines='skip'),
+        dict(encoding='cp1252', sep=None, engine='python', on_bad_lines='skip'),
+    ]
+    return strategies
+
 
+def _iter_csv(temp_path, encoding, chunk_rows):
+    """
+    Yield CSV chunks using the first strategy that can read the opening chunk.
+    Once a strategy is chosen the rest of the file is read with it.
+    """
+    last_error = None
+    for options in _csv_strategies(encoding):
+        try:
+            reader = pd.read_csv(temp_path, dtype=str, chunksize=chunk_rows, **options)
+        except Exception as e:
+            last_error = e
+            continue
+        with reader:
+            try:
+                first = next(reader, None)
+            except Exception as e:
+                last_error = e
+                continue
+            if first is not None:
+                yield first
+            yield from reader
+        return
+    raise Exception(f"All CSV parsing strategies failed: {str(last_error)}")
+
+
+def _iter_xls(temp_path, chunk_rows):
     try:
-        return pd.read_csv(temp_path, encoding='utf-16', sep=None,
-                           engine='python', dtype=str, index_col=False,
-                           on_bad_lines='skip')
-    except Exception:
-        pass
+        df = pd.read_excel(temp_path, dtype=str)
+    except Exception as e:
+        raise Exception(f"Failed to parse Excel file: {str(e)}")
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _iter_xlsx(temp_path, chunk_rows):
+    """Stream the first worksheet with openpyxl's read-only mode."""
+    from openpyxl import load_workbook
 
     try:
-        return pd.read_csv(temp_path, encoding='cp1252', sep=None,
-                           engine='python', dtype=str, on_bad_lines='skip')
+        workbook = load_workbook(temp_path, read_only=True, data_only=True)
     except Exception as e:
-        raise Exception(f"All CSV parsing strategies failed: {str(e)}")
+        raise Exception(f"Failed to parse Excel file: {str(e)}")
+
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next((r for r in rows if any(v is not None for v in r)), None)
+        if header is None:
+            return
+        columns = _excel_header(header)
+        width = len(columns)
+
+        batch = []
+        for values in rows:
+            cells = [_excel_cell_text(v) for v in values[:width]]
+            cells.extend([None] * (width - len(cells)))
+            batch.append(cells)
+            if len(batch) >= chunk_rows:
+                yield pd.DataFrame(batch, columns=columns, dtype=object)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns, dtype=object)
+    finally:
+        workbook.close()
+
+
+def _excel_header(values):
+    """Header names as pandas would build them: 'Unnamed: n' for blanks, '.n' for repeats."""
+    columns, seen = [], {}
+    for position, value in enumerate(values):
+        name = f'Unnamed: {position}' if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def _excel_cell_text(value):
+    """One cell as read_excel(dtype=str) would give it (whole floats lose '.0')."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
 
 
 def resolve_required_columns(df, required_columns):
@@ -128,6 +268,185 @@ def resolve_required_columns(df, required_columns):
     return df, None
 
 
+# ---------------------------------------------------------------------------
+# Column normalisation (vectorised — business code uses these instead of
+# df.iterrows() + str(row.get(...) or '').strip() per cell)
+# ---------------------------------------------------------------------------
+
+_NULL_TOKENS = ('', 'nan', 'none', 'null', 'nat')
+
+
+def _clean_text(df, column):
+    """Stripped string Series with NaN / 'nan' / 'none' / 'null' collapsed to ''."""
+    values = df[column]
+    values = values.where(values.notna(), '').astype(str).str.strip()
+    return values.mask(values.str.lower().isin(_NULL_TOKENS), '')
+
+
+def text_column(df, column, default=None):
+    """
+    Normalise one text column.
+
+    Returns:
+        list aligned with df rows — stripped strings, `default` for blanks.
+    """
+    if column not in df.columns:
+        return [default] * len(df)
+    return [v or default for v in _clean_text(df, column).tolist()]
+
+
+def decimal_column(df, column):
+    """
+    Normalise one amount column: thousands separators removed, validated
+    with pd.to_numeric, converted to Decimal (from the string, so no float
+    rounding). Unparseable or blank cells → None.
+    """
+    if column not in df.columns:
+        return [None] * len(df)
+    cleaned = _clean_text(df, column).str.replace(',', '', regex=False)
+    numeric = pd.to_numeric(cleaned, errors='coerce')
+    valid = numeric.notna() & (numeric.abs() != float('inf'))
+    return [Decimal(v) if ok else None for v, ok in zip(cleaned.tolist(), valid.tolist())]
+
+
+def integer_column(df, column):
+    """
+    Normalise one count column: int(float(value)) semantics, done once per
+    column. Unparseable or blank cells → None.
+    """
+    if column not in df.columns:
+        return [None] * len(df)
+    numeric = pd.to_numeric(_clean_text(df, column), errors='coerce')
+    valid = numeric.notna() & (numeric.abs() != float('inf'))
+    return [int(v) if ok else None for v, ok in zip(numeric.tolist(), valid.tolist())]
+
+
+DATE_FORMAT_SAMPLE_SIZE = 200   # distinct values examined to pick a column's format
+
+
+def date_column(df, column, formats, report=None):
+    """
+    Normalise one date column.
+
+      1. Each distinct raw string is parsed only once — exports repeat the
+         same few dates thousands of times.
+      2. The column's format is inferred once: whichever entry in `formats`
+         parses the most of a sample of distinct values wins (ties go to the
+         earlier entry, so list the preferred day/month order first).
+      3. All distinct values are parsed in one vectorised
+         pd.to_datetime(format=...) call.
+      4. Only the values that failed fall back to per-value parsing (the
+         other formats, then pandas' own parser).
+
+    Excel-native datetimes pass through. Unparseable or blank cells → None.
+
+    If `report` is a dict, report[column] is set to
+    {'format', 'parsed', 'fallback', 'native', 'failed'} — counts of cells.
+    """
+    if column not in df.columns:
+        return [None] * len(df)
+
+    raw_values = df[column].tolist()
+    stripped = {}   # raw string → stripped text (non-blank only)
+    for raw in raw_values:
+        if isinstance(raw, str) and raw not in stripped:
+            text = raw.strip()
+            if text.lower() not in _NULL_TOKENS:
+                stripped[raw] = text
+    distinct = list(dict.fromkeys(stripped.values()))
+
+    fmt = _infer_date_format(distinct[:DATE_FORMAT_SAMPLE_SIZE], formats)
+    parsed = {}
+    if fmt and distinct:
+        converted = pd.to_datetime(pd.Series(distinct, dtype=object), format=fmt, errors='coerce')
+        for text, value in zip(distinct, converted.tolist()):
+            if not pd.isna(value):
+                parsed[text] = value.to_pydatetime()
+
+    other_formats = [f for f in formats if f != fmt]
+    fallback = {text: _parse_date_text(text, other_formats)
+                for text in distinct if text not in parsed}
+
+    stats = {'format': fmt, 'parsed': 0, 'fallback': 0, 'native': 0, 'failed': 0}
+    result = []
+    for raw in raw_values:
+        text = stripped.get(raw) if isinstance(raw, str) else None
+        if text is not None:
+            if text in parsed:
+                stats['parsed'] += 1
+                result.append(parsed[text])
+            elif fallback[text] is not None:
+                stats['fallback'] += 1
+                result.append(fallback[text])
+            else:
+                stats['failed'] += 1
+                result.append(None)
+        elif hasattr(raw, 'year') and not pd.isna(raw):
+            stats['native'] += 1
+            result.append(raw.to_pydatetime() if hasattr(raw, 'to_pydatetime') else raw)
+        else:
+            result.append(None)
+
+    if report is not None:
+        report[column] = stats
+    return result
+
+
+def _infer_date_format(sample, formats):
+    """Return the format in `formats` that parses the most sample values, or None."""
+    best, best_hits = None, 0
+    for fmt in formats:
+        hits = 0
+        for text in sample:
+            try:
+                datetime.strptime(text, fmt)
+                hits += 1
+            except ValueError:
+                pass
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+    return best
+
+
+def _parse_date_text(value, formats):
+    """Per-value fallback: try each format, then pandas' parser. None on failure."""
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    parsed = pd.to_datetime(value, errors='coerce')
+    return None if pd.isna(parsed) else parsed.to_pydatetime()
+
+
+def normalise_columns(df, text=(), decimal=(), integer=(), dates=None, date_report=None):
+    """
+    Columnar normalisation stage for upload DataFrames.
+
+    Args:
+        df:      DataFrame straight from read_upload_file / resolve_required_columns
+        text:    column names to strip and null-normalise
+        decimal: column names to parse as Decimal
+        integer: column names to parse as int
+        dates:   dict mapping column name → list of strptime formats to try
+        date_report: optional dict filled with date_column()'s per-column report
+
+    Returns:
+        dict mapping column name → plain list of values aligned with df rows
+        (missing columns yield all-None lists).
+    """
+    columns = {}
+    for column in text:
+        columns[column] = text_column(df, column)
+    for column in decimal:
+        columns[column] = decimal_column(df, column)
+    for column in integer:
+        columns[column] = integer_column(df, column)
+    for column, formats in (dates or {}).items():
+        columns[column] = date_column(df, column, formats, report=date_report)
+    return columns
+
+
 def save_temp_file(uploaded_file, base_dir):
     """
     Save an uploaded file to a tmp sub-directory.
@@ -153,14 +472,16 @@ def cleanup_temp_file(temp_path):
             pass
 
 
-def create_upload_batch(mysql_manager, upload_type, filename, warehouse_id, company_id, user_id):
+def create_upload_batch(mysql_manager, upload_type, filename, warehouse_id, company_id, user_id,
+                        status='active', chunk_rows=None):
     """Insert an upload_batches row and return its id (or None on failure)."""
     try:
         with mysql_manager.get_cursor() as cursor:
             cursor.execute(
-                """INSERT INTO upload_batches (upload_type, filename, warehouse_id, company_id, uploaded_by)
-                   VALUES (%s, %s, %s, %s, %s)""",
-                (upload_type, filename, warehouse_id, company_id, user_id)
+                """INSERT INTO upload_batches
+                       (upload_type, filename, warehouse_id, company_id, uploaded_by, status, chunk_rows)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                (upload_type, filename, warehouse_id, company_id, user_id, status, chunk_rows)
             )
             return cursor.lastrowid
     except Exception as e:
@@ -9,3 +9,10 @@ accesslog = '-'
 loglevel = 'warning'        # was 'debug' — saves significant I/O and memory
 capture_output = True
 enable_stdio_inheritance = True
+
+
+def post_fork(server, worker):
+    # The upload job worker thread must start in each forked worker, not the
+    # preloading master; starting at boot also recovers jobs orphaned by a recycle.
+    from api.services.upload_jobs import upload_job_queue
+    upload_job_queue.start()
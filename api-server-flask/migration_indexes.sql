@@ -20,6 +20,10 @@ ALTER TABLE potential_order
 ALTER TABLE potential_order
     ADD INDEX IF NOT EXISTS idx_po_created_at (created_at DESC);
 
+-- Recent activity, keyset-paged (ORDER BY updated_at DESC, potential_order_id DESC)
+ALTER TABLE potential_order
+    ADD INDEX IF NOT EXISTS idx_po_updated_at (updated_at);
+
 -- Company-filtered queries
 ALTER TABLE potential_order
     ADD INDEX IF NOT EXISTS idx_po_company_status (company_id, status);
@@ -0,0 +1,40 @@
+-- Migration: hashed JWT blocklist
+-- jwt_token_blocklist stops storing raw tokens: each row holds the token's
+-- SHA-256 digest (unique index — one index probe per lookup) and its expiry,
+-- and rows are deleted once the token has expired (core.auth.prune_revoked_tokens).
+--
+-- create_all_tables() applies the same change idempotently on startup
+-- (_migrate_jwt_blocklist_table); run this by hand only on databases that
+-- are not started through the application.
+
+-- A unique index on a partitioned table must include the partition column;
+-- expiry pruning keeps the table small, so it is no longer partitioned.
+-- (Skip this statement if the table was never partitioned.)
+ALTER TABLE jwt_token_blocklist REMOVE PARTITIONING;
+
+ALTER TABLE jwt_token_blocklist
+    ADD COLUMN token_hash CHAR(64) CHARACTER SET ascii NULL AFTER id,
+    ADD COLUMN expires_at DATETIME NULL AFTER token_hash,
+    MODIFY jwt_token TEXT NULL;
+
+-- Backfill. Login issues 8-hour tokens (TOKEN_LIFETIME in api/core/auth.py;
+-- keep the interval below in step with it) and a token is revoked after it
+-- was issued, so created_at + 8 h is never earlier than the token's real exp.
+UPDATE jwt_token_blocklist
+SET token_hash = SHA2(jwt_token, 256),
+    expires_at = created_at + INTERVAL 8 HOUR
+WHERE token_hash IS NULL;
+
+-- The same token revoked twice: keep the first row.
+DELETE dup FROM jwt_token_blocklist dup
+JOIN jwt_token_blocklist keep
+  ON keep.token_hash = dup.token_hash AND keep.id < dup.id;
+
+ALTER TABLE jwt_token_blocklist
+    DROP PRIMARY KEY,
+    ADD  PRIMARY KEY (id),
+    MODIFY token_hash CHAR(64) CHARACTER SET ascii NOT NULL,
+    MODIFY expires_at DATETIME NOT NULL,
+    ADD UNIQUE INDEX uq_jwt_token_hash (token_hash),
+    ADD INDEX idx_jwt_token_expires (expires_at),
+    DROP COLUMN jwt_token;
@@ -284,23 +284,10 @@ ALTER TABLE upload_batches
     );
 
 -- ══════════════════════════════════════════════════════════════════════════════
--- 10. jwt_token_blocklist
+-- 10. jwt_token_blocklist — no longer partitioned
 -- ══════════════════════════════════════════════════════════════════════════════
-
-ALTER TABLE jwt_token_blocklist
-    DROP PRIMARY KEY,
-    ADD  PRIMARY KEY (id, created_at);
-
-ALTER TABLE jwt_token_blocklist
-    PARTITION BY RANGE COLUMNS (created_at) (
-        PARTITION p_archive  VALUES LESS THAN ('2025-12-01'),
-        PARTITION p_2025_12  VALUES LESS THAN ('2026-01-01'),
-        PARTITION p_2026_01  VALUES LESS THAN ('2026-02-01'),
-        PARTITION p_2026_02  VALUES LESS THAN ('2026-03-01'),
-        PARTITION p_2026_03  VALUES LESS THAN ('2026-04-01'),
-        PARTITION p_2026_04  VALUES LESS THAN ('2026-05-01'),
-        PARTITION p_future   VALUES LESS THAN (MAXVALUE)
-    );
+-- The blocklist holds token hashes under a unique index and is pruned by
+-- expiry instead; see migration_jwt_blocklist_hash.sql.
 
 -- ─────────────────────────────────────────────────────────────────────────────
 -- Cleanup
@@ -325,7 +312,7 @@ WHERE TABLE_SCHEMA = DATABASE()
   AND TABLE_NAME IN (
       'potential_order','potential_order_product','order',
       'order_state_history','order_box','order_product',
-      'box_product','invoice','upload_batches','jwt_token_blocklist'
+      'box_product','invoice','upload_batches'
   )
   AND PARTITION_NAME IS NOT NULL
 ORDER BY TABLE_NAME, PARTITION_ORDINAL_POSITION;
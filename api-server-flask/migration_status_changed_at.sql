@@ -0,0 +1,21 @@
+-- Migration: potential_order.status_changed_at
+-- When the order entered its current status. The order list shows
+-- "time in current state" from this column instead of reading every order's
+-- order_state_history; each write that changes potential_order.status sets it.
+--
+-- create_all_tables() applies the same change on startup
+-- (_migrate_potential_order_table); run this by hand only on databases that
+-- are not started through the application.
+
+ALTER TABLE potential_order
+    ADD COLUMN status_changed_at DATETIME NULL AFTER updated_at;
+
+-- Backfill from the last state change, else updated_at / created_at.
+-- updated_at = updated_at stops ON UPDATE CURRENT_TIMESTAMP from bumping it.
+UPDATE potential_order po
+LEFT JOIN (SELECT potential_order_id, MAX(changed_at) AS changed_at
+           FROM order_state_history GROUP BY potential_order_id) h
+  ON h.potential_order_id = po.potential_order_id
+SET po.status_changed_at = COALESCE(h.changed_at, po.updated_at, po.created_at),
+    po.updated_at = po.updated_at
+WHERE po.status_changed_at IS NULL;
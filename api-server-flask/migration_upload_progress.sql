@@ -0,0 +1,16 @@
+-- Migration: resumable upload progress
+-- Adds per-chunk progress to upload_batches so a chunked upload that dies
+-- mid-file (worker timeout, crash) can be resumed from its last committed chunk.
+--
+-- create_all_tables() applies the same change idempotently on startup
+-- (_migrate_upload_batches_table); run this by hand only on databases that
+-- are not started through the application.
+
+ALTER TABLE upload_batches
+    ADD COLUMN rows_done   INT DEFAULT 0   AFTER status,
+    ADD COLUMN error_count INT DEFAULT 0   AFTER rows_done,
+    ADD COLUMN last_chunk  INT DEFAULT 0   AFTER error_count,
+    ADD COLUMN chunk_rows  INT NULL        AFTER last_chunk;
+
+-- status gains one value: 'processing' — a resumable upload that has not
+-- finished yet (last_chunk chunks of chunk_rows rows are committed).
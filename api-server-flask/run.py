@@ -3,6 +3,8 @@
 Copyright (c) 2019 - present AppSeed.us
 """
 
+import os
+
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -19,4 +21,8 @@ def make_shell_context():
     }
 
 if __name__ == '__main__':
+    # The reloader runs the app in a child process; start the upload worker there only.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from api.services.upload_jobs import upload_job_queue
+        upload_job_queue.start()
     app.run(debug=True, host="0.0.0.0")
@@ -0,0 +1,184 @@
+# -*- encoding: utf-8 -*-
+"""
+Shared fixtures for the unit tests.
+
+These tests never touch MySQL: MySQLManager runs against FakeConnection
+objects, and repositories get a recording fake in place of the manager.
+Run them from api-server-flask with:  python -m pytest unit_tests
+"""
+
+import os
+import sys
+
+import pytest
+
+# Importing api.* builds the mysql_manager singleton — it must not open connections
+os.environ.setdefault('DB_POOL_SIZE', '0')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import db_manager  # noqa: E402
+from api.config import BaseConfig  # noqa: E402
+
+
+class FakeCursor:
+    """
+    DictCursor stand-in: records statements on its connection and asks the
+    connection's responder for the result. A responder returns the rows
+    (list), the rowcount (int), a dict of rows / rowcount / lastrowid, or
+    None for no rows.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 1
+        self.lastrowid = None
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self.connection.statements.append(query)
+        self.connection.executed.append((query, params))
+        self._apply(self.connection.respond(query, params))
+        return self.rowcount
+
+    def executemany(self, query, params_list):
+        params_list = list(params_list)
+        self.connection.statements.append(query)
+        self.connection.executed.append((query, params_list))
+        total = 0
+        for params in params_list:
+            self._apply(self.connection.respond(query, params))
+            total += self.rowcount
+        self.rowcount = total
+        return total
+
+    def _apply(self, result):
+        self._rows = []
+        self.rowcount = 1
+        if isinstance(result, list):
+            self._rows = result
+            self.rowcount = len(result)
+        elif isinstance(result, int):
+            self.rowcount = result
+        elif isinstance(result, dict):
+            self._rows = result.get('rows', [])
+            self.rowcount = result.get('rowcount', len(self._rows) or 1)
+            self.lastrowid = result.get('lastrowid', self.lastrowid)
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FakeConnection:
+    """
+    PyMySQL connection stand-in: counts commits / rollbacks. Statements go
+    to `respond`; commits and rollbacks are reported to it as 'COMMIT' /
+    'ROLLBACK' so a fake table can keep transactional state.
+    """
+
+    def __init__(self, respond=None):
+        self.statements = []
+        self.executed = []      # (query, params) pairs
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+        self._respond = respond
+
+    def respond(self, query, params):
+        return self._respond(query, params) if self._respond else None
+
+    def cursor(self, *_cursor_class):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+        self.respond('COMMIT', None)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.respond('ROLLBACK', None)
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDB:
+    """
+    Stands in for MySQL behind the mysql_manager singleton the repositories
+    use. `handler(query, params)` answers each statement (see FakeCursor);
+    `on(fragment, result)` is the shorthand for answering every statement
+    that contains fragment (whitespace collapsed, as in find).
+    """
+
+    def __init__(self):
+        self.connections = []
+        self.handler = None
+        self._answers = []
+
+    def on(self, fragment, result):
+        """Answer statements containing fragment with result (or result(query, params))."""
+        self._answers.append((fragment, result))
+
+    def respond(self, query, params):
+        flat = ' '.join(query.split())
+        for fragment, result in self._answers:
+            if fragment in flat:
+                return result(query, params) if callable(result) else result
+        return self.handler(query, params) if self.handler else None
+
+    def connect(self):
+        self.connections.append(FakeConnection(self.respond))
+        return self.connections[-1]
+
+    @property
+    def executed(self):
+        """Every (query, params) run, in order."""
+        return [entry for conn in self.connections for entry in conn.executed]
+
+    def find(self, fragment):
+        """The (query, params) pairs whose query contains fragment."""
+        return [(q, p) for q, p in self.executed if fragment in ' '.join(q.split())]
+
+
+@pytest.fixture
+def fake_manager(monkeypatch):
+    """A MySQLManager (pool 1 + overflow 1, 0.05 s timeout) whose connections are FakeConnections."""
+    monkeypatch.setattr(BaseConfig, 'DB_POOL_SIZE', 1)
+    monkeypatch.setattr(BaseConfig, 'DB_MAX_OVERFLOW', 1)
+    monkeypatch.setattr(BaseConfig, 'DB_POOL_TIMEOUT', 0.05)
+    connections = []
+
+    def connect(**_config):
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(db_manager.pymysql, 'connect', connect)
+    manager = db_manager.MySQLManager()
+    manager.connections = connections
+    return manager
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """The mysql_manager singleton, its connections handed out by a FakeDB."""
+    db = FakeDB()
+    manager = db_manager.mysql_manager
+    monkeypatch.setattr(manager, '_checkout', db.connect)
+    monkeypatch.setattr(manager, '_checkin', lambda conn, discard=False: None)
+    yield db
+    assert not manager.in_unit_of_work(), "test left a unit of work open"
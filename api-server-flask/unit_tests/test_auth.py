@@ -0,0 +1,183 @@
+# -*- encoding: utf-8 -*-
+"""
+Authentication state (api/core/auth.py and the Users model), against a FakeDB.
+"""
+
+import hashlib
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.core import auth
+from api.core.auth import RevokedTokens, prune_revoked_tokens, token_hash
+from api.db_manager import _migrate_jwt_blocklist_table, mysql_manager
+from api.models import Users
+
+USER_ROW = {'id': 4, 'username': 'ana', 'email': 'ana@example.com', 'password': 'hash',
+            'jwt_auth_active': 1, 'status': 'active', 'role': 'manager'}
+
+
+def test_users_save_unchanged_keeps_cache(fake_db):
+    """A repeat login (jwt_auth_active already set) writes the row but bumps no cache version"""
+    user = Users(**USER_ROW)
+    user.set_jwt_auth_active(True)
+
+    user.save()
+
+    assert len(fake_db.find("UPDATE users SET")) == 1
+    assert fake_db.find("cache_versions") == []
+
+
+def test_users_save_changed_invalidates_once(fake_db):
+    """Changing a cached column (logout, role) bumps the auth_users version once per change"""
+    user = Users(**USER_ROW)
+
+    user.set_jwt_auth_active(False)
+    user.save()
+    user.save()                     # nothing changed since the last save
+    user.role = 'viewer'
+    user.save()
+
+    bumps = fake_db.find("INSERT INTO cache_versions")
+    assert [params for _, params in bumps] == [('auth_users',), ('auth_users',)]
+
+
+def test_users_insert_does_not_invalidate(fake_db):
+    """A new user cannot be cached yet"""
+    fake_db.on("INSERT INTO users", {'lastrowid': 12})
+    user = Users(username='new', email='new@example.com', password='hash')
+
+    user.save()
+
+    assert user.id == 12
+    assert fake_db.find("cache_versions") == []
+
+
+def test_token_hash_is_sha256_hex():
+    """Revoked tokens are stored and compared as the SHA-256 hex digest of the raw JWT"""
+    assert token_hash('a.b.c') == hashlib.sha256(b'a.b.c').hexdigest()
+    assert len(token_hash('a.b.c')) == 64
+    assert token_hash('a.b.c') != token_hash('a.b.d')
+
+
+def test_prune_deletes_in_batches_and_commits_on_its_own(fake_db):
+    """
+       prune_revoked_tokens deletes until a batch comes back short, on a
+       detached connection: the caller's rollback does not undo it
+    """
+    counts = iter([5000, 12])
+    fake_db.on("DELETE FROM jwt_token_blocklist", lambda q, p: next(counts))
+    commits = []
+    fake_db.on("COMMIT", lambda q, p: commits.append(q))
+
+    with pytest.raises(RuntimeError):
+        with mysql_manager.unit_of_work():
+            mysql_manager.execute_query("SELECT 1")
+            assert prune_revoked_tokens() == 5012
+            raise RuntimeError("request failed")
+
+    outer, *detached = fake_db.connections
+    assert [q for q, _ in outer.executed] == ["SELECT 1"]
+    assert [p[1] for conn in detached for _, p in conn.executed] == [5000, 5000]
+    assert commits == ['COMMIT', 'COMMIT']      # each DELETE; the request rolled back
+
+
+def test_blocklist_migration_backfills_expiry_from_token_lifetime(fake_db, monkeypatch):
+    """Rows of an old raw-token table get expires_at = created_at + TOKEN_LIFETIME"""
+    monkeypatch.setattr(auth, 'TOKEN_LIFETIME', timedelta(hours=2))
+    fake_db.on("information_schema.COLUMNS", [{'COLUMN_NAME': 'id'}, {'COLUMN_NAME': 'jwt_token'}])
+    fake_db.on("information_schema.PARTITIONS", [{'n': 0}])
+
+    _migrate_jwt_blocklist_table()
+
+    [(query, _)] = fake_db.find("UPDATE jwt_token_blocklist")
+    assert "expires_at = created_at + INTERVAL 7200 SECOND" in ' '.join(query.split())
+
+
+class BlocklistTable:
+    """jwt_token_blocklist rows (token_hash, expires_at, created_at) answering the refresh's reads."""
+
+    def __init__(self):
+        self.rows = []
+        self.reads = []
+
+    def revoke(self, token, expires_at, created_at):
+        self.rows.append({'token_hash': token_hash(token), 'expires_at': expires_at,
+                          'created_at': created_at})
+
+    def respond(self, query, params):
+        if 'FROM jwt_token_blocklist' not in query:
+            return None
+        since, now = params if 'created_at >=' in query else (None, params[0])
+        self.reads.append(since)
+        return [r for r in self.rows
+                if (since is None or r['created_at'] >= since) and r['expires_at'] > now]
+
+
+@pytest.fixture
+def blocklist(fake_db):
+    table = BlocklistTable()
+    fake_db.handler = table.respond
+    return table
+
+
+def _force_refresh(revoked):
+    revoked._refreshed_at -= RevokedTokens.REFRESH_SECONDS
+
+
+def test_revoked_tokens_refresh_reads_new_rows_only(blocklist):
+    """
+       The first refresh reads every unexpired row, later ones only rows
+       created since the previous refresh less REFRESH_OVERLAP; checks within
+       REFRESH_SECONDS read nothing
+    """
+    now = datetime.utcnow()
+    blocklist.revoke('old', now + timedelta(hours=1), now - timedelta(hours=1))
+    blocklist.revoke('gone', now - timedelta(minutes=1), now - timedelta(hours=9))
+    revoked = RevokedTokens()
+
+    assert revoked.is_revoked('old')
+    assert not revoked.is_revoked('gone')
+    assert blocklist.reads == [None]
+
+    blocklist.revoke('new', now + timedelta(hours=8), datetime.utcnow())
+    assert not revoked.is_revoked('new')        # not refreshed yet
+    _force_refresh(revoked)
+
+    assert revoked.is_revoked('new')
+    assert revoked.is_revoked('old')            # kept from the first read
+    assert len(blocklist.reads) == 2
+    assert now - RevokedTokens.REFRESH_OVERLAP - blocklist.reads[1] < timedelta(seconds=1)
+
+
+def test_revoked_tokens_drop_expired_hashes(blocklist):
+    """A hash whose token has expired is dropped at the next refresh"""
+    revoked = RevokedTokens()
+    revoked.add(token_hash('short'), datetime.utcnow() + timedelta(milliseconds=10))
+    assert revoked.is_revoked('short')
+
+    time.sleep(0.02)
+    _force_refresh(revoked)
+
+    assert not revoked.is_revoked('short')
+
+
+def test_revoked_tokens_refresh_prunes_hourly(blocklist, monkeypatch):
+    """Every PRUNE_SECONDS a refresh also prunes; a failed prune does not break the check"""
+    prunes = []
+
+    def prune():
+        prunes.append(1)
+        raise RuntimeError("lock wait timeout")
+    monkeypatch.setattr(auth, 'prune_revoked_tokens', prune)
+    revoked = RevokedTokens()
+
+    assert not revoked.is_revoked('t')
+    assert prunes == []
+
+    revoked._pruned_at -= RevokedTokens.PRUNE_SECONDS
+    _force_refresh(revoked)
+
+    assert not revoked.is_revoked('t')
+    assert prunes == [1]
@@ -0,0 +1,81 @@
+# -*- encoding: utf-8 -*-
+"""
+BaseRepository helpers, against a fake manager that records its statements.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+
+from api.config import BaseConfig
+from api.repositories import base_repository
+
+
+class FakeRepositoryDB:
+    """Stands in for mysql_manager: records (query, params), answers information_schema."""
+
+    def __init__(self, column_rows=()):
+        self.column_rows = list(column_rows)
+        self.statements = []
+
+    def execute_query(self, query, params=None, fetch=True):
+        self.statements.append((query, params))
+        if 'information_schema.COLUMNS' in query:
+            return self.column_rows
+        return [] if fetch else 0
+
+    def execute_many(self, query, params_list):
+        self.statements.append((query, list(params_list)))
+
+    @contextmanager
+    def unit_of_work(self):
+        yield
+
+
+@pytest.fixture
+def repo_db():
+    db = FakeRepositoryDB()
+    repo = base_repository.BaseRepository()
+    repo._db = db
+    return repo, db
+
+
+def test_query_in_temp_table_matches_source_column(repo_db, monkeypatch):
+    """
+       _query_in above the temp-table threshold: the id column copies the
+       source column's type/collation and has no unique key, so ids equal
+       under the collation (or longer than 255 chars) load without error
+    """
+    monkeypatch.setattr(BaseConfig, 'IN_LIST_TEMP_TABLE_THRESHOLD', 2)
+    monkeypatch.setattr(base_repository, '_source_column_defs', {})
+    repo, db = repo_db
+    db.column_rows = [{'column_type': 'varchar(500)', 'charset': 'utf8mb4',
+                       'collation': 'utf8mb4_unicode_ci'}]
+    ids = ["ABC", "abc", "abc ", "x" * 300, "ABC"]
+
+    repo._query_in("SELECT * FROM dealer WHERE name IN {ids}", ids, source='dealer.name')
+
+    create = next(q for q, _ in db.statements if q.startswith("CREATE TEMPORARY TABLE"))
+    assert "id varchar(500) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci NOT NULL" in create
+    assert "INDEX (id)" in create
+    assert "PRIMARY KEY" not in create
+    inserted = next(p for q, p in db.statements if q.startswith("INSERT INTO _in_ids_"))
+    assert inserted == [("ABC",), ("abc",), ("abc ",), ("x" * 300,)]
+    select = next(q for q, _ in db.statements if q.startswith("SELECT * FROM dealer"))
+    assert "name IN (SELECT id FROM _in_ids_" in select
+    assert db.statements[-1][0].startswith("DROP TEMPORARY TABLE IF EXISTS _in_ids_")
+
+
+def test_query_in_without_source_chunks(repo_db, monkeypatch):
+    """
+       _query_in above the temp-table threshold but without a source column
+       falls back to chunked IN lists
+    """
+    monkeypatch.setattr(BaseConfig, 'IN_LIST_TEMP_TABLE_THRESHOLD', 2)
+    monkeypatch.setattr(BaseConfig, 'IN_LIST_CHUNK_SIZE', 2)
+    repo, db = repo_db
+
+    repo._query_in("SELECT * FROM dealer WHERE name IN {ids}", ["a", "b", "c"])
+
+    assert [p for _, p in db.statements] == [("a", "b"), ("c",)]
+    assert not any(q.startswith("CREATE") for q, _ in db.statements)
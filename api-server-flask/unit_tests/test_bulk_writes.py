@@ -0,0 +1,152 @@
+# -*- encoding: utf-8 -*-
+"""
+Set-based writes: bulk_update_rows (BaseRepository._bulk_update) and the
+MySQLModel bulk classmethods — the SQL and parameters they generate, against
+a FakeDB.
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from api.db_manager import MySQLModel, bulk_update_rows
+from api.models import CustomerRouteMapping
+from api.repositories import invoice_repo, reference_repo
+
+NOW = datetime(2026, 4, 10, 9, 30)
+
+
+def _statements(fake_db, prefix):
+    return [(' '.join(q.split()), list(p)) for q, p in fake_db.find(prefix)]
+
+
+def test_bulk_update_mixes_shared_and_per_row_values(fake_db):
+    """
+       set_values become plain assignments, per_row a CASE per column over the
+       rows that have a value — the others keep theirs through ELSE
+    """
+    changed = bulk_update_rows(
+        't', 'id', [1, 2, 3],
+        set_values={'updated_at': NOW},
+        per_row={'a': {1: 'x', 3: 'z'}, 'b': {2: 5}},
+    )
+
+    [(sql, params)] = _statements(fake_db, "UPDATE t")
+    assert sql == ("UPDATE t SET updated_at = %s, "
+                   "a = CASE id WHEN %s THEN %s WHEN %s THEN %s ELSE a END, "
+                   "b = CASE id WHEN %s THEN %s ELSE b END "
+                   "WHERE id IN (%s, %s, %s)")
+    assert params == [NOW, 1, 'x', 3, 'z', 2, 5, 1, 2, 3]
+    assert changed == 1     # the FakeDB's rowcount
+
+
+def test_bulk_update_splits_at_chunk_boundaries(fake_db):
+    """
+       One statement per chunk of ids; each chunk's CASE lists only its own
+       rows, a column without values in a chunk is left out, and a chunk with
+       nothing to set is not sent
+    """
+    fake_db.on("UPDATE t", 2)     # rows changed per statement
+
+    changed = bulk_update_rows(
+        't', 'id', [1, 2, 3, 4, 5],
+        per_row={'a': {1: 'x', 3: 'z'}, 'b': {2: 7}},
+        chunk_size=2,
+    )
+
+    assert _statements(fake_db, "UPDATE t") == [
+        ("UPDATE t SET a = CASE id WHEN %s THEN %s ELSE a END, "
+         "b = CASE id WHEN %s THEN %s ELSE b END WHERE id IN (%s, %s)", [1, 'x', 2, 7, 1, 2]),
+        ("UPDATE t SET a = CASE id WHEN %s THEN %s ELSE a END WHERE id IN (%s, %s)",
+         [3, 'z', 3, 4]),
+    ]
+    assert changed == 4
+
+
+def test_fill_null_keeps_set_values(fake_db):
+    """fill_null wraps the CASE in COALESCE(col, ...): only NULLs are written"""
+    bulk_update_rows('t', 'id', [1], per_row={'n': {1: 9}}, fill_null=('n',))
+
+    [(sql, _)] = _statements(fake_db, "UPDATE t")
+    assert "n = COALESCE(n, CASE id WHEN %s THEN %s ELSE n END)" in sql
+    assert "NULLIF" not in sql
+
+
+def test_invoice_dealer_backfill_compares_int_column_with_null_only(fake_db):
+    """
+       The invoice upload's dealer_id backfill (an INT column) is fill-null:
+       no NULLIF(dealer_id, ''), which strict mode rejects in an UPDATE
+    """
+    orders = {11: SimpleNamespace(box_count=2), 12: SimpleNamespace(box_count=None)}
+
+    invoice_repo.bulk_transition_to_invoiced(orders, {12: 40}, state_id=5, user_id=9, current_time=NOW)
+
+    [(sql, params)] = _statements(fake_db, "UPDATE potential_order SET")
+    assert ("dealer_id = COALESCE(dealer_id, CASE potential_order_id WHEN %s THEN %s "
+            "ELSE dealer_id END)") in sql
+    assert "NULLIF" not in sql
+    assert params == ['Invoiced', 0, NOW, NOW, 12, 40, 11, 12]
+
+
+def test_dealer_code_backfill_also_fills_empty_strings(fake_db):
+    """bulk_set_dealer_codes fills dealer_code (a string column) where it is NULL or ''"""
+    reference_repo.bulk_set_dealer_codes({3: 'D-3', 4: 'D-4'}, NOW)
+
+    [(sql, params)] = _statements(fake_db, "UPDATE dealer SET")
+    assert sql == ("UPDATE dealer SET updated_at = %s, dealer_code = COALESCE(NULLIF(dealer_code, ''), "
+                   "CASE dealer_id WHEN %s THEN %s WHEN %s THEN %s ELSE dealer_code END) "
+                   "WHERE dealer_id IN (%s, %s)")
+    assert params == [NOW, 3, 'D-3', 4, 'D-4', 3, 4]
+
+
+class Widget(MySQLModel):
+    TABLE = 'widget'
+    PRIMARY_KEY = 'widget_id'
+    COLUMNS = ('name', 'created_at')
+
+
+def test_bulk_insert_assigns_ids_in_order(fake_db):
+    """
+       Each chunk's ids run from its lastrowid by auto_increment_increment
+       and are set on the objects in the order given
+    """
+    first_ids = iter([11, 21])
+    fake_db.on("INSERT INTO widget", lambda q, p: {'lastrowid': next(first_ids)})
+    fake_db.on("@@auto_increment_increment", [{'step': 2}])
+    widgets = [Widget(name=n) for n in 'abc']
+
+    ids = Widget.bulk_insert(widgets, chunk_size=2)
+
+    assert ids == [11, 13, 21]
+    assert [w.widget_id for w in widgets] == ids
+    [(sql, params), _] = _statements(fake_db, "INSERT INTO widget")
+    assert sql == "INSERT INTO widget (name, created_at) VALUES (%s, %s), (%s, %s)"
+    assert params[0::2] == ['a', 'b']
+
+
+def test_bulk_upsert_overwrites_only_upsert_columns(fake_db):
+    """ON DUPLICATE KEY UPDATE lists UPSERT_COLUMNS; dealer_id and created_at keep the stored values"""
+    fake_db.on("INSERT INTO customer_route_mappings", 2)
+    rows = [CustomerRouteMapping(dealer_id=d, route_id=5, distance=1.5) for d in (3, 4)]
+
+    affected = CustomerRouteMapping.bulk_upsert(rows)
+
+    [(sql, params)] = _statements(fake_db, "INSERT INTO customer_route_mappings")
+    assert sql.endswith("ON DUPLICATE KEY UPDATE route_id=VALUES(route_id), "
+                        "distance=VALUES(distance), updated_at=VALUES(updated_at)")
+    assert len(params) == 2 * len(CustomerRouteMapping.COLUMNS)
+    assert affected == 2
+
+
+@pytest.mark.parametrize('call, missing', [
+    (lambda: MySQLModel.bulk_insert([]), "TABLE, PRIMARY_KEY, COLUMNS"),
+    (lambda: Widget.bulk_upsert([Widget(name='a')]), "UPSERT_COLUMNS"),
+    (lambda: MySQLModel.bulk_update([], ['name']), "TABLE, PRIMARY_KEY"),
+])
+def test_bulk_methods_require_metadata(fake_db, call, missing):
+    """A model without the metadata a bulk method needs fails before any SQL is sent"""
+    with pytest.raises(NotImplementedError, match=f"must declare {missing} "):
+        call()
+
+    assert fake_db.executed == []
@@ -0,0 +1,97 @@
+# -*- encoding: utf-8 -*-
+"""
+TTLCache (api/core/cache.py) — cache_versions is a fake, no database.
+"""
+
+import pytest
+
+from api import db_manager
+from api.core import cache as cache_module
+from api.core.cache import TTLCache
+from api.db_manager import mysql_manager
+
+
+@pytest.fixture
+def cache_versions(monkeypatch):
+    """Fake cache_versions table: {name: version}."""
+    class Versions(dict):
+        def execute_query(self, query, params=None, fetch=True):
+            if query.startswith("SELECT version"):
+                return [{'version': self[params[0]]}] if params[0] in self else []
+            self[params[0]] = self.get(params[0], 0) + 1
+            return 1
+
+    versions = Versions()
+    monkeypatch.setattr(db_manager.mysql_manager, 'execute_query', versions.execute_query)
+    return versions
+
+
+def test_ttl_cache_lru_eviction(cache_versions):
+    """
+       TTLCache: beyond maxsize the least recently used entry is evicted
+    """
+    cache = TTLCache('test_lru', maxsize=2, ttl_seconds=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1      # 'b' is now least recently used
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_ttl_cache_expiry(cache_versions):
+    """
+       TTLCache: an entry past its ttl is a miss and is dropped
+    """
+    cache = TTLCache('test_ttl', maxsize=10, ttl_seconds=0)
+    cache.set('a', 1)
+
+    assert cache.get('a', 'missing') == 'missing'
+    assert cache.stats()['size'] == 0
+
+
+def test_ttl_cache_invalidation_reaches_other_workers(cache_versions, monkeypatch):
+    """
+       TTLCache: invalidate() clears this process and bumps cache_versions;
+       another worker's copy clears on its next version check
+    """
+    monkeypatch.setattr(cache_module, 'VERSION_CHECK_SECONDS', 0)
+    here = TTLCache('test_shared', maxsize=10, ttl_seconds=60)
+    other = TTLCache('test_shared', maxsize=10, ttl_seconds=60)
+    here.set('a', 1)
+    other.set('a', 1)
+    assert other.get('a') == 1      # sees version 0
+
+    here.invalidate()
+
+    assert here.get('a') is None
+    assert cache_versions['test_shared'] == 1
+    assert other.get('a') is None
+
+
+def test_ttl_cache_sees_bump_inside_unit_of_work(fake_db, monkeypatch):
+    """
+       TTLCache: the version check runs on its own connection, so a bump
+       committed by another worker while this thread's unit of work is open
+       still clears the cache (the unit of work's snapshot would hide it)
+    """
+    monkeypatch.setattr(cache_module, 'VERSION_CHECK_SECONDS', 0)
+    versions = {'test_uow': 0}
+    fake_db.on("SELECT version FROM cache_versions", lambda q, params: [{'version': versions[params[0]]}])
+    cache = TTLCache('test_uow', maxsize=10, ttl_seconds=60)
+    cache.set('a', 1)
+
+    with mysql_manager.unit_of_work():
+        mysql_manager.execute_query("SELECT 1")
+        [uow_conn] = fake_db.connections
+        assert cache.get('a') == 1
+        versions['test_uow'] = 1            # another worker invalidates
+        assert cache.get('a') is None
+        assert mysql_manager.in_unit_of_work()
+
+    assert uow_conn.statements == ["SELECT 1"]
+    checks = [c for c in fake_db.connections if c is not uow_conn]
+    assert len(checks) == 2 and all(c.commits == 1 for c in checks)
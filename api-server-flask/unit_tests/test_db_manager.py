@@ -0,0 +1,174 @@
+# -*- encoding: utf-8 -*-
+"""
+MySQLManager — pool, unit of work and savepoints, against fake connections.
+"""
+
+import pytest
+
+from api.core.exceptions import ConnectionException
+
+
+def test_pool_overflow_connection_closed_on_checkin(fake_manager):
+    """
+       Pool: beyond DB_POOL_SIZE an overflow connection is opened, and it is
+       closed rather than kept idle when returned
+    """
+    first = fake_manager._checkout()
+    overflow = fake_manager._checkout()
+    assert fake_manager.pool_stats()['in_use'] == 2
+    assert fake_manager.pool_stats()['open'] == 2
+
+    fake_manager._checkin(first)
+    fake_manager._checkin(overflow)
+
+    stats = fake_manager.pool_stats()
+    assert (stats['open'], stats['idle'], stats['in_use']) == (1, 1, 0)
+    assert overflow.closed and not first.closed
+
+
+def test_pool_exhausted_times_out(fake_manager):
+    """
+       Pool: with DB_POOL_SIZE + DB_MAX_OVERFLOW connections checked out the
+       next checkout waits DB_POOL_TIMEOUT, then raises ConnectionException
+    """
+    held = [fake_manager._checkout(), fake_manager._checkout()]
+
+    with pytest.raises(ConnectionException):
+        fake_manager._checkout()
+
+    stats = fake_manager.pool_stats()
+    assert stats['timeouts'] == 1
+    assert stats['waits'] == 1
+    for conn in held:
+        fake_manager._checkin(conn)
+    assert fake_manager._checkout() is held[0]
+
+
+def test_pool_discards_broken_connection(fake_manager):
+    """
+       Pool: a connection checked in as broken is closed and its slot freed
+    """
+    conn = fake_manager._checkout()
+
+    fake_manager._checkin(conn, discard=True)
+
+    stats = fake_manager.pool_stats()
+    assert conn.closed
+    assert (stats['open'], stats['discarded']) == (0, 1)
+
+
+def test_unit_of_work_nested_shares_one_connection_and_commit(fake_manager):
+    """
+       Unit of work: nested blocks and get_cursor calls join the outer one —
+       one connection, one commit at the outermost exit
+    """
+    with fake_manager.unit_of_work():
+        fake_manager.execute_query("UPDATE a SET x = 1", fetch=False)
+        with fake_manager.unit_of_work():
+            with fake_manager.get_cursor() as cursor:
+                cursor.execute("UPDATE b SET y = 2")
+        conn = fake_manager._uow.conn
+        assert conn.commits == 0
+
+    assert conn.statements == ["UPDATE a SET x = 1", "UPDATE b SET y = 2"]
+    assert conn.commits == 1
+    assert not fake_manager.in_unit_of_work()
+    assert fake_manager.pool_stats()['in_use'] == 0
+
+
+def test_unit_of_work_rolls_back_on_error(fake_manager):
+    """
+       Unit of work: an exception rolls the whole unit back and returns its
+       connection to the pool
+    """
+    with pytest.raises(RuntimeError):
+        with fake_manager.unit_of_work():
+            fake_manager.execute_query("UPDATE a SET x = 1", fetch=False)
+            conn = fake_manager._uow.conn
+            raise RuntimeError("boom")
+
+    assert (conn.commits, conn.rollbacks) == (0, 1)
+    assert fake_manager.pool_stats()['in_use'] == 0
+
+
+def test_unit_of_work_without_queries_checks_out_nothing(fake_manager):
+    """
+       Unit of work: the connection is checked out lazily, on first use
+    """
+    with fake_manager.unit_of_work():
+        assert fake_manager.in_unit_of_work()
+
+    assert fake_manager.pool_stats()['in_use'] == 0
+    assert all(conn.commits == 0 for conn in fake_manager.connections)
+
+
+def test_savepoint_keeps_good_chunks_and_rolls_back_bad_ones(fake_manager):
+    """
+       Savepoints: a failing chunk is rolled back to its savepoint while the
+       enclosing work still commits once
+    """
+    with fake_manager.unit_of_work():
+        with fake_manager.savepoint():
+            fake_manager.execute_query("INSERT chunk 1", fetch=False)
+        with pytest.raises(RuntimeError):
+            with fake_manager.savepoint():
+                fake_manager.execute_query("INSERT chunk 2", fetch=False)
+                with fake_manager.savepoint():
+                    raise RuntimeError("bad row")
+        conn = fake_manager._uow.conn
+
+    assert conn.statements == [
+        "SAVEPOINT sp_1", "INSERT chunk 1",
+        "SAVEPOINT sp_1", "INSERT chunk 2", "SAVEPOINT sp_2",
+        "ROLLBACK TO SAVEPOINT sp_2", "ROLLBACK TO SAVEPOINT sp_1",
+    ]
+    assert (conn.commits, conn.rollbacks) == (1, 0)
+
+
+def test_savepoint_outside_unit_of_work_opens_one(fake_manager):
+    """
+       Savepoints: outside a unit of work the block gets its own, which
+       commits when the block ends
+    """
+    with fake_manager.savepoint():
+        fake_manager.execute_query("INSERT row", fetch=False)
+        conn = fake_manager._uow.conn
+
+    assert conn.statements == ["SAVEPOINT sp_1", "INSERT row"]
+    assert conn.commits == 1
+    assert not fake_manager.in_unit_of_work()
+
+
+def test_on_commit_runs_only_after_commit(fake_manager):
+    """
+       on_commit: deferred until the unit of work commits, dropped on rollback
+    """
+    fired = []
+    with fake_manager.unit_of_work():
+        fake_manager.execute_query("UPDATE a SET x = 1", fetch=False)
+        fake_manager.on_commit(lambda: fired.append(fake_manager.in_unit_of_work()))
+        assert fired == []
+    assert fired == [False]   # ran once the unit of work had ended
+
+    with pytest.raises(RuntimeError):
+        with fake_manager.unit_of_work():
+            fake_manager.on_commit(lambda: fired.append('rolled back'))
+            raise RuntimeError("boom")
+    assert fired == [False]
+
+
+def test_on_commit_follows_savepoints(fake_manager):
+    """
+       on_commit: callbacks registered in a savepoint that is rolled back are
+       dropped; those of a kept savepoint survive to the commit
+    """
+    fired = []
+    with fake_manager.unit_of_work():
+        with fake_manager.savepoint():
+            fake_manager.on_commit(lambda: fired.append(1))
+        with pytest.raises(RuntimeError):
+            with fake_manager.savepoint():
+                fake_manager.on_commit(lambda: fired.append(2))
+                raise RuntimeError("bad chunk")
+
+    assert fired == [1]
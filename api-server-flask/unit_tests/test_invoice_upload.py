@@ -0,0 +1,149 @@
+# -*- encoding: utf-8 -*-
+"""
+Invoice uploads (api/business/invoice_business.py, invoice_repository.py):
+duplicate reporting — the reads go through the repositories to a FakeDB
+holding potential_order and invoice rows, the writes are recorded — and
+the product migration statement.
+"""
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from api.business import invoice_business
+from api.config import BaseConfig
+from api.db_manager import mysql_manager
+from api.repositories import invoice_repo
+
+
+class InvoiceTables:
+    """potential_order and invoice rows answering the invoice upload's lookups."""
+
+    def __init__(self):
+        self.orders = {}        # original_order_id → potential_order row
+        self.invoices = []      # (invoice_number, original_order_id, upload_batch_id)
+
+    def order(self, original_order_id, status):
+        self.orders[original_order_id] = {
+            'potential_order_id': len(self.orders) + 1, 'original_order_id': original_order_id,
+            'order_type': 'ZOR', 'warehouse_id': 1, 'company_id': 2, 'dealer_id': 7,
+            'status': status, 'box_count': 1, 'invoice_submitted': 0, 'created_at': None,
+        }
+
+    def respond(self, query, params):
+        q = ' '.join(query.split())
+        if q.startswith('SELECT DISTINCT invoice_number FROM invoice'):
+            excluded = params[-1] if 'upload_batch_id <=> %s' in q else None
+            numbers = params[1:-1] if excluded else params[1:]
+            return [{'invoice_number': n} for n in dict.fromkeys(numbers)
+                    if any(i[0] == n and i[2] != excluded for i in self.invoices)]
+        if q.startswith('SELECT DISTINCT original_order_id FROM invoice'):
+            batch, order_ids = params[1], params[2:]
+            return [{'original_order_id': o} for o in order_ids
+                    if any(i[1] == o and i[2] == batch for i in self.invoices)]
+        if 'FROM potential_order' in q:
+            return [self.orders[o] for o in params[1:] if o in self.orders]
+        if 'FROM order_state WHERE state_name' in q:
+            return [{'state_id': 5, 'state_name': 'Invoiced'}]
+        return None
+
+
+@pytest.fixture
+def invoices(fake_db, monkeypatch):
+    """InvoiceTables behind the FakeDB; invoice_repo's writes recorded in .written."""
+    tables = InvoiceTables()
+    fake_db.handler = tables.respond
+    tables.written = SimpleNamespace(lines=[], invoiced=[], flagged=[])
+    monkeypatch.setattr(invoice_repo, 'get_bypass_order_types', lambda: set())
+    monkeypatch.setattr(invoice_repo, 'bulk_insert_invoices',
+                        lambda records: tables.written.lines.extend(records) or len(records))
+    monkeypatch.setattr(invoice_repo, 'bulk_transition_to_invoiced',
+                        lambda orders, *args: tables.written.invoiced.extend(orders))
+    monkeypatch.setattr(invoice_repo, 'bulk_migrate_products_to_order', lambda orders, at: None)
+    monkeypatch.setattr(invoice_repo, 'bulk_flag_orders',
+                        lambda orders, at: tables.written.flagged.extend(orders))
+    return tables
+
+
+def _upload(rows, batch_id, chunked=False):
+    df = pd.DataFrame(rows, columns=['Invoice #', 'Order #'])
+    with mysql_manager.unit_of_work():
+        return invoice_business.process_invoice_dataframe(df, 1, 2, 9, upload_batch_id=batch_id,
+                                                          chunked=chunked)
+
+
+def test_invoice_already_on_file_is_reported(invoices):
+    """An invoice number stored by another upload is a duplicate; the rest of the file goes in"""
+    invoices.order('SO-1', 'Packed')
+    invoices.order('SO-2', 'Packed')
+    invoices.invoices.append(('INV-1', 'SO-9', 3))
+
+    result = _upload([('INV-1', 'SO-1'), ('INV-2', 'SO-2')], batch_id=5)
+
+    assert [e['reason'] for e in result['error_rows']] == ["Invoice INV-1 already exists"]
+    assert [line.invoice_number for line in invoices.written.lines] == ['INV-2']
+    assert invoices.written.invoiced == [2]
+
+
+def test_invoice_repeated_in_file_is_one_invoice_with_lines(invoices):
+    """The same invoice number on several rows of one file is several lines of one invoice"""
+    invoices.order('SO-1', 'Packed')
+
+    result = _upload([('INV-1', 'SO-1'), ('INV-1', 'SO-1')], batch_id=5)
+
+    assert result['error_rows'] == []
+    assert result['invoices_processed'] == 2
+    assert result['orders_invoiced'] == 1
+    assert invoices.written.invoiced == [1]
+
+
+def test_chunked_resume_accepts_its_own_invoices(invoices):
+    """
+       A later chunk of the same batch repeats an invoice an earlier chunk
+       stored: the batch's own invoices are excluded from the duplicate check
+       and the rows go in as further lines of the already invoiced order
+    """
+    invoices.order('SO-1', 'Invoiced')
+    invoices.invoices.append(('INV-1', 'SO-1', 5))
+
+    result = _upload([('INV-1', 'SO-1')], batch_id=5, chunked=True)
+
+    assert result['error_rows'] == []
+    assert [line.invoice_number for line in invoices.written.lines] == ['INV-1']
+    assert invoices.written.invoiced == []
+
+
+def test_other_batch_repeating_invoice_is_duplicate(invoices):
+    """The same file uploaded again as a new batch reports the invoice as a duplicate"""
+    invoices.order('SO-1', 'Invoiced')
+    invoices.invoices.append(('INV-1', 'SO-1', 5))
+
+    result = _upload([('INV-1', 'SO-1')], batch_id=6, chunked=True)
+
+    assert [e['reason'] for e in result['error_rows']] == ["Invoice INV-1 already exists"]
+    assert invoices.written.lines == []
+
+
+def test_invoice_lookup_runs_on_the_unit_of_work(invoices, fake_db, monkeypatch):
+    """find_existing_invoice_numbers reads serially on the upload's own connection"""
+    monkeypatch.setattr(BaseConfig, 'IN_LIST_CHUNK_SIZE', 1)
+    for n in range(3):
+        invoices.order(f'SO-{n}', 'Packed')
+
+    _upload([(f'INV-{n}', f'SO-{n}') for n in range(3)], batch_id=5)
+
+    assert len(fake_db.find("SELECT DISTINCT invoice_number FROM invoice")) == 3
+    assert len(fake_db.connections) == 1
+
+
+def test_product_migration_joins_one_order_per_potential_order(fake_db):
+    """bulk_migrate_products_to_order copies each line once, to the order's newest `order` row"""
+    invoice_repo.bulk_migrate_products_to_order({11: None, 12: None}, 'now')
+
+    [(query, params)] = fake_db.find("INSERT IGNORE INTO order_product")
+    flat = ' '.join(query.split())
+    assert "JOIN (SELECT potential_order_id, MAX(order_id) AS order_id FROM `order`" in flat
+    assert "GROUP BY potential_order_id) o ON o.potential_order_id = pop.potential_order_id" in flat
+    assert flat.count('%s') == len(params)
+    assert params[:2] == ('now', 'now') and params[3:5] == (11, 12) and params[-2:] == (11, 12)
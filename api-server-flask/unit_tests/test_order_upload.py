@@ -0,0 +1,168 @@
+# -*- encoding: utf-8 -*-
+"""
+Order ingestion (api/business/order_business.py): the upload pipeline and
+the bulk-export template import, against a FakeDB.
+"""
+
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from api.business import dealer_business, order_business
+from api.db_manager import insert_rows_returning_ids, mysql_manager
+from api.repositories import order_repo
+
+
+@pytest.fixture
+def order_db(fake_db, monkeypatch):
+    """FakeDB answering the statements of process_order_dataframe."""
+    monkeypatch.setattr(dealer_business, 'get_or_create_dealers',
+                        lambda names: {'acme': 7, 'beta': 8})
+    fake_db.on("SELECT DISTINCT original_order_id FROM potential_order",
+               lambda q, params: [{'original_order_id': v} for v in params if v == 'SO-EXISTING'])
+    fake_db.on("FROM order_state WHERE state_name", [{'state_id': 1, 'state_name': 'Open'}])
+    fake_db.on("INSERT INTO potential_order", {'lastrowid': 101})
+    fake_db.on("@@auto_increment_increment", [{'step': 2}])
+    return fake_db
+
+
+def test_process_order_dataframe_rejects_duplicates(order_db):
+    """
+       A Sales Order # already in the database, or repeated within the file,
+       is reported and not inserted; so is a blank one
+    """
+    df = pd.DataFrame({
+        'Sales Order #':  ['SO-1', 'SO-2', 'SO-1', 'SO-EXISTING', ''],
+        'Purchaser Name': ['Acme', 'Beta', 'Acme', 'Acme', 'Beta'],
+        'Submit Date':    ['03/04/2026 08:59:37 AM'] * 5,
+    })
+
+    with mysql_manager.unit_of_work():
+        result = order_business.process_order_dataframe(df, 1, 2, 9, upload_batch_id=5)
+
+    assert result['orders_processed'] == 2
+    assert [e['reason'] for e in result['error_rows']] == [
+        "Order SO-1 already exists",
+        "Order SO-EXISTING already exists",
+        "Row 4: Missing Sales Order #",
+    ]
+    [(_, lookup)] = order_db.find("SELECT DISTINCT original_order_id")
+    assert {'SO-1', 'SO-2', 'SO-EXISTING'} <= set(lookup)
+    [(insert, params)] = order_db.find("INSERT INTO potential_order")
+    assert insert.count('(%s') == 2
+    assert [params[0], params[19]] == ['SO-1', 'SO-2']
+
+
+def test_process_order_dataframe_maps_ids_from_insert_block(order_db):
+    """
+       New orders take their ids from the INSERT's LAST_INSERT_ID block,
+       spaced by auto_increment_increment, in row order — the Open state
+       history rows point at them
+    """
+    df = pd.DataFrame({
+        'Sales Order #':  ['SO-1', 'SO-2', 'SO-3'],
+        'Purchaser Name': ['Acme', 'Beta', 'Acme'],
+    })
+
+    with mysql_manager.unit_of_work():
+        order_business.process_order_dataframe(df, 1, 2, 9)
+
+    [(_, history)] = order_db.find("INSERT INTO order_state_history")
+    assert [(row[0], row[1], row[2]) for row in history] == [(101, 1, 9), (103, 1, 9), (105, 1, 9)]
+    [(_, insert_params)] = order_db.find("INSERT INTO potential_order")
+    dealer_ids = insert_params[10::19]
+    assert dealer_ids == [7, 8, 7]
+
+
+def test_insert_rows_returning_ids_per_chunk(fake_db):
+    """
+       insert_rows_returning_ids: each chunk's ids start at that INSERT's
+       lastrowid; the increment is read once
+    """
+    first_ids = iter([10, 50])
+    fake_db.on("INSERT INTO t", lambda q, p: {'lastrowid': next(first_ids)})
+    fake_db.on("@@auto_increment_increment", [{'step': 1}])
+
+    ids = insert_rows_returning_ids('t', ('a', 'b'), [(1, 2), (3, 4), (5, 6)], chunk_size=2)
+
+    assert ids == [10, 11, 50]
+    inserts = fake_db.find("INSERT INTO t")
+    assert [p for _, p in inserts] == [[1, 2, 3, 4], [5, 6]]
+    assert len(fake_db.find("@@auto_increment_increment")) == 1
+
+
+# ── process_bulk_import ──────────────────────────────────────────────────────
+
+@pytest.fixture
+def bulk_import(fake_db, monkeypatch):
+    """order_repo with recording writes; the orders PO1..PO6 exist in the statuses below."""
+    statuses = {1: 'Open', 2: 'Picking', 3: 'Packed', 4: 'Dispatch Ready', 5: 'Open', 6: 'Invoiced'}
+    calls = SimpleNamespace(set_status=[], created=[], completed=[], history=[])
+
+    monkeypatch.setattr(order_repo, 'find_bulk_by_ids', lambda ids: {
+        i: SimpleNamespace(potential_order_id=i, status=statuses[i], box_count=3)
+        for i in ids if i in statuses
+    })
+    monkeypatch.setattr(order_repo, 'find_orders_by_potential_ids',
+                        lambda ids: {i: SimpleNamespace(order_id=i * 10) for i in ids})
+    monkeypatch.setattr(order_repo, 'get_or_create_state',
+                        lambda name, description: SimpleNamespace(state_id=name))
+    monkeypatch.setattr(order_repo, 'bulk_set_status',
+                        lambda ids, status, at: calls.set_status.append((status, ids)))
+    monkeypatch.setattr(order_repo, 'bulk_create_orders', calls.created.extend)
+    monkeypatch.setattr(order_repo, 'bulk_complete_orders',
+                        lambda ids, at: calls.completed.extend(ids))
+    monkeypatch.setattr(order_repo, 'bulk_create_state_history', calls.history.extend)
+    return calls
+
+
+@pytest.mark.parametrize('row, target', [
+    (('PO1', 'c', 'open', 'picking'), 'Picking'),
+    (('PO2', 'c', 'picking', 'packed'), 'Packed'),
+    (('PO3', 'c', 'packed', 'invoiced'), 'Invoiced'),
+    (('PO4', 'c', 'dispatch-ready', 'completed'), 'Completed'),
+])
+def test_bulk_import_applies_template_transitions(bulk_import, row, target):
+    """process_bulk_import moves an order along each transition the template allows"""
+    pot_id = int(row[0][2:])
+
+    result = order_business.process_bulk_import([row], user_id=9)
+
+    assert result['errors'] == [] and result['skipped'] == []
+    assert result['moved'][0]['to'] == row[3]
+    assert bulk_import.set_status == [(target, [pot_id])]
+    assert [h[:3] for h in bulk_import.history] == [(pot_id, target, 9)]
+    if target == 'Invoiced':
+        [(created_id, order_number, status, boxes, _)] = bulk_import.created
+        assert (created_id, status, boxes) == (3, 'Dispatch Ready', 3)
+        assert order_number.startswith('ORD-3-')
+        assert result['moved'][0]['boxes'] == 3
+    else:
+        assert bulk_import.created == []
+    assert bulk_import.completed == ([40] if target == 'Completed' else [])
+
+
+@pytest.mark.parametrize('row', [
+    ('PO5', 'c', 'open', 'packed'),                 # skips a step
+    ('PO6', 'c', 'invoiced', 'dispatch-ready'),     # belongs to the invoice upload
+    ('PO2', 'c', 'open', 'picking'),                # DB status differs from the file
+    ('PO99', 'c', 'open', 'picking'),               # no such order
+])
+def test_bulk_import_rejects_other_transitions(bulk_import, row):
+    """Anything but a template transition from the order's actual status is an error"""
+    result = order_business.process_bulk_import([row], user_id=9)
+
+    assert result['moved'] == []
+    assert [e['order_id'] for e in result['errors']] == [row[0]]
+    assert bulk_import.set_status == [] and bulk_import.history == []
+
+
+def test_bulk_import_skips_unchanged_rows(bulk_import):
+    """Rows without a new status are skipped, not errors"""
+    result = order_business.process_bulk_import(
+        [('PO1', 'c', 'open', 'open'), ('PO2', 'c', 'picking', '')], user_id=9)
+
+    assert [s['reason'] for s in result['skipped']] == ['Status unchanged', 'No expected status provided']
+    assert result['errors'] == [] and bulk_import.set_status == []
+
@@ -0,0 +1,51 @@
+# -*- encoding: utf-8 -*-
+"""
+Keyset pagination cursors (api/utils/pagination.py).
+"""
+
+from datetime import datetime
+
+import pytest
+
+from api.utils.pagination import decode_cursor, encode_cursor, keyset_condition, split_page
+
+
+def test_cursor_round_trip():
+    """
+       A cursor decodes back to the (timestamp, id) it was made from
+    """
+    ts = datetime(2026, 4, 3, 8, 59, 37, 120000)
+    cursor = encode_cursor(ts, 4211)
+
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == (ts, 4211)
+    assert decode_cursor('') is None
+    assert decode_cursor(None) is None
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', encode_cursor(datetime(2026, 1, 1), 1)[:-3], 'WzFd'])
+def test_cursor_malformed(cursor):
+    """
+       A malformed cursor raises ValueError
+    """
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_split_page_next_cursor():
+    """
+       limit + 1 rows → a full page and the cursor of its last row, which
+       selects the rows after it; limit rows or fewer → last page
+    """
+    rows = [{'created_at': datetime(2026, 4, 3 - i), 'id': 30 - i} for i in range(3)]
+
+    page, next_cursor = split_page(rows, 2, 'created_at', 'id')
+    assert page == rows[:2]
+    after = decode_cursor(next_cursor)
+    assert after == (datetime(2026, 4, 2), 29)
+    assert keyset_condition('created_at', 'id', after) == (
+        "(created_at < %s OR (created_at = %s AND id < %s))",
+        (datetime(2026, 4, 2), datetime(2026, 4, 2), 29),
+    )
+
+    assert split_page(rows[:2], 2, 'created_at', 'id') == (rows[:2], None)
@@ -0,0 +1,212 @@
+# -*- encoding: utf-8 -*-
+"""
+order_status_counts maintenance (api/repositories/status_count_repository.py):
+after every write path the counters must equal a fresh GROUP BY over
+potential_order. The FakeDB plays both tables, transactionally.
+"""
+
+import copy
+import re
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from api.db_manager import mysql_manager, partition_window_start
+from api.models import PotentialOrder
+from api.repositories import order_repo, status_count_repo
+
+NOW = datetime.utcnow().replace(microsecond=0)
+BEFORE_WINDOW = partition_window_start() - timedelta(days=1)
+
+
+def _month(ts):
+    return date(ts.year, ts.month, 1)
+
+
+class OrderTables:
+    """
+    potential_order and order_status_counts in memory, interpreting the
+    statements these write paths send. COMMIT / ROLLBACK / savepoints keep
+    or discard both tables like InnoDB would.
+    """
+
+    def __init__(self):
+        self.orders = {}            # potential_order_id → row dict
+        self.counters = Counter()   # (warehouse, company, status, month) → order_count
+        self._committed = self._state()
+        self._savepoints = {}
+
+    def _state(self):
+        return copy.deepcopy((self.orders, self.counters))
+
+    def _restore(self, state):
+        self.orders, self.counters = copy.deepcopy(state)
+
+    def fresh_counts(self):
+        """What rebuild() would write: the active window grouped by counter key."""
+        return Counter(
+            (o['warehouse_id'] or 0, o['company_id'] or 0, o['status'] or '', _month(o['created_at']))
+            for o in self.orders.values() if o['created_at'] >= partition_window_start()
+        )
+
+    def stored_counts(self):
+        """The counters counts_by_status() and drift() read: the active window, zeros dropped."""
+        window = _month(partition_window_start())
+        return +Counter({key: n for key, n in self.counters.items() if key[3] >= window})
+
+    def respond(self, query, params):
+        q = ' '.join(query.split())
+        if q == 'COMMIT':
+            self._committed = self._state()
+        elif q == 'ROLLBACK':
+            self._restore(self._committed)
+        elif q.startswith('SAVEPOINT '):
+            self._savepoints[q.split()[1]] = self._state()
+        elif q.startswith('ROLLBACK TO SAVEPOINT '):
+            self._restore(self._savepoints[q.split()[-1]])
+        elif q.startswith('INSERT INTO potential_order '):
+            return self._insert(q, params)
+        elif '@@auto_increment_increment' in q:
+            return [{'step': 1}]
+        elif q.startswith('SELECT COALESCE(warehouse_id, 0)'):
+            return self._groups(q, params)
+        elif q.startswith('INSERT INTO order_status_counts'):
+            w, c, s, month, n = params
+            self.counters[(w, c, s, month)] += n
+        elif q.startswith('UPDATE potential_order SET'):
+            return self._update(q, params)
+        elif q.startswith('DELETE FROM potential_order WHERE upload_batch_id = %s'):
+            doomed = [i for i, o in self.orders.items() if o['upload_batch_id'] == params[0]]
+            for i in doomed:
+                del self.orders[i]
+            return len(doomed)
+        return None
+
+    def _insert(self, q, params):
+        columns = re.match(r'INSERT INTO potential_order \(([^)]*)\)', q).group(1).split(', ')
+        first_id = max(self.orders, default=0) + 1
+        for n, start in enumerate(range(0, len(params), len(columns))):
+            self.orders[first_id + n] = dict(zip(columns, params[start:start + len(columns)]))
+        return {'lastrowid': first_id}
+
+    def _groups(self, q, params):
+        params = list(params)
+        where = q.split(' WHERE ', 1)[1]
+        if where.startswith('potential_order_id IN ('):
+            n = where.split(')', 1)[0].count('%s')
+            ids, new_status = params[:n], params[n]
+            rows = [self.orders[i] for i in ids if i in self.orders
+                    and (self.orders[i]['status'] or '') != new_status]
+        else:
+            rows = [o for o in self.orders.values() if o['upload_batch_id'] == params[0]]
+        if 'created_at >= %s' in where:
+            window = next(p for p in params if isinstance(p, datetime))
+            rows = [o for o in rows if o['created_at'] >= window]
+        groups = Counter((o['warehouse_id'] or 0, o['company_id'] or 0, o['status'] or '',
+                          _month(o['created_at'])) for o in rows)
+        return [{'warehouse_id': w, 'company_id': c, 'status': s, 'created_month': m, 'n': n}
+                for (w, c, s, m), n in groups.items()]
+
+    def _update(self, q, params):
+        assignments, keys = re.match(
+            r'UPDATE potential_order SET (.*) WHERE potential_order_id IN \((.*)\)$', q).groups()
+        columns = [a.split(' = ')[0] for a in assignments.split(', ')]
+        values = dict(zip(columns, params))
+        ids = params[len(columns):]
+        assert len(ids) == keys.count('%s')
+        for i in ids:
+            self.orders[i].update(values)
+        return len(ids)
+
+
+@pytest.fixture
+def tables(fake_db):
+    """Two batches of orders, inserted and counted through bulk_insert_potential_orders."""
+    t = OrderTables()
+    fake_db.handler = t.respond
+
+    def order(original_id, batch, status='Open', warehouse_id=1, created_at=NOW):
+        return PotentialOrder(original_order_id=original_id, warehouse_id=warehouse_id, company_id=2,
+                              status=status, upload_batch_id=batch, requested_by=9,
+                              created_at=created_at, updated_at=created_at)
+
+    with mysql_manager.unit_of_work():
+        order_repo.bulk_insert_potential_orders([
+            order('A', 10), order('B', 10), order('C', 10, status='Picking'),
+            order('D', 20, warehouse_id=3), order('E', 20, warehouse_id=3),
+            order('OLD', 20, created_at=BEFORE_WINDOW),
+        ])
+    assert t.stored_counts() == t.fresh_counts()
+    return t
+
+
+def test_status_move_keeps_counts(tables):
+    """bulk_set_status moves each order's count from its old status to the new one"""
+    with mysql_manager.unit_of_work():
+        order_repo.bulk_set_status([1, 3, 4], 'Packed', NOW)
+
+    assert tables.stored_counts() == tables.fresh_counts()
+    assert tables.stored_counts()[(1, 2, 'Packed', _month(NOW))] == 2
+
+
+def test_move_to_same_status_changes_nothing(tables, fake_db):
+    """Orders already in the target status are not moved (and nothing is written)"""
+    before = tables.stored_counts()
+
+    with mysql_manager.unit_of_work():
+        order_repo.bulk_set_status([1, 2], 'Open', NOW)
+
+    assert tables.stored_counts() == before == tables.fresh_counts()
+    assert len(fake_db.find("INSERT INTO order_status_counts")) == 1    # the seeding insert only
+
+
+def test_move_skips_orders_before_the_window(tables, fake_db):
+    """
+       move_orders reads only the active partition window: an order older
+       than the window (whose month is no longer read) keeps its counters
+    """
+    before = Counter(tables.counters)
+
+    with mysql_manager.unit_of_work():
+        order_repo.bulk_set_status([6], 'Picking', NOW)
+
+    assert tables.orders[6]['status'] == 'Picking'
+    assert tables.counters == before
+    query, params = fake_db.find("SELECT COALESCE(warehouse_id, 0)")[-1]
+    assert 'created_at >= %s' in query and partition_window_start() in params
+
+
+def test_batch_delete_keeps_counts(tables):
+    """remove_upload_batch before the DELETE uncounts exactly the deleted orders"""
+    with mysql_manager.unit_of_work():
+        status_count_repo.remove_upload_batch(20)
+        mysql_manager.execute_query("DELETE FROM potential_order WHERE upload_batch_id = %s",
+                                    (20,), fetch=False)
+
+    assert sorted(o['original_order_id'] for o in tables.orders.values()) == ['A', 'B', 'C']
+    assert tables.stored_counts() == tables.fresh_counts()
+
+
+def test_rollback_discards_count_deltas(tables):
+    """A rolled-back move leaves both the orders and their counters as they were"""
+    before = tables.stored_counts()
+
+    with pytest.raises(RuntimeError):
+        with mysql_manager.unit_of_work():
+            order_repo.bulk_set_status([1, 2, 3], 'Packed', NOW)
+            raise RuntimeError("upload failed")
+
+    assert tables.stored_counts() == before == tables.fresh_counts()
+
+
+def test_savepoint_rollback_discards_its_deltas(tables):
+    """A move rolled back to its savepoint is uncounted; the rest of the unit of work commits"""
+    with mysql_manager.unit_of_work():
+        order_repo.bulk_set_status([1], 'Picking', NOW)
+        with mysql_manager.savepoint() as sp:
+            order_repo.bulk_set_status([2, 4], 'Packed', NOW)
+            sp.rollback()
+
+    assert tables.orders[2]['status'] == 'Open'
+    assert tables.stored_counts() == tables.fresh_counts()
@@ -0,0 +1,210 @@
+# -*- encoding: utf-8 -*-
+"""
+Background upload jobs (api/services/upload_jobs.py): claims, the heartbeat
+lease, recovery of stale jobs and the staged file's lifetime. upload_jobs is
+an in-memory table with the repository's ownership rules.
+"""
+
+import json
+import threading
+
+import pytest
+
+from api.config import BaseConfig
+from api.services import upload_jobs
+from api.services.upload_jobs import UploadJobQueue
+
+
+class JobTable:
+    """UploadJobRepository stand-in: writes land only while `worker` owns the running job."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.renewed = threading.Event()      # a heartbeat renewed a lease
+        self.refused = threading.Event()      # a heartbeat found its lease gone
+
+    def add(self, file_path, **fields):
+        job_id = len(self.jobs) + 1
+        self.jobs[job_id] = {
+            'id': job_id, 'upload_type': 'orders', 'filename': 'orders.csv',
+            'file_path': str(file_path), 'context': json.dumps({'user_id': 9, 'resumable': True}),
+            'status': 'queued', 'worker': None, 'upload_batch_id': None, 'stale': 0,
+            'processed_count': 0, 'error_count': 0, 'http_status': None, 'result': None,
+            **fields,
+        }
+        return job_id
+
+    def _owned(self, job_id, worker):
+        job = self.jobs[job_id]
+        return job['status'] == 'running' and job['worker'] == worker
+
+    def claim(self, job_id, worker):
+        if self.jobs[job_id]['status'] != 'queued':
+            return False
+        self.jobs[job_id].update(status='running', worker=worker)
+        return True
+
+    def get(self, job_id):
+        return dict(self.jobs[job_id])
+
+    def update_progress(self, job_id, worker, **fields):
+        if self._owned(job_id, worker):
+            self.jobs[job_id].update(fields)
+
+    def heartbeat(self, job_id, worker):
+        owned = self._owned(job_id, worker)
+        (self.renewed if owned else self.refused).set()
+        return owned
+
+    def finish(self, job_id, worker, status, http_status, processed_count, error_count, result_json):
+        if not self._owned(job_id, worker):
+            return False
+        self.jobs[job_id].update(status=status, http_status=http_status, result=result_json,
+                                 processed_count=processed_count, error_count=error_count)
+        return True
+
+    def requeue(self, job_id, worker, context_json):
+        if not self._owned(job_id, worker):
+            return False
+        self.jobs[job_id].update(status='queued', worker=None, context=context_json)
+        return True
+
+    def find_queued_ids(self):
+        return [j['id'] for j in self.jobs.values() if j['status'] == 'queued']
+
+    def find_running(self):
+        return [dict(j) for j in self.jobs.values() if j['status'] == 'running']
+
+    def delete_finished_before(self, days):
+        return []
+
+
+class FakeService:
+    """Upload service whose execute_file runs `run(context)` against the staged file."""
+
+    upload_type = 'orders'
+
+    def __init__(self, run):
+        self.run = run
+        self.contexts = []
+
+    def execute_file(self, temp_path, ext, filename, context, progress=None):
+        assert ext == '.csv'
+        with open(temp_path):       # the staged file is still there
+            pass
+        self.contexts.append(context)
+        return self.run(context)
+
+
+@pytest.fixture
+def jobs(fake_db, monkeypatch, tmp_path):
+    """A JobTable behind upload_jobs, a staged CSV and a way to choose the service's outcome."""
+    table = JobTable()
+    monkeypatch.setattr(upload_jobs, 'upload_job_repo', table)
+    table.file = tmp_path / 'staged.csv'
+    table.file.write_text("Sales Order #\nSO-1\n")
+
+    def use_service(run):
+        table.service = FakeService(run)
+        monkeypatch.setattr(upload_jobs.UploadProcessorFactory, 'get',
+                            staticmethod(lambda upload_type: table.service))
+    table.use_service = use_service
+    return table
+
+
+def _succeed(context):
+    return {'success': True, 'processed_count': 1, 'error_count': 0}, 200
+
+
+def test_job_is_claimed_once_and_its_file_removed_on_success(jobs):
+    """run_job claims atomically (a second run is a no-op); success finishes the job and removes the file"""
+    jobs.use_service(_succeed)
+    job_id = jobs.add(jobs.file)
+    queue = UploadJobQueue()
+
+    queue.run_job(job_id)
+    queue.run_job(job_id)
+
+    assert len(jobs.service.contexts) == 1
+    assert jobs.jobs[job_id]['status'] == 'done'
+    assert not jobs.file.exists()
+
+
+def _fail(context):
+    return {'success': False, 'msg': 'Upload stopped at chunk 2', 'processed_count': 1,
+            'error_count': 0, 'resumable': True}, 400
+
+
+def _crash(context):
+    raise RuntimeError("worker blew up")
+
+
+@pytest.mark.parametrize('run, http_status', [(_fail, 400), (_crash, 500)])
+def test_failed_job_keeps_its_file(jobs, run, http_status):
+    """A failed or crashed job is finished as failed but its file is kept for a retry"""
+    jobs.use_service(run)
+    job_id = jobs.add(jobs.file)
+
+    UploadJobQueue().run_job(job_id)
+
+    assert (jobs.jobs[job_id]['status'], jobs.jobs[job_id]['http_status']) == ('failed', http_status)
+    assert jobs.file.exists()
+
+
+def test_lost_lease_discards_result_and_keeps_file(jobs, monkeypatch):
+    """
+       The runner's heartbeat renews its lease; once another worker has
+       re-queued the job, the heartbeat stops and the result (and file) are
+       left to the job's next run
+    """
+    monkeypatch.setattr(BaseConfig, 'UPLOAD_JOB_HEARTBEAT_SECONDS', 0.01)
+    job_id = jobs.add(jobs.file)
+
+    def run(context):
+        assert jobs.renewed.wait(2)
+        jobs.jobs[job_id].update(status='queued', worker=None)     # lease expired, re-queued
+        assert jobs.refused.wait(2)
+        return _succeed(context)
+    jobs.use_service(run)
+
+    UploadJobQueue().run_job(job_id)
+
+    assert jobs.jobs[job_id]['status'] == 'queued'
+    assert jobs.jobs[job_id]['result'] is None
+    assert jobs.file.exists()
+
+
+def test_stale_job_is_requeued_and_resumed(jobs):
+    """
+       A running job without a recent heartbeat is re-queued with its batch
+       as resume_batch_id; the next run resumes it from the same file
+    """
+    jobs.use_service(_succeed)
+    job_id = jobs.add(jobs.file, status='running', worker='elsewhere:123:abcd',
+                      upload_batch_id=77, stale=1)
+    fresh_id = jobs.add(jobs.file, status='running', worker='elsewhere:124:abcd', stale=0)
+    queue = UploadJobQueue()
+
+    queue._recover()
+
+    assert jobs.jobs[job_id]['status'] == 'queued'
+    assert jobs.jobs[fresh_id]['status'] == 'running'
+    assert queue._wakeup.get_nowait() == job_id
+    assert jobs.file.exists()
+
+    queue.run_job(job_id)
+
+    assert jobs.service.contexts[0]['resume_batch_id'] == 77
+    assert jobs.jobs[job_id]['status'] == 'done'
+    assert not jobs.file.exists()
+
+
+def test_stale_job_without_file_fails(jobs):
+    """A stale job whose file is gone cannot resume and is finished as failed"""
+    job_id = jobs.add(jobs.file, status='running', worker='elsewhere:123:abcd', stale=1)
+    jobs.file.unlink()
+
+    UploadJobQueue()._recover()
+
+    assert jobs.jobs[job_id]['status'] == 'failed'
+    assert 'file is gone' in json.loads(jobs.jobs[job_id]['result'])['msg']
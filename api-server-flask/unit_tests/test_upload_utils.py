@@ -0,0 +1,50 @@
+# -*- encoding: utf-8 -*-
+"""
+Upload column normalisation (api/utils/upload_utils.py).
+"""
+
+from datetime import datetime
+
+import pandas as pd
+
+from api.utils.upload_utils import date_column
+
+
+def test_date_column_infers_format_once_and_falls_back():
+    """
+       date_column: the format parsing most distinct values wins, the rest
+       fall back per value; native datetimes pass through, blanks are None
+    """
+    df = pd.DataFrame({'Submit Date': [
+        "03/04/2026 08:59:37 AM", "03/04/2026 08:59:37 AM", " 15/04/2026 ",
+        "", None, datetime(2026, 1, 2), "garbage",
+    ]})
+    report = {}
+
+    values = date_column(df, 'Submit Date', ('%d/%m/%Y %I:%M:%S %p', '%d/%m/%Y'), report=report)
+
+    assert values == [
+        datetime(2026, 4, 3, 8, 59, 37), datetime(2026, 4, 3, 8, 59, 37), datetime(2026, 4, 15),
+        None, None, datetime(2026, 1, 2), None,
+    ]
+    assert report['Submit Date'] == {'format': '%d/%m/%Y %I:%M:%S %p', 'parsed': 2,
+                                     'fallback': 1, 'native': 1, 'failed': 1}
+
+
+def test_date_column_prefers_majority_day_month_order():
+    """
+       date_column: an ambiguous date follows the order that parses most of
+       the column (day-first here, as 25/12 cannot be month-first)
+    """
+    df = pd.DataFrame({'Date': ["03/04/2026", "25/12/2026"]})
+
+    values = date_column(df, 'Date', ('%m/%d/%Y', '%d/%m/%Y'))
+
+    assert values == [datetime(2026, 4, 3), datetime(2026, 12, 25)]
+
+
+def test_date_column_missing_column():
+    """
+       date_column: a column the file does not have gives None for every row
+    """
+    assert date_column(pd.DataFrame({'Other': [1, 2]}), 'Date', ('%d/%m/%Y',)) == [None, None]
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import {
   Box,
   Button,
@@ -88,6 +88,8 @@ const VALID_TYPES = [
   'application/csv'
 ];
 
+const JOB_POLL_MS = 1500;
+
 /**
  * Generic drag-and-drop file upload form driven by props.
  *
@@ -140,6 +142,10 @@ const FileUploadForm = ({
   const [isUploading, setIsUploading] = useState(false);
   const [uploadStatus, setUploadStatus] = useState(null); // null | 'uploading' | 'success' | 'error'
   const [uploadResults, setUploadResults] = useState(null);
+  const [jobProgress, setJobProgress] = useState(null); // { phase, percent } while a background job runs
+  const pollTimer = useRef(null);
+
+  useEffect(() => () => clearTimeout(pollTimer.current), []);
 
   const validateAndSetFile = (selectedFile) => {
     if (!VALID_TYPES.includes(selectedFile.type)) {
@@ -179,34 +185,63 @@ const FileUploadForm = ({
     if (requiresWarehouse) formData.append('warehouse_id', selectedWarehouse);
     if (requiresCompany) formData.append('company_id', selectedCompany);
 
+    const finishUpload = (data) => {
+      setUploadResults(data);
+      if (data.success) {
+        setUploadStatus('success');
+        showSnackbar(
+          `Processed ${data.processed_count} record(s)` +
+            (data.error_count > 0 ? ` — ${data.error_count} row(s) failed` : ''),
+          data.error_count > 0 ? 'warning' : 'success'
+        );
+      } else {
+        setUploadStatus('error');
+        showSnackbar(data.msg || 'Processing failed', 'error');
+      }
+      setJobProgress(null);
+      setIsUploading(false);
+    };
+
+    const failUpload = (error) => {
+      setUploadStatus('error');
+      setUploadResults(error.response?.data || null);
+      showSnackbar(error.response?.data?.msg || 'Error processing file', 'error');
+      setJobProgress(null);
+      setIsUploading(false);
+    };
+
+    // Uploads run as background jobs: the POST answers 202 with a job id and
+    // the final response is read from GET uploads/<job_id> once it finishes.
+    const pollJob = (jobId) => {
+      api
+        .get(`uploads/${jobId}`)
+        .then((response) => {
+          const job = response.data.job;
+          if (job.status === 'done' || job.status === 'failed') {
+            finishUpload(job.result || { success: false, msg: 'Upload failed' });
+          } else {
+            setJobProgress({ phase: job.phase, percent: job.percent });
+            pollTimer.current = setTimeout(() => pollJob(jobId), JOB_POLL_MS);
+          }
+        })
+        .catch(failUpload);
+    };
+
     api
       .post(endpoint, formData, { headers: { 'Content-Type': 'multipart/form-data' } })
       .then((response) => {
-        const data = response.data;
-        setUploadResults(data);
-        if (data.success) {
-          setUploadStatus('success');
-          showSnackbar(
-            `Processed ${data.processed_count} record(s)` +
-              (data.error_count > 0 ? ` — ${data.error_count} row(s) failed` : ''),
-            data.error_count > 0 ? 'warning' : 'success'
-          );
+        if (response.status === 202 && response.data.job_id) {
+          setJobProgress({ phase: 'queued', percent: 0 });
+          pollJob(response.data.job_id);
         } else {
-          setUploadStatus('error');
-          showSnackbar(data.msg || 'Processing failed', 'error');
+          finishUpload(response.data);
         }
       })
-      .catch((error) => {
-        setUploadStatus('error');
-        setUploadResults(error.response?.data || null);
-        showSnackbar(error.response?.data?.msg || 'Error processing file', 'error');
-      })
-      .finally(() => {
-        setIsUploading(false);
-      });
+      .catch(failUpload);
   };
 
   const resetUpload = () => {
+    clearTimeout(pollTimer.current);
     setFile(null);
     setUploadStatus(null);
     setUploadResults(null);
@@ -305,6 +340,7 @@ const FileUploadForm = ({
                           <CircularProgress size={40} />
                           <Typography variant="body1" style={{ marginTop: '16px' }}>
                             {processingMessage}
+                            {jobProgress && ` ${jobProgress.phase} — ${jobProgress.percent}%`}
                           </Typography>
                         </div>
                       </Grid>